@@ -1,16 +1,57 @@
 import streamlit as st
 import json
 import os
+import time
+from services.word_matcher import WordMatcher
 
 ADMIN_FILE = "data/admins.json"
 BLOCKED_USERS_FILE = "data/blocked_users.json"
 FILTERED_WORDS_FILE = "data/filtered_words.json"
+FILE_CHECK_INTERVAL = 1.0  # 관리 파일 외부 변경 확인 최소 간격 (초)
+
+def file_signature(path):
+    try:
+        info = os.stat(path)
+        return info.st_mtime_ns, info.st_size
+    except OSError:
+        return None
 
 class AdminManager:
     def __init__(self):
         self.admins = self.load_admins()
         self.blocked_users = self.load_blocked_users()
         self.filtered_words = self.load_filtered_words()
+        self._word_matcher = None
+        self.version = 0  # 차단 목록/필터 단어가 바뀔 때마다 증가
+        # 프로세스 전체에서 공유되므로 앱 밖에서 파일을 고치면 refresh()가 다시 읽음
+        self._file_sigs = {path: file_signature(path)
+                           for path in (ADMIN_FILE, BLOCKED_USERS_FILE, FILTERED_WORDS_FILE)}
+        self._file_checked = time.monotonic()
+
+    def refresh(self):
+        """관리 파일이 앱 밖에서 바뀌었으면 다시 읽습니다. (FILE_CHECK_INTERVAL마다 한 번 확인)"""
+        now = time.monotonic()
+        if now - self._file_checked < FILE_CHECK_INTERVAL:
+            return
+        self._file_checked = now
+        changed = False
+        for path, load, name in ((ADMIN_FILE, self.load_admins, 'admins'),
+                                 (BLOCKED_USERS_FILE, self.load_blocked_users, 'blocked_users'),
+                                 (FILTERED_WORDS_FILE, self.load_filtered_words, 'filtered_words')):
+            signature = file_signature(path)
+            if signature == self._file_sigs.get(path):
+                continue
+            self._file_sigs[path] = signature
+            try:
+                setattr(self, name, load())
+                changed = True
+            except Exception as e:
+                # 쓰는 도중인 파일이면 다음 확인 때 다시 읽음
+                self._file_sigs[path] = None
+                print(f"Admin file reload error ({path}): {str(e)}")
+        if changed:
+            self._word_matcher = None
+            self.version += 1
 
     def load_admins(self):
         if os.path.exists(ADMIN_FILE):
@@ -33,25 +74,48 @@ class AdminManager:
     def save_admins(self):
         with open(ADMIN_FILE, 'w') as f:
             json.dump(self.admins, f)
+        self._file_sigs[ADMIN_FILE] = file_signature(ADMIN_FILE)
 
     def save_blocked_users(self):
         with open(BLOCKED_USERS_FILE, 'w') as f:
             json.dump(self.blocked_users, f)
+        self._file_sigs[BLOCKED_USERS_FILE] = file_signature(BLOCKED_USERS_FILE)
+        self.version += 1
 
     def save_filtered_words(self):
         with open(FILTERED_WORDS_FILE, 'w') as f:
             json.dump(self.filtered_words, f)
+        self._file_sigs[FILTERED_WORDS_FILE] = file_signature(FILTERED_WORDS_FILE)
+        # 단어 목록이 바뀌었으므로 매처를 다시 만들도록 표시
+        self._word_matcher = None
+        self.version += 1
+
+    @property
+    def word_matcher(self):
+        self.refresh()
+        if self._word_matcher is None:
+            self._word_matcher = WordMatcher(self.filtered_words)
+        return self._word_matcher
+
+    def filter_key(self):
+        """필터링 결과를 공유할 때 쓰는 키 (차단 목록이나 필터 단어가 바뀌면 달라짐)"""
+        self.refresh()
+        return self.version, frozenset(self.blocked_users)
 
     def is_admin(self, username):
+        self.refresh()
         return username in self.admins
 
     def is_blocked(self, username):
+        self.refresh()
         return username in self.blocked_users
 
     def filter_message(self, message):
-        for word in self.filtered_words:
-            message = message.replace(word, '*' * len(word))
-        return message
+        return self.word_matcher.mask(message)
+
+    def filter_messages(self, messages):
+        """여러 메시지를 한 번에 필터링합니다."""
+        return self.word_matcher.mask_many(messages)
 
     def show_admin_panel(self):
         st.sidebar.markdown("### 관리자 패널")
@@ -1,11 +1,9 @@
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 import sys
 import json
-import pickle
-from PIL import Image
-import shutil
+import secrets
 import time
 
 # 채팅봇 관련 임포트 수정
@@ -20,13 +18,29 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
+from services.message_log import get_message_log
+from services.room_buffer import get_room_buffer
+from services.presence import get_presence_registry
+from services.write_behind import WriteBehindStore
+from services.user_registry import get_user_registry
+from services.session_store import get_session_store
+from services.lru_cache import VersionedLRUCache
+from services.image_pipeline import get_image_pipeline
+from services.moderation_queue import ModerationQueue, PENDING, REJECTED
+from services.search_index import get_search_index
+from models.message import Message
+from services import metrics
+from services.metrics import METRICS_ENABLED, timed, store_timed
+from services import profiler
+
 # 나머지 임포트
 try:
-    from notifications.notification_manager import show_notification, show_exit_notification
+    from notifications.notification_manager import show_notification, show_exit_notification, render_notifications
     from components.room_manager_ui import RoomManagerUI
     from admin.admin_manager import AdminManager
     from components.chat_room_ui import ChatRoomUI
     from chatbot.bot_manager import BotManager
+    from chatbot.config import BOT_TRIGGER, BOT_NAME
     CHATBOT_ENABLED = True
 except ImportError as e:
     print(f"Import error: {str(e)}")
@@ -35,18 +49,62 @@ except ImportError as e:
 # 데이터 폴더 경로 설정
 DATA_DIR = "data"
 USERS_FILE = os.path.join(DATA_DIR, "users.txt")
-SESSIONS_FILE = os.path.join(DATA_DIR, "sessions.pkl")
+SESSIONS_DB = os.path.join(DATA_DIR, "sessions.db")
+SESSION_QUERY_PARAM = "session"  # 로그인 세션 토큰을 담는 URL 쿼리 파라미터
 ACTIVE_USERS_FILE = os.path.join(DATA_DIR, "active_users.json")
 SESSION_TIMEOUT = 300  # 5분 타임아웃
+DEFAULT_ROOM_ID = "lobby"  # 채팅방을 선택하지 않았을 때의 기본 방
+HISTORY_PAGE_SIZE = 50  # 한 번에 표시할 메시지 수
+LIVE_REFRESH_INTERVAL = 2  # 실시간 메시지 확인 주기 (초)
+REJECTED_MESSAGE = "🚫 부적절한 표현이 감지되어 가려진 메시지입니다."
+SEARCH_PERIODS = {"전체 기간": None, "최근 24시간": 86400, "최근 7일": 7 * 86400}
 
 # 추가 상수 정의
 PROFILE_DIR = os.path.join(DATA_DIR, "profiles")
 PROFILES_FILE = os.path.join(DATA_DIR, "user_profiles.json")
+PROFILE_CACHE_SIZE = 1024  # 메모리에 유지할 프로필 수
+
+# 접속자 목록 (active_users.json에는 주기적으로 스냅샷만 저장)
+presence = get_presence_registry(snapshot_file=ACTIVE_USERS_FILE, timeout=SESSION_TIMEOUT)
+
+# 프로필 저장소 (write-behind: 메모리에 즉시 반영, 저널 기록 후 주기적으로 일괄 저장)
+# 스크립트는 rerun마다 다시 실행되므로 저장소는 cache_resource로 프로세스 전체에서 공유
+@st.cache_resource
+def get_profile_store():
+    return WriteBehindStore(PROFILES_FILE, json.load, json.dump, {})
+
+profile_store = get_profile_store()
+
+# 로그인 세션 (토큰별 레코드, 유효한 세션은 메모리에서 조회)
+session_store = get_session_store(SESSIONS_DB)
+
+# 닉네임 등록부 (메모리 인덱스 + 변경 로그, users.txt는 백그라운드에서 압축)
+user_registry = get_user_registry(USERS_FILE)
+
+# 메시지 검색 색인 (채팅방 로그에서 새 메시지만 점진적으로 색인)
+search_index = get_search_index()
 
-# 관리자 초기화
-admin_manager = AdminManager()
+# 프로필 이미지 (내용 해시로 저장, 썸네일은 작업 스레드에서 생성)
+image_pipeline = get_image_pipeline(PROFILE_DIR)
+
+# 프로필 캐시 (저장소에서 바뀐 사용자 항목만 무효화, 파일이 외부에서 바뀌면 전체 무효화)
+@st.cache_resource
+def get_profile_cache():
+    cache = VersionedLRUCache(PROFILE_CACHE_SIZE, version=profile_store.check_file)
+    profile_store.subscribe(cache.invalidate)
+    return cache
+
+profile_cache = get_profile_cache()
+
+# 관리자 초기화 (필터 단어 매처를 rerun 사이에 재사용하도록 프로세스 전체에서 공유)
+@st.cache_resource
+def get_admin_manager():
+    return AdminManager()
+
+admin_manager = get_admin_manager()
 
 # bot_manager 초기화 함수 수정
+@st.cache_resource
 def init_bot_manager():
     if not CHATBOT_ENABLED:
         return None
@@ -59,14 +117,33 @@ def init_bot_manager():
 # 전역 봇 매니저 초기화
 bot_manager = init_bot_manager()
 
+# 메시지 검열 큐 (메시지는 먼저 게시하고 검사는 작업 스레드에서 진행)
+@st.cache_resource
+def get_moderation_queue(_bot):
+    if _bot is None:
+        return None
+
+    def check(room_id, seq, content, username):
+        return _bot.process_message(content, username)
+
+    def on_reject(room_id, seq, username, warning):
+        # 경고 메시지가 곧 판정 기록 (target: 거부된 메시지의 순번)
+        get_message_log(room_id).append(dict(warning, target=seq))
+
+    def load_rejected(room_id):
+        # 검색 색인이 로그의 판정 기록을 점진적으로 읽어 스냅샷에 보관
+        search_index.catch_up([room_id])
+        return search_index.rejected_seqs(room_id)
+
+    return ModerationQueue(check, on_reject, load_rejected)
+
+moderation_queue = get_moderation_queue(bot_manager)
+
 def ensure_data_dir():
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
     if not os.path.exists(USERS_FILE):
         open(USERS_FILE, 'w').close()
-    if not os.path.exists(SESSIONS_FILE):
-        with open(SESSIONS_FILE, 'w') as f:
-            json.dump({}, f)
     if not os.path.exists(ACTIVE_USERS_FILE):
         with open(ACTIVE_USERS_FILE, 'w') as f:
             json.dump({}, f)
@@ -76,9 +153,8 @@ def ensure_data_dir():
         with open(PROFILES_FILE, 'w') as f:
             json.dump({}, f)
 
+@timed("init_session_state")
 def init_session_state():
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
     if 'username' not in st.session_state:
         st.session_state.username = ''
     if 'authenticated' not in st.session_state:
@@ -89,6 +165,8 @@ def init_session_state():
         st.session_state.show_room = False
     if 'current_room' not in st.session_state:
         st.session_state.current_room = None
+    if 'history_cursor' not in st.session_state:
+        st.session_state.history_cursor = None  # None이면 최신 메시지 구간 표시
     if 'bot_welcomed' not in st.session_state:
         st.session_state.bot_welcomed = False
     if 'bot_enabled' not in st.session_state:
@@ -99,56 +177,58 @@ def init_session_state():
         st.session_state.username = saved_session
         st.session_state.authenticated = True
 
-def load_users():
-    if not os.path.exists(USERS_FILE):
-        return set()
-    with open(USERS_FILE, 'r', encoding='utf-8') as f:
-        return set(f.read().splitlines())
-
-def save_user(username):
-    with open(USERS_FILE, 'a', encoding='utf-8') as f:
-        f.write(f"{username}\n")
+def session_token():
+    """현재 브라우저의 로그인 세션 토큰 (세션 상태, 없으면 URL 쿼리 파라미터)"""
+    token = st.session_state.get('session_token')
+    if not token:
+        token = st.query_params.get(SESSION_QUERY_PARAM)
+    return token
 
+@store_timed("sessions", "write")
 def save_session(username):
     try:
-        session_data = {
-            'session_id': st.session_state.session_id,
-            'username': username,
-            'timestamp': datetime.now().isoformat()
-        }
-        with open(SESSIONS_FILE, 'wb') as f:
-            pickle.dump(session_data, f)
+        token = session_token()
+        if not token or session_store.get(token) != username:
+            token = session_store.create(username)
+        st.session_state.session_token = token
+        # 새로고침 후에도 같은 세션을 찾을 수 있도록 URL에 토큰 유지
+        st.query_params[SESSION_QUERY_PARAM] = token
         return True
     except Exception as e:
         st.error(f"세션 저장 실패: {str(e)}")
         return False
 
+@store_timed("sessions", "read")
 def load_session():
-    try:
-        if os.path.exists(SESSIONS_FILE):
-            with open(SESSIONS_FILE, 'rb') as f:
-                session_data = pickle.load(f)
-                if session_data and 'username' in session_data:
-                    return session_data['username']
-    except Exception:
-        pass
-    return None
+    token = st.session_state.get('session_token')
+    if token:
+        return session_store.get(token)
+    # URL의 토큰으로 처음 복원할 때는 새 토큰으로 교체해 이전 URL은 다시 쓸 수 없게 함
+    token = session_store.rotate(st.query_params.get(SESSION_QUERY_PARAM))
+    if not token:
+        return None
+    st.session_state.session_token = token
+    st.query_params[SESSION_QUERY_PARAM] = token
+    return session_store.get(token)
 
 def remove_session():
     try:
-        if os.path.exists(SESSIONS_FILE):
-            os.remove(SESSIONS_FILE)
+        token = session_token()
+        if token:
+            session_store.delete(token)
+        st.session_state.session_token = None
+        if SESSION_QUERY_PARAM in st.query_params:
+            del st.query_params[SESSION_QUERY_PARAM]
         return True
     except Exception:
         return False
 
+@store_timed("users", "write")
 def check_username(username, allow_current=False):
     """
     닉네임 유효성 검사 및 중복 체크
     allow_current: 현재 사용자의 닉네임은 허용 (닉네임 변경 시)
     """
-    users = load_users()
-    
     if not username or len(username.strip()) == 0:
         st.error('닉네임을 입력해주세요.')
         return False
@@ -157,77 +237,55 @@ def check_username(username, allow_current=False):
     if allow_current and username == st.session_state.username:
         return True
     
-    # 기존 사용자인 경우 자동 허용
-    if username in users:
-        return True
-        
-    # 새로운 사용자 등록
-    save_user(username)
+    # 기존 사용자인 경우 자동 허용, 아니면 새로운 사용자 등록
+    user_registry.add(username)
     return True
 
+def rename_user(old_username, new_username):
+    """닉네임과 프로필을 함께 변경합니다.
+
+    이미지 파일은 다른 사용자의 프로필이 같은 파일을 가리킬 수 있으므로
+    그대로 두고 프로필 레코드만 옮깁니다. 등록부에 없던 이전 사용자도
+    먼저 등록한 뒤 변경해 프로필을 잃지 않게 합니다.
+    """
+    def move_profile(old, new):
+        profile_store.set(new, read_profile(old))
+        profile_store.delete(old)
+
+    user_registry.add(old_username)
+    return user_registry.rename(old_username, new_username, on_rename=move_profile)
+
+@timed("update_active_users")
 def update_active_users():
-    try:
-        with open(ACTIVE_USERS_FILE, 'r+') as f:
-            try:
-                active_users = json.load(f)
-            except json.JSONDecodeError:
-                active_users = {}
-            
-            current_time = datetime.now()
-            
-            # 현재 사용자 업데이트
-            if st.session_state.username:
-                # 같은 사용자명의 이전 세션 제거
-                active_users = {
-                    sid: data for sid, data in active_users.items()
-                    if data['username'] != st.session_state.username
-                }
-                
-                # 현재 세션 추가
-                active_users[st.session_state.session_id] = {
-                    'username': st.session_state.username,
-                    'last_active': current_time.isoformat()
-                }
-            
-            # 비활성 세션 제거
-            active_users = {
-                sid: data for sid, data in active_users.items()
-                if datetime.fromisoformat(data['last_active']) > current_time - timedelta(seconds=SESSION_TIMEOUT)
-            }
-            
-            # 파일 업데이트
-            f.seek(0)
-            json.dump(active_users, f)
-            f.truncate()
-            
-            # 중복 제거된 사용자 수 반환
-            unique_users = len(set(data['username'] for data in active_users.values()))
-            return unique_users
-            
-    except Exception as e:
-        st.error(f"활성 사용자 업데이트 실패: {str(e)}")
-        return 0
+    """현재 세션의 활동 시각을 갱신하고 중복 제거된 접속자 수를 반환합니다."""
+    if st.session_state.username:
+        return presence.heartbeat(st.session_state.session_id, st.session_state.username)
+    return presence.unique_count()
 
 def remove_active_user():
-    try:
-        with open(ACTIVE_USERS_FILE, 'r+') as f:
-            active_users = json.load(f)
-            active_users.pop(st.session_state.session_id, None)
-            f.seek(0)
-            json.dump(active_users, f)
-            f.truncate()
-    except Exception:
-        pass
+    presence.remove(st.session_state.session_id)
 
 def logout():
     username = st.session_state.username
     remove_session()
     remove_active_user()
-    show_exit_notification(username)  # 퇴장 알림 추가
+    show_exit_notification(username, current_room_id())  # 퇴장 알림 추가
     st.session_state.username = ''
-    st.session_state.messages = []
     st.rerun()
 
+def current_room_id():
+    return st.session_state.current_room or DEFAULT_ROOM_ID
+
+def get_room_log():
+    """현재 채팅방의 공유 메시지 로그를 반환합니다."""
+    return get_message_log(current_room_id())
+
+@store_timed("messages", "write")
+def append_message(message):
+    """현재 채팅방 로그에 메시지(딕셔너리 또는 Message)를 추가합니다."""
+    return get_room_log().append(message)
+
+@timed("load_css")
 def load_css():
     try:
         with open(os.path.join('styles', 'main.css'), 'r', encoding='utf-8') as f:
@@ -235,29 +293,43 @@ def load_css():
     except Exception as e:
         st.error(f"CSS 로딩 실패: {str(e)}")
 
+@store_timed("profiles", "read")
+def read_profile(username):
+    return profile_store.get(username, {
+        'image': 'default.png',
+        'status': 'offline',
+        'last_seen': None
+    })
+
 def load_profile(username):
-    try:
-        with open(PROFILES_FILE, 'r') as f:
-            profiles = json.load(f)
-            return profiles.get(username, {
-                'image': 'default.png',
-                'status': 'offline',
-                'last_seen': None
-            })
-    except Exception:
-        return {'image': 'default.png', 'status': 'offline', 'last_seen': None}
+    return profile_cache.get(username, read_profile)
 
+@store_timed("profiles", "write")
 def save_profile(username, profile_data):
     try:
-        with open(PROFILES_FILE, 'r+') as f:
-            profiles = json.load(f)
-            profiles[username] = profile_data
-            f.seek(0)
-            json.dump(profiles, f)
-            f.truncate()
+        profile_store.set(username, profile_data)
     except Exception as e:
         st.error(f"프로필 저장 실패: {str(e)}")
 
+def reset_profile_image(username, image_name):
+    """처리에 실패한 이미지를 가리키는 프로필을 기본 이미지로 되돌립니다. (작업 스레드에서도 호출)"""
+    profile = read_profile(username)
+    if profile.get('image') == image_name:
+        profile['image'] = 'default.png'
+        profile_store.set(username, profile)
+
+def show_profile_image(image_name, width, caption=None):
+    """미리 만들어 둔 썸네일을 표시하고, 아직 없으면 원본 파일을 표시합니다."""
+    thumbnail = image_pipeline.thumbnail(image_name, width)
+    if thumbnail is not None:
+        st.image(thumbnail, width=width, caption=caption)
+        return
+    if image_pipeline.failed(image_name):
+        image_name = 'default.png'  # 깨진 원본 파일은 표시하지 않음
+    img_path = os.path.join(PROFILE_DIR, image_name)
+    if os.path.exists(img_path):
+        st.image(img_path, width=width, caption=caption)
+
 def profile_settings():
     col1, col2 = st.columns([1, 3])
     
@@ -271,22 +343,27 @@ def profile_settings():
     profile = load_profile(st.session_state.username)
     
     # 현재 프로필 이미지 표시
-    current_img_path = os.path.join(PROFILE_DIR, profile.get('image', 'default.png'))
-    if (os.path.exists(current_img_path)):
-        st.image(current_img_path, width=200, caption="현재 프로필 이미지")
+    show_profile_image(profile.get('image', 'default.png'), 200, caption="현재 프로필 이미지")
     
     # 프로필 이미지 업로드
     uploaded_file = st.file_uploader("새 프로필 이미지 선택", type=['jpg', 'png', 'jpeg'])
     if uploaded_file:
         try:
-            img = Image.open(uploaded_file)
-            img = img.resize((200, 200))
-            img_path = os.path.join(PROFILE_DIR, f"{st.session_state.username}.png")
-            img.save(img_path)
-            profile['image'] = f"{st.session_state.username}.png"
-            save_profile(st.session_state.username, profile)
-            st.success("프로필 이미지가 업데이트되었습니다!")
-            st.rerun()
+            # 디코딩/리사이즈는 백그라운드에서 진행, 같은 이미지는 한 번만 저장
+            username = st.session_state.username
+            image_name = image_pipeline.submit(
+                uploaded_file.getvalue(),
+                on_failed=lambda name: reset_profile_image(username, name))
+            if profile.get('image') != image_name:
+                profile['image'] = image_name
+                save_profile(username, profile)
+                # 저장 전에 이미 실패했으면 콜백이 되돌릴 것이 없었으므로 여기서 되돌림
+                if image_pipeline.failed(image_name):
+                    reset_profile_image(username, image_name)
+                    st.error("이미지를 처리하지 못했습니다.")
+                else:
+                    st.success("프로필 이미지가 업데이트되었습니다!")
+                    st.rerun()
         except Exception as e:
             st.error(f"이미지 업로드 실패: {str(e)}")
 
@@ -297,34 +374,28 @@ def profile_settings():
     new_username = st.text_input("새로운 닉네임", value=st.session_state.username)
     if st.button("닉네임 변경하기", key="change_username_btn"):
         if new_username and new_username != st.session_state.username:
-            # 중복 체크 (현재 사용자의 닉네임은 허용)
-            if check_username(new_username, allow_current=True):
-                old_username = st.session_state.username
-                
-                # users.txt에서 이전 닉네임 제거
-                users = load_users()
-                users.discard(old_username)
-                with open(USERS_FILE, 'w', encoding='utf-8') as f:
-                    for user in users:
-                        f.write(f"{user}\n")
-                
-                # 프로필 업데이트
-                profile = load_profile(old_username)
-                
-                # 세션 업데이트
+            old_username = st.session_state.username
+            # 등록부에서 닉네임과 프로필을 함께 변경 (기존 등록 순서 유지)
+            if not new_username.strip():
+                st.error('닉네임을 입력해주세요.')
+            elif new_username in user_registry:
+                st.error("이미 사용 중인 닉네임입니다.")
+            else:
+                try:
+                    renamed = rename_user(old_username, new_username)
+                except Exception as e:
+                    st.error(f"닉네임 변경 실패: {str(e)}")
+                    return
+                if not renamed:
+                    st.error("이미 사용 중인 닉네임입니다.")
+                    return
+
+                # 세션 업데이트 (다른 브라우저의 세션도 새 닉네임으로)
+                session_store.rename_user(old_username, new_username)
                 st.session_state.username = new_username
                 st.session_state.authenticated = True
                 save_session(new_username)
                 
-                # ��로필 이미지 파일명 변경
-                old_img = os.path.join(PROFILE_DIR, f"{old_username}.png")
-                if os.path.exists(old_img):
-                    new_img = os.path.join(PROFILE_DIR, f"{new_username}.png")
-                    shutil.move(old_img, new_img)
-                
-                # 프로필 데이터 업데이트
-                save_profile(new_username, profile)
-                
                 st.success("닉네임이 변경되었습니다!")
                 time.sleep(1)
                 st.rerun()
@@ -353,6 +424,7 @@ def format_last_seen(last_seen_str):
     else:
         return last_seen.strftime("%Y-%m-%d %H:%M")
 
+@timed("sidebar_content")
 def sidebar_content():
     with st.sidebar:
         st.markdown("""
@@ -369,9 +441,7 @@ def sidebar_content():
             profile = load_profile(st.session_state.username)
             
             # 프로필 이미지 표시
-            img_path = os.path.join(PROFILE_DIR, profile.get('image', 'default.png'))
-            if os.path.exists(img_path):
-                st.image(img_path, width=100)
+            show_profile_image(profile.get('image', 'default.png'), 100)
             
             st.success(f"✨ 환영합니다! {st.session_state.username}님")
             
@@ -390,46 +460,270 @@ def sidebar_content():
             
             # 접속자 목록 부분 수정 - 한글 깨짐 해결
             st.markdown("### 👥 접속자 목록")
-            try:
-                with open(ACTIVE_USERS_FILE, 'r', encoding='utf-8') as f:
-                    active_users = json.load(f)
-                    unique_users = list(set(data['username'] for data in active_users.values()))
-                    for username in unique_users:
-                        st.markdown(f"• {username}")
-            except Exception as e:
-                st.error(f"접속자 목록 로딩 실패: {str(e)}")
+            for username in presence.usernames():
+                st.markdown(f"• {username}")
             
             # 프로필 설정
             if st.button("프로필 설정"):
                 st.session_state.show_profile = True
+
+            # 관리자 전용 성능 지표 (CHAT_METRICS=1 또는 CHAT_PROFILE=1로 실행했을 때만)
+            if (METRICS_ENABLED or profiler.PROFILER_ENABLED) and admin_manager.is_admin(st.session_state.username):
+                if st.button("📊 성능 지표", key='show_metrics'):
+                    st.session_state.show_metrics = True
             
             if st.button('🚪 로그아웃', key='logout'):
                 profile['status'] = 'offline'
                 save_profile(st.session_state.username, profile)
                 logout()
 
-# 봇 응답 처리 함수 수정
-def handle_bot_response(message, username):
-    if not bot_manager:
+def message_verdict(room_id, message):
+    """검열 대기 중으로 게시된 메시지의 현재 판정"""
+    if message.get('status') != PENDING or moderation_queue is None:
         return None
+    return moderation_queue.verdict(room_id, message['seq'], message.get('timestamp'))
+
+def prepare_messages(messages, room_id):
+    """차단된 사용자를 제외하고 표시할 (seq, role, username, time, content, pending, timestamp) 목록을 만듭니다."""
+    if moderation_queue is not None:
+        # 로그에 기록된 거부 판정을 반영 (재시작 후에도 유지)
+        for message in messages:
+            if 'target' in message:
+                moderation_queue.record(room_id, message['target'], REJECTED)
+
+    messages = [
+        message for message in messages
+        if not admin_manager.is_blocked(message["username"])
+    ]
+    contents = admin_manager.filter_messages([message['content'] for message in messages])
+    entries = []
+    for message, content in zip(messages, contents):
+        verdict = message_verdict(room_id, message)
+        if verdict == REJECTED:
+            content = REJECTED_MESSAGE
+        entries.append((message['seq'], message['role'], message['username'],
+                        message['time'], content, verdict == PENDING, message.get('timestamp')))
+    return entries
+
+def draw_messages(entries):
+    for _, role, username, time_str, content, pending, _ in entries:
+        with st.chat_message(role):
+            status = " • ⏳ 확인 중" if pending else ""
+            st.markdown(f"""
+                <div class='user-info'>
+                    {username} • {time_str}{status}
+                </div>
+                {content}
+            """, unsafe_allow_html=True)
+
+def render_messages(messages, room_id):
+    """차단된 사용자를 제외하고 메시지 목록을 필터링하여 표시합니다."""
+    draw_messages(prepare_messages(messages, room_id))
+
+# st.fragment가 없는 Streamlit 버전에서는 일반 함수로 동작 (자동 갱신 없음)
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+def live_fragment(func):
+    if _fragment is None:
+        return func
+    return _fragment(run_every=LIVE_REFRESH_INTERVAL)(func)
+
+@live_fragment
+@timed("live_history")
+def render_live_messages(room_id):
+    """최신 메시지 구간을 주기적으로 갱신하는 프래그먼트
+
+    최근 메시지는 프로세스 전체에서 공유하는 채팅방 링 버퍼에서 읽으므로
+    디스크를 읽지 않습니다. 필터링한 구간도 버퍼에 새 메시지가 들어올
+    때까지 모든 세션이 공유하므로, 세션에는 메시지 사본 없이 채팅방
+    id(history_room)와 읽는 위치(history_cursor)만 남습니다. 페이지의
+    나머지 부분은 다시 실행되지 않습니다.
+
+    아무 입력 없이 보고만 있는 참여자도 입장/퇴장 알림을 받도록 알림
+    버스도 여기서 함께 확인합니다.
+    """
+    render_notifications(room_id)
+    buffer = get_room_buffer(room_id)
+
+    def build(messages):
+        return prepare_messages([message.to_dict() for message in messages], room_id)
+
+    def verdict_changed(entries):
+        # 검열 대기 중인 메시지의 판정이 나왔으면 다시 준비
+        return moderation_queue is not None and any(
+            moderation_queue.verdict(room_id, entry[0], entry[6]) != PENDING for entry in entries if entry[5])
+
+    draw_messages(buffer.view(admin_manager.filter_key(), HISTORY_PAGE_SIZE, build, stale=verdict_changed))
+
+@timed("search")
+def render_search():
+    """현재 채팅방의 메시지를 검색합니다. (로그를 훑지 않고 색인에서 조회)"""
+    with st.expander("🔎 메시지 검색"):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            query = st.text_input("검색어", key="search_query").strip()
+        with col2:
+            period = st.selectbox("기간", list(SEARCH_PERIODS), key="search_period")
+        if not query:
+            return
+
+        room_id = current_room_id()
+        search_index.catch_up([room_id])
+        since = time.time() - SEARCH_PERIODS[period] if SEARCH_PERIODS[period] else None
+        results = [
+            message for message in search_index.search(query, room_ids=[room_id], since=since)
+            if message_verdict(room_id, message) != REJECTED
+        ]
+        if not results:
+            st.info("검색 결과가 없습니다.")
+            return
+        render_messages(results, room_id)
+
+@timed("history")
+def render_chat_history():
+    """채팅 기록을 HISTORY_PAGE_SIZE 단위 구간으로 나누어 표시합니다.
+
+    기본은 최신 구간이며, history_cursor(구간 시작 순번)를 옮겨 이전 구간을
+    불러옵니다. 기록 길이와 관계없이 한 번에 한 구간만 읽고 그립니다.
+    """
+    room_log = get_room_log()
+    room_id = room_log.room_id
+    if st.session_state.get('history_room') != room_id:
+        st.session_state.history_room = room_id
+        st.session_state.history_cursor = None
+
+    end = room_log.next_seq
+    cursor = st.session_state.history_cursor
+    if cursor is None:
+        start, stop = max(0, end - HISTORY_PAGE_SIZE), end
+    else:
+        start, stop = cursor, min(end, cursor + HISTORY_PAGE_SIZE)
+
+    if start > 0:
+        if st.button("⬆️ 이전 메시지 불러오기", key='load_older'):
+            st.session_state.history_cursor = max(0, start - HISTORY_PAGE_SIZE)
+            st.rerun()
+
+    if cursor is None:
+        # 최신 구간은 새 메시지만 받아 붙이는 실시간 프래그먼트로 표시
+        render_live_messages(room_id)
+        return
+
+    # 링 버퍼에 남아 있는 구간이면 디스크를 읽지 않음
+    messages = get_room_buffer(room_id).read_range(start, stop)
+    if messages is None:
+        messages = room_log.read_range(start, stop)
+    else:
+        messages = [message.to_dict() for message in messages]
+    render_messages(messages, room_id)
+
+    if st.button("⬇️ 최신 메시지로 이동", key='load_latest'):
+        st.session_state.history_cursor = None
+        st.rerun()
+
+@timed("bot")
+def ask_bot(message):
+    """BOT_TRIGGER로 시작하는 메시지에 대한 봇 답변을 채팅방에 추가합니다.
+
+    답변은 모델에서 도착하는 대로 봇 말풍선에 그려지고, 완성된 답변만
+    채팅방 로그에 한 번 저장됩니다.
+    """
+    question = message[len(BOT_TRIGGER):].strip()
+    if not question:
+        return
     try:
-        return bot_manager.process_message(message, username)
+        if not hasattr(st, 'write_stream'):
+            # write_stream이 없는 Streamlit 버전에서는 완성된 답변을 한 번에 추가
+            reply = bot_manager.generate_reply(question, current_room_id(), st.session_state.username)
+            if reply:
+                append_message(reply)
+            return
+
+        time_str = datetime.now().strftime("%H:%M")
+        with st.chat_message("assistant"):
+            st.markdown(f"<div class='user-info'>{BOT_NAME} • {time_str}</div>", unsafe_allow_html=True)
+            content = st.write_stream(
+                bot_manager.stream_reply(question, current_room_id(), st.session_state.username))
+        if content:
+            append_message(Message.create("assistant", BOT_NAME, content))
     except Exception as e:
         st.error(f"봇 응답 처리 실패: {str(e)}")
-        return None
+
+def rerun_tags():
+    """느린 rerun 프로파일에 함께 저장할 정보"""
+    return {
+        "user": st.session_state.get('username') or None,
+        "room": current_room_id() if 'current_room' in st.session_state else DEFAULT_ROOM_ID,
+    }
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    if value == float("inf"):
+        return "> 10s"
+    return f"{value * 1000:.1f}ms"
+
+def metrics_page():
+    """관리자 전용 성능 지표 화면 (rerun 단계별 지연, 저장소 I/O, 캐시/큐 상태)"""
+    if st.button("< 채팅방으로 돌아가기", key='hide_metrics'):
+        st.session_state.show_metrics = False
+        st.rerun()
+
+    st.markdown("### 📊 성능 지표")
+    histograms, counters = metrics.registry.snapshot()
+
+    st.subheader("단계별 지연")
+    st.table([
+        {
+            "지표": item["name"],
+            "구분": ", ".join(f"{key}={value}" for key, value in item["labels"].items()),
+            "횟수": item["count"],
+            "평균": format_seconds(item["sum"] / item["count"] if item["count"] else None),
+            "p50": format_seconds(item["p50"]),
+            "p95": format_seconds(item["p95"]),
+            "p99": format_seconds(item["p99"]),
+        }
+        for item in histograms
+    ])
+
+    st.subheader("저장소 I/O")
+    st.table([
+        {"저장소": item["labels"]["store"], "방향": item["labels"]["direction"], "바이트": int(item["value"])}
+        for item in counters if item["name"] == "chat_store_bytes_total"
+    ])
+
+    st.subheader("서비스 상태")
+    if bot_manager is not None and getattr(bot_manager, 'response_cache', None) is not None:
+        st.json({"response_cache": bot_manager.response_cache.stats()})
+    if moderation_queue is not None:
+        st.json({"moderation_queue": moderation_queue.metrics()})
+    st.json({"search_index": search_index.stats()})
+    st.json({"profile_cache": profile_cache.stats()})
+
+    with st.expander("Prometheus 텍스트"):
+        st.code(metrics.registry.render_prometheus(), language="text")
+
+    if profiler.PROFILER_ENABLED:
+        st.subheader("느린 rerun 프로파일")
+        profiles = profiler.get_slow_rerun_profiler().profiles()
+        if not profiles:
+            st.info("저장된 프로파일이 없습니다.")
+        for info in profiles:
+            st.markdown(f"- {info.get('time', '')[:19]} • {info.get('user') or '-'} • "
+                        f"{info.get('room') or '-'} • {info['phase']} • "
+                        f"{info['elapsed']:.2f}s • `{info['file']}`")
 
 def main():
     load_css()
     
     if 'session_id' not in st.session_state:
-        st.session_state.session_id = str(hash(datetime.now().strftime("%Y%m%d%H%M%S")))
+        st.session_state.session_id = secrets.token_hex(16)  # 접속자 목록용 브라우저 세션 ID
     if 'show_profile' not in st.session_state:
         st.session_state.show_profile = False
     if 'just_entered' not in st.session_state:
         st.session_state.just_entered = False
 
     init_session_state()
-    update_active_users()
     
     st.markdown("""
         <div class='main-title'>
@@ -437,11 +731,11 @@ def main():
         </div>
     """, unsafe_allow_html=True)
     
-    notification_container = st.container()
-    with notification_container:
-        if st.session_state.just_entered:
-            show_notification(st.session_state.username)
-            st.session_state.just_entered = False
+    # 입장 이벤트 발행 후, 아직 보지 못한 알림을 토스트로 표시 (대기 없음)
+    if st.session_state.just_entered:
+        show_notification(st.session_state.username, current_room_id())
+        st.session_state.just_entered = False
+    render_notifications(current_room_id())
     
     sidebar_content()
 
@@ -450,6 +744,10 @@ def main():
         profile_settings()
         return  # 프로필 설정 화면일 때는 나머지 UI 표시하지 않음
 
+    if st.session_state.get('show_metrics') and admin_manager.is_admin(st.session_state.username):
+        metrics_page()
+        return
+
     # 로그인 전/후 화면 분리
     if not st.session_state.username:
         st.markdown("### 👋 환영합니다!")
@@ -474,20 +772,14 @@ def main():
                 else:
                     st.error('닉네임을 입력해주세요.')
 
+    if st.session_state.username:
+        render_search()
+
     # 채팅 컨테이너
     st.markdown("<div class='chat-container'>", unsafe_allow_html=True)
     
     # 채팅 메시지 표시
-    if 'messages' in st.session_state:
-        for message in st.session_state.messages:
-            if not admin_manager.is_blocked(message["username"]):
-                with st.chat_message(message['role']):
-                    st.markdown(f"""
-                        <div class='user-info'>
-                            {message['username']} • {message['time']}
-                        </div>
-                        {admin_manager.filter_message(message['content'])}
-                    """, unsafe_allow_html=True)
+    render_chat_history()
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -498,9 +790,7 @@ def main():
         try:
             welcome_message = bot_manager.get_welcome_message(st.session_state.username)
             if welcome_message:
-                if 'messages' not in st.session_state:
-                    st.session_state.messages = []
-                st.session_state.messages.append(welcome_message)
+                append_message(welcome_message)
                 st.session_state.bot_welcomed = True
                 st.rerun()
         except Exception as e:
@@ -510,30 +800,32 @@ def main():
     if st.session_state.username:
         message = st.chat_input("메시지를 입력하세요", key='message')
         if message:
-            user_message = {
-                "role": "user",
-                "content": message,
-                "username": st.session_state.username,
-                "time": datetime.now().strftime("%H:%M")
-            }
-            if 'messages' not in st.session_state:
-                st.session_state.messages = []
+            user_message = Message.create("user", st.session_state.username, message)
             
-            # 봇 응답 처리 (욕설/비난 감지)
-            if bot_manager:
-                bot_response = handle_bot_response(message, st.session_state.username)
-                if bot_response:
-                    st.session_state.messages.append(bot_response)
-                else:
-                    # 문제없는 메시지만 추가
-                    st.session_state.messages.append(user_message)
+            # 메시지를 먼저 게시하고 욕설/비난 감지는 검열 큐에서 비동기로 처리
+            if moderation_queue is not None:
+                seq = append_message(user_message.replace(status=PENDING))
+                moderation_queue.submit(current_room_id(), seq, message, st.session_state.username)
             else:
-                st.session_state.messages.append(user_message)
+                append_message(user_message)
+
+            if bot_manager is not None and message.startswith(BOT_TRIGGER):
+                ask_bot(message)
             
+            st.session_state.history_cursor = None
             st.rerun()
 
 if __name__ == "__main__":
     ensure_data_dir()
     if not os.path.exists('styles'):
         os.makedirs('styles')
-    main()
+    try:
+        # rerun 전체 시간을 기록하고, 느린 rerun은 스택 샘플을 저장 (CHAT_METRICS/CHAT_PROFILE)
+        with profiler.capture(rerun_tags), metrics.phase("rerun"):
+            main()
+    finally:
+        if METRICS_ENABLED:
+            try:
+                metrics.registry.write_textfile()
+            except Exception as e:
+                print(f"Metrics export error: {str(e)}")
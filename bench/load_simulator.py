@@ -0,0 +1,269 @@
+"""app.py 동시 세션 부하 시뮬레이터
+
+Streamlit의 headless 테스트 도구(AppTest)로 N개의 세션을 만들어
+로그인 -> 채팅방 생성/입장 -> 메시지 전송 -> 로그아웃 시나리오를 실행하고,
+단계별 rerun 지연(p50/p95/p99), 처리량, 파일 I/O 횟수를 JSON으로 출력합니다.
+봇은 실제 모델 대신 고정 지연으로 응답하는 StubBotManager를 사용합니다.
+
+    python -m bench.load_simulator --sessions 20 --messages 10 --output before.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import types
+import random
+import argparse
+import builtins
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(REPO_DIR, "app.py")
+STEPS = ("login", "join_room", "send", "bot", "logout")
+
+
+class StubBotManager:
+    """모델 호출 없이 고정 지연으로 응답하는 BotManager 대역"""
+
+    model_latency = 0.0
+
+    def __init__(self):
+        from chatbot.config import BOT_NAME, HARMFUL_WORDS
+        from services.word_matcher import WordMatcher
+        self.bot_name = BOT_NAME
+        self.matcher = WordMatcher(HARMFUL_WORDS, ignore_case=True)
+        self.welcomed_users = set()
+        self.is_enabled = True
+
+    def _message(self, content):
+        from models.message import Message
+        return Message.create("assistant", self.bot_name, content).to_dict()
+
+    def get_welcome_message(self, username):
+        if username in self.welcomed_users:
+            return None
+        self.welcomed_users.add(username)
+        return self._message(f"👋 안녕하세요! {username}님!")
+
+    def process_message(self, message, username):
+        words = self.matcher.find_all(message)
+        if words:
+            return self._message(f"🚫 [{username}님께 드리는 경고] {', '.join(words)}")
+        return None
+
+    def generate_reply(self, message, room_id, username=None):
+        time.sleep(self.model_latency)
+        return self._message(f"'{message}'에 대한 답변입니다.")
+
+    def stream_reply(self, message, room_id, username=None):
+        for word in f"'{message}'에 대한 답변입니다.".split():
+            time.sleep(self.model_latency / 4)
+            yield word + " "
+
+
+def install_stub_bot():
+    """app.py가 가져가는 chatbot.bot_manager 모듈을 대역으로 바꿉니다."""
+    module = types.ModuleType("chatbot.bot_manager")
+    module.BotManager = StubBotManager
+    sys.modules["chatbot.bot_manager"] = module
+
+
+class IOCounter:
+    """open() 호출 수와 (리눅스에서는) 프로세스 읽기/쓰기 시스템 호출 수를 셉니다."""
+
+    def __init__(self):
+        self.opens = {"read": 0, "write": 0}
+        self._lock = threading.Lock()
+        self._open = builtins.open
+
+    def install(self):
+        counter = self
+
+        def counting_open(file, mode='r', *args, **kwargs):
+            kind = "read" if mode.startswith('r') and '+' not in mode else "write"
+            with counter._lock:
+                counter.opens[kind] += 1
+            return counter._open(file, mode, *args, **kwargs)
+
+        builtins.open = counting_open
+
+    def uninstall(self):
+        builtins.open = self._open
+
+    def snapshot(self):
+        with self._lock:
+            result = {f"open_{kind}": count for kind, count in self.opens.items()}
+        try:
+            with self._open("/proc/self/io") as f:
+                for line in f:
+                    key, value = line.split(":")
+                    if key in ("syscr", "syscw", "read_bytes", "write_bytes"):
+                        result[key] = int(value)
+        except OSError:
+            pass
+        return result
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Recorder:
+    def __init__(self, io_counter):
+        self.io = io_counter
+        self.latencies = {step: [] for step in STEPS}
+        self.io_deltas = {step: {} for step in STEPS}
+        self.errors = {step: 0 for step in STEPS}
+        self._lock = threading.Lock()
+
+    def measure(self, step, action):
+        before = self.io.snapshot()
+        start = time.perf_counter()
+        try:
+            at = action()
+            failed = bool(at is not None and at.exception)
+        except Exception:
+            failed = True
+        elapsed = time.perf_counter() - start
+        after = self.io.snapshot()
+        with self._lock:
+            self.latencies[step].append(elapsed)
+            if failed:
+                self.errors[step] += 1
+            totals = self.io_deltas[step]
+            for key, value in after.items():
+                totals[key] = totals.get(key, 0) + value - before.get(key, 0)
+
+    def report(self, wall_time):
+        steps = {}
+        total = 0
+        for step in STEPS:
+            values = self.latencies[step]
+            total += len(values)
+            if not values:
+                continue
+            steps[step] = {
+                "count": len(values),
+                "errors": self.errors[step],
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "mean_ms": sum(values) / len(values) * 1000,
+                # 동시에 여러 세션을 돌리면 다른 세션의 I/O도 함께 집계됨
+                "io_per_run": {key: value / len(values) for key, value in self.io_deltas[step].items()},
+            }
+        return {"steps": steps, "runs": total, "wall_time_s": wall_time,
+                "throughput_rps": total / wall_time if wall_time else None}
+
+
+def run_session(index, args, recorder, room_ids):
+    from streamlit.testing.v1 import AppTest
+    from chatbot.config import BOT_TRIGGER
+
+    rng = random.Random(args.seed + index)
+    at = AppTest.from_file(APP_FILE, default_timeout=args.timeout)
+    at.run()
+
+    username = f"user{index:04d}"
+
+    def login():
+        at.text_input(key="login_input").input(username)
+        at.button(key="enter").click()
+        return at.run()
+
+    def join_room():
+        # app.py에는 채팅방 UI가 연결되어 있지 않으므로 세션의 현재 채팅방만 바꿈
+        at.session_state["current_room"] = rng.choice(room_ids)
+        return at.run()
+
+    def send(text):
+        def action():
+            at.chat_input(key="message").set_value(text)
+            return at.run()
+        return action
+
+    def logout():
+        at.button(key="logout").click()
+        return at.run()
+
+    recorder.measure("login", login)
+    if room_ids:
+        recorder.measure("join_room", join_room)
+    for i in range(args.messages):
+        if rng.random() < args.bot_ratio:
+            recorder.measure("bot", send(f"{BOT_TRIGGER} 질문 {i}"))
+        else:
+            recorder.measure("send", send(f"{username}의 메시지 {i}"))
+    recorder.measure("logout", logout)
+
+
+def create_rooms(count):
+    from services.room_manager import RoomManager
+    manager = RoomManager()
+    return [manager.create_room(f"부하 테스트 {i}", f"owner{i}", topic="bench").id for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.py 동시 세션 부하 시뮬레이터")
+    parser.add_argument("--sessions", type=int, default=10, help="시뮬레이션할 세션 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 실행할 세션 수")
+    parser.add_argument("--messages", type=int, default=5, help="세션당 보낼 메시지 수")
+    parser.add_argument("--rooms", type=int, default=3, help="미리 만들 채팅방 수 (0이면 로비만 사용)")
+    parser.add_argument("--bot-ratio", type=float, default=0.1, help="봇에게 보내는 메시지 비율")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="대역 봇 응답 지연 (초)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="rerun 한 번의 제한 시간 (초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=None, help="작업 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument("--label", default="", help="결과에 함께 기록할 이름")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    # 데이터 파일은 모두 상대 경로이므로 빈 작업 디렉터리에서 실행
+    work_dir = os.path.abspath(args.data_dir or tempfile.mkdtemp(prefix="chat-load-"))
+    os.makedirs(work_dir, exist_ok=True)
+    if not os.path.exists(os.path.join(work_dir, "styles")):
+        shutil.copytree(os.path.join(REPO_DIR, "styles"), os.path.join(work_dir, "styles"))
+    os.chdir(work_dir)
+    sys.path.insert(0, REPO_DIR)
+
+    StubBotManager.model_latency = args.model_latency
+    install_stub_bot()
+    room_ids = create_rooms(args.rooms)
+
+    io_counter = IOCounter()
+    io_counter.install()
+    recorder = Recorder(io_counter)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            futures = [executor.submit(run_session, i, args, recorder, room_ids)
+                       for i in range(args.sessions)]
+            for future in futures:
+                future.result()
+    finally:
+        io_counter.uninstall()
+    wall_time = time.perf_counter() - start
+
+    result = {
+        "label": args.label,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "label")},
+        "work_dir": work_dir,
+        **recorder.report(wall_time),
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""저장소 계층 마이크로벤치마크
+
+영속화 함수를 직접 호출해 데이터 크기별 처리량(ops/s)과 지연 분포를
+측정하고, 여러 프로세스가 동시에 쓸 때 유실된 갱신 수를 셉니다.
+저장된 기준값(baselines.json)보다 처리량이 --threshold % 넘게 떨어지면
+종료 코드 1로 실패합니다.
+
+    python -m bench.storage_bench                      # 측정 후 기준값과 비교
+    python -m bench.storage_bench --update-baseline    # 기준값 갱신
+    python -m bench.storage_bench --only room --sizes 100,1000 --writers 1,4
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_WRITERS = (1, 4)
+DEFAULT_OPS = 200
+DEFAULT_THRESHOLD = 20.0  # 기준값 대비 허용 처리량 감소율 (%)
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def summarize(latencies):
+    total = sum(latencies)
+    return {
+        "ops": len(latencies),
+        "ops_per_s": len(latencies) / total if total else None,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p95_us": percentile(latencies, 95) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "max_us": max(latencies) * 1e6,
+    }
+
+
+def timed(op, count):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        op(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+# 단일 프로세스 벤치마크: (size, ops) -> 지연 목록
+# 각 함수는 빈 작업 디렉터리(cwd)에서 size만큼 데이터를 준비한 뒤 측정합니다.
+
+def bench_room_save(size, ops):
+    from services.room_manager import RoomManager
+    manager = RoomManager()
+    rooms = [manager.create_room(f"room{i}", f"owner{i}") for i in range(size)]
+
+    def op(i):
+        room = rooms[i % len(rooms)]
+        room.topic = f"topic {i}"
+        manager.save_room(room)
+    return timed(op, ops)
+
+
+def bench_room_get(size, ops):
+    from services.room_manager import RoomManager
+    manager = RoomManager()
+    ids = [manager.create_room(f"room{i}", f"owner{i}").id for i in range(size)]
+    return timed(lambda i: manager.get_room(ids[i % len(ids)]), ops)
+
+
+def bench_chat_rooms_save(size, ops):
+    from components.chat_room import ChatRoomManager, ChatRoom
+    os.makedirs("data", exist_ok=True)
+    manager = ChatRoomManager()
+    for i in range(size):
+        room = ChatRoom(f"room{i}", f"owner{i}")
+        manager.rooms[f"{i}"] = room
+    return timed(lambda i: manager.save_rooms(), ops)
+
+
+def _profile_store():
+    from services.write_behind import WriteBehindStore
+    from services.lru_cache import VersionedLRUCache
+    os.makedirs("data", exist_ok=True)
+    # 백그라운드 커미터가 작업 디렉터리를 벗어난 뒤에도 같은 파일을 쓰도록 절대 경로 사용
+    store = WriteBehindStore(os.path.abspath(os.path.join("data", "user_profiles.json")),
+                             json.load, json.dump, {})
+    cache = VersionedLRUCache(1024, version=store.check_file)
+    store.subscribe(cache.invalidate)
+    return store, cache
+
+
+def bench_profile_load(size, ops):
+    store, cache = _profile_store()
+    for i in range(size):
+        store.set(f"user{i}", {"image": "default.png", "status": "offline", "last_seen": None})
+    store.flush()
+    rng = random.Random(0)
+    return timed(lambda i: cache.get(f"user{rng.randrange(size)}", store.get), ops)
+
+
+def bench_profile_save(size, ops):
+    store, _ = _profile_store()
+    for i in range(size):
+        store.set(f"user{i}", {"image": "default.png", "status": "offline", "last_seen": None})
+    store.flush()
+    return timed(lambda i: store.set(f"user{i % size}", {"status": "online", "last_seen": i}), ops)
+
+
+def bench_presence(size, ops):
+    from services.presence import PresenceRegistry
+    registry = PresenceRegistry(timeout=300)
+    for i in range(size):
+        registry.heartbeat(f"session{i}", f"user{i}")
+    return timed(lambda i: registry.heartbeat(f"session{i % size}", f"user{i % size}"), ops)
+
+
+def bench_check_username(size, ops):
+    from services.user_registry import UserRegistry
+    os.makedirs("data", exist_ok=True)
+    registry = UserRegistry(os.path.abspath(os.path.join("data", "users.txt")))
+    for i in range(size):
+        registry.add(f"user{i}")
+
+    def op(i):
+        # 로그인 시의 check_username: 있으면 통과, 없으면 등록
+        name = f"user{i % (size * 2)}"
+        if name not in registry:
+            registry.add(name)
+    latencies = timed(op, ops)
+    registry.compact()  # 백그라운드 압축이 끝날 때까지 기다림
+    return latencies
+
+
+def bench_filter_message(size, ops):
+    from admin.admin_manager import AdminManager
+    manager = AdminManager()
+    manager.filtered_words = [f"금지어{i}" for i in range(size)]
+    manager._word_matcher = None
+    message = " ".join(f"평범한 문장 금지어{i} 입니다" for i in range(0, size, max(1, size // 10)))
+    return timed(lambda i: manager.filter_message(message), ops)
+
+
+BENCHMARKS = {
+    "room_save": bench_room_save,
+    "room_get": bench_room_get,
+    "chat_rooms_save": bench_chat_rooms_save,
+    "profile_load": bench_profile_load,
+    "profile_save": bench_profile_save,
+    "presence_heartbeat": bench_presence,
+    "check_username": bench_check_username,
+    "filter_message": bench_filter_message,
+}
+
+
+# 동시 쓰기 프로세스: 각 프로세스가 고유한 항목을 추가하고, 끝난 뒤 남은 항목 수로 유실을 셈
+
+def _room_writer(work_dir, room_id, writer, count):
+    os.chdir(work_dir)
+    from services.room_manager import RoomManager
+    manager = RoomManager()
+    for i in range(count):
+        manager.invite_user(room_id, f"w{writer}_{i}", "owner")
+
+
+def _chat_rooms_writer(work_dir, room_id, writer, count):
+    os.chdir(work_dir)
+    import components.chat_room as chat_room
+    for i in range(count):
+        # 매번 파일 전체를 읽고 다시 씀 (ChatRoomManager와 같은 방식)
+        with open(chat_room.ROOMS_FILE, 'r') as f:
+            data = json.load(f)
+        data[room_id]["members"].append(f"w{writer}_{i}")
+        with open(chat_room.ROOMS_FILE, 'w') as f:
+            json.dump(data, f)
+
+
+def _profile_writer(work_dir, room_id, writer, count):
+    os.chdir(work_dir)
+    from services.write_behind import WriteBehindStore, flush_all
+    store = WriteBehindStore(os.path.join("data", "user_profiles.json"), json.load, json.dump, {})
+    for i in range(count):
+        store.set(f"w{writer}_{i}", {"status": "online"})
+    flush_all()
+
+
+def _prepare_contention(kind):
+    os.makedirs("data", exist_ok=True)
+    if kind == "room":
+        from services.room_manager import RoomManager
+        return RoomManager().create_room("contention", "owner").id
+    if kind == "chat_rooms":
+        import components.chat_room as chat_room
+        with open(chat_room.ROOMS_FILE, 'w') as f:
+            json.dump({"contention": {"members": ["owner"]}}, f)
+        return "contention"
+    return None
+
+
+def _count_contention(kind, room_id):
+    if kind == "room":
+        from services.room_manager import RoomManager
+        return len(RoomManager().get_room(room_id).members) - 1
+    if kind == "chat_rooms":
+        import components.chat_room as chat_room
+        with open(chat_room.ROOMS_FILE, 'r') as f:
+            return len(json.load(f)[room_id]["members"]) - 1
+    with open(os.path.join("data", "user_profiles.json"), 'r') as f:
+        return len(json.load(f))
+
+
+CONTENTION = {
+    "room": _room_writer,
+    "chat_rooms": _chat_rooms_writer,
+    "profile": _profile_writer,
+}
+
+
+def run_contention(kind, writers, count):
+    work_dir = tempfile.mkdtemp(prefix="storage-bench-")
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        room_id = _prepare_contention(kind)
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=CONTENTION[kind], args=(work_dir, room_id, w, count))
+                     for w in range(writers)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        expected = writers * count
+        actual = _count_contention(kind, room_id)
+        # 저장소 파일이 깨지거나 다른 프로세스와 충돌해 중간에 죽은 프로세스 수
+        failed = sum(1 for process in processes if process.exitcode != 0)
+        return {"writers": writers, "expected": expected, "lost_updates": expected - actual,
+                "failed_writers": failed, "ops_per_s": expected / elapsed if elapsed else None}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_benchmark(name, size, ops):
+    work_dir = tempfile.mkdtemp(prefix="storage-bench-")
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        return summarize(BENCHMARKS[name](size, ops))
+    finally:
+        from services.write_behind import flush_all
+        try:
+            flush_all()
+        except Exception:
+            pass
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare(results, baselines, threshold):
+    """기준값보다 처리량이 threshold % 넘게 떨어진 항목 목록"""
+    regressions = []
+    for key, result in results.items():
+        base = baselines.get(key, {}).get("ops_per_s")
+        current = result.get("ops_per_s")
+        if not base or not current:
+            continue
+        drop = (base - current) / base * 100
+        if drop > threshold:
+            regressions.append({"benchmark": key, "baseline_ops_per_s": base,
+                                "ops_per_s": current, "drop_pct": drop})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장소 계층 마이크로벤치마크")
+    parser.add_argument("--only", default=None, help="이름에 이 문자열이 들어간 벤치마크만 실행")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="데이터 크기 목록 (채팅방/사용자/단어 수)")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="벤치마크당 측정 횟수")
+    parser.add_argument("--writers", default=",".join(map(str, DEFAULT_WRITERS)),
+                        help="동시 쓰기 프로세스 수 목록 (0이면 생략)")
+    parser.add_argument("--writes", type=int, default=50, help="프로세스당 쓰기 수")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true", help="측정 결과를 기준값으로 저장")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="허용 처리량 감소율 (%%)")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    writers = [int(value) for value in args.writers.split(",") if value and int(value) > 0]
+
+    results, skipped = {}, {}
+    for name in BENCHMARKS:
+        if args.only and args.only not in name:
+            continue
+        for size in sizes:
+            try:
+                results[f"{name}[{size}]"] = run_benchmark(name, size, args.ops)
+            except ImportError as e:
+                # 의존성이 없는 환경에서는 해당 벤치마크만 건너뜀
+                skipped[name] = str(e)
+                break
+
+    contention = {}
+    for kind in CONTENTION:
+        if args.only and args.only not in kind:
+            continue
+        for count in writers:
+            contention[f"{kind}[{count}]"] = run_contention(kind, count, args.writes)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+    regressions = [] if args.update_baseline else compare(results, baselines, args.threshold)
+
+    report = {"results": results, "contention": contention, "skipped": skipped,
+              "threshold_pct": args.threshold, "regressions": regressions}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.update_baseline:
+        baselines.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import json
+import time
+import asyncio
+import threading
+from urllib.parse import urlsplit
+
+from .config import (MODEL_MAX_CONCURRENCY, MODEL_TIMEOUT, MODEL_HEDGE_DELAY,
+                     BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+
+
+class ModelUnavailable(Exception):
+    """모델 호출이 시간 초과/실패했거나 회로 차단기가 열려 있음"""
+
+
+class CircuitBreaker:
+    """연속 실패가 쌓이면 일정 시간 모델 호출을 차단하는 회로 차단기
+
+    closed: 정상 호출, open: 호출 차단, half_open: 한 번만 시험 호출 허용
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                return True
+            if self.state == "half_open":
+                # 시험 호출 결과가 나올 때까지 추가 호출 차단
+                return False
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def record_abandoned(self):
+        """결과 없이 중단된 호출 (취소, 스트림 소비 중단)
+
+        시험 호출이었다면 half_open에 머물러 모든 호출이 막히지 않도록
+        open으로 되돌립니다. opened_at은 그대로 두므로 다음 호출이 바로
+        다시 시험 호출이 됩니다.
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+
+class GeminiTransport:
+    """google-generativeai 모델의 비동기 API를 사용하는 전송 계층"""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def __call__(self, contents):
+        response = await self.model.generate_content_async(contents)
+        return response.text
+
+    async def stream(self, contents):
+        response = await self.model.generate_content_async(contents, stream=True)
+        async for chunk in response:
+            yield chunk.text
+
+
+class HttpTransport:
+    """JSON HTTP 서버(예: fake_model_server)로 요청을 보내는 전송 계층
+
+    POST {"contents": [...]} -> {"text": "..."}
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+
+    async def __call__(self, contents):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            body = json.dumps({"contents": contents}, ensure_ascii=False).encode('utf-8')
+            writer.write(
+                f"POST {self.path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode('ascii') + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            payload = await reader.read()
+        finally:
+            writer.close()
+        if status != 200:
+            raise RuntimeError(f"model server returned {status}")
+        return json.loads(payload)["text"]
+
+    async def stream(self, contents):
+        # 서버가 스트리밍을 지원하지 않으므로 전체 응답을 한 조각으로 전달
+        yield await self(contents)
+
+
+class AsyncModelClient:
+    """동시 호출 수 제한, 호출별 마감 시간, 헤지 재시도, 회로 차단기를 갖춘 모델 클라이언트
+
+    hedge_delay초 안에 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 도착한
+    응답을 사용합니다. 실패나 시간 초과는 ModelUnavailable로 통일됩니다.
+    """
+
+    def __init__(self, transport, max_concurrency=MODEL_MAX_CONCURRENCY, timeout=MODEL_TIMEOUT,
+                 hedge_delay=MODEL_HEDGE_DELAY, breaker=None):
+        self.transport = transport
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.calls = 0
+        self.hedged = 0
+        self.failures = 0
+
+    async def _hedged_call(self, contents):
+        first = asyncio.ensure_future(self.transport(contents))
+        tasks = {first}
+        try:
+            if self.hedge_delay:
+                done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+                # 헤지 요청도 동시 호출 제한 한 칸을 차지 (남는 칸이 없으면 헤지하지 않음)
+                if not done and not self._semaphore.locked():
+                    await self._semaphore.acquire()
+                    self.hedged += 1
+                    hedge = asyncio.ensure_future(self.transport(contents))
+                    hedge.add_done_callback(lambda _: self._semaphore.release())
+                    tasks.add(hedge)
+            error = None
+            # 먼저 끝난 요청이 실패했으면 남은 요청을 계속 기다림
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _limited_call(self, contents):
+        async with self._semaphore:
+            return await self._hedged_call(contents)
+
+    async def generate(self, contents, timeout=None):
+        if not self.breaker.allow():
+            raise ModelUnavailable("circuit open")
+        self.calls += 1
+        recorded = False
+        try:
+            # 마감 시간에는 동시 호출 제한으로 기다리는 시간도 포함
+            text = await asyncio.wait_for(self._limited_call(contents), timeout or self.timeout)
+            self.breaker.record_success()
+            recorded = True
+            return text
+        except Exception as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            recorded = True
+            raise ModelUnavailable(str(e) or type(e).__name__) from e
+        finally:
+            if not recorded:
+                # 취소(CancelledError 등)로 중단된 호출
+                self.breaker.record_abandoned()
+
+    async def stream(self, contents, timeout=None):
+        """응답을 도착하는 대로 조각 단위로 내보내는 비동기 제너레이터
+
+        이미 내보낸 조각은 되돌릴 수 없으므로 헤지 재시도는 하지 않습니다.
+        마감 시간은 동시 호출 제한 대기와 각 조각 사이의 대기에 적용됩니다.
+        """
+        if not self.breaker.allow():
+            raise ModelUnavailable("circuit open")
+        self.calls += 1
+        timeout = timeout or self.timeout
+        recorded = False
+        acquired = False
+        try:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout)
+                acquired = True
+                chunks = self.transport.stream(contents).__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                    except StopAsyncIteration:
+                        break
+                    yield chunk
+            except Exception as e:
+                self.failures += 1
+                self.breaker.record_failure()
+                recorded = True
+                raise ModelUnavailable(str(e) or type(e).__name__) from e
+            self.breaker.record_success()
+            recorded = True
+        finally:
+            # 소비자가 스트림을 버리면(GeneratorExit/CancelledError) 결과 없이 끝남
+            if not recorded:
+                self.breaker.record_abandoned()
+            if acquired:
+                self._semaphore.release()
+
+
+class _LoopThread:
+    """스크립트 스레드에서 비동기 클라이언트를 쓰기 위한 전용 이벤트 루프 스레드"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="model-client", daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout=None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout)
+
+
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+def run_sync(coro, timeout=None):
+    """코루틴을 공유 이벤트 루프에서 실행하고 결과를 기다립니다."""
+    global _loop_thread
+    with _loop_lock:
+        if _loop_thread is None:
+            _loop_thread = _LoopThread()
+    return _loop_thread.run(coro, timeout)
+
+
+def iterate_sync(agen, timeout=None):
+    """비동기 제너레이터를 공유 이벤트 루프에서 한 조각씩 실행하는 일반 제너레이터"""
+    async def step():
+        try:
+            return True, await agen.__anext__()
+        except StopAsyncIteration:
+            return False, None
+
+    async def close():
+        await agen.aclose()
+
+    try:
+        while True:
+            has_item, item = run_sync(step(), timeout)
+            if not has_item:
+                return
+            yield item
+    finally:
+        # 중간에 멈춘 경우에도 동시 호출 슬롯을 돌려줌
+        run_sync(close(), timeout)
@@ -1,6 +1,33 @@
+import os
+import threading
 import google.generativeai as genai
-from datetime import datetime
-from .config import GEMINI_API_KEY, BOT_NAME, is_api_key_valid, HARMFUL_WORDS, WARNING_MESSAGE
+from services.word_matcher import WordMatcher
+from models.message import Message
+from .config import (GEMINI_API_KEY, BOT_NAME, MODEL_NAME, is_api_key_valid, HARMFUL_WORDS,
+                     WARNING_MESSAGE, MODEL_TIMEOUT, MODERATION_TIMEOUT, MODEL_MODERATION_ENABLED,
+                     RESPONSE_CACHE_PATH)
+from .context_manager import ChatContextManager
+from .async_client import AsyncModelClient, GeminiTransport, ModelUnavailable, run_sync, iterate_sync
+from .response_cache import ResponseCache, make_key
+
+MODERATION_PROMPT = (
+    "다음 채팅 메시지에 욕설이나 다른 사람을 비난하는 표현이 있으면 해당 단어만 쉼표로 구분해 "
+    "답하고, 없으면 '없음'이라고만 답하세요.\n메시지: {message}"
+)
+UNAVAILABLE_REPLY = "지금은 답변을 드리기 어려워요. 잠시 후 다시 시도해주세요. 🙏"
+WELCOME_TEMPLATE = f"👋 안녕하세요! {{username}}님! 저는 {BOT_NAME}입니다. 즐거운 채팅 되세요! (욕설/비난 감지 기능이 활성화되어 있습니다)"
+
+# 욕설/비난 단어 매처 (HARMFUL_WORDS가 바뀔 때만 다시 생성)
+_harmful_matcher = None
+_harmful_words = None
+
+def get_harmful_matcher():
+    global _harmful_matcher, _harmful_words
+    words = tuple(HARMFUL_WORDS)
+    if _harmful_matcher is None or words != _harmful_words:
+        _harmful_matcher = WordMatcher(words, ignore_case=True)
+        _harmful_words = words
+    return _harmful_matcher
 
 class BotManager:
     def __init__(self):
@@ -8,10 +35,15 @@ class BotManager:
         if is_api_key_valid():
             try:
                 genai.configure(api_key=GEMINI_API_KEY)
-                self.model = genai.GenerativeModel('gemini-pro')
-                self.chat = self.model.start_chat(history=[])
+                self.model = genai.GenerativeModel(MODEL_NAME)
+                self.contexts = ChatContextManager()  # 채팅방별 대화 기록
+                # 동시 호출 제한/마감 시간/헤지/회로 차단기를 갖춘 비동기 클라이언트
+                self.client = AsyncModelClient(GeminiTransport(self.model))
+                # 자주 오가는 질문/검열 결과는 모델 호출 없이 캐시에서 응답
+                self.response_cache = self._create_response_cache()
                 self.welcomed_users = set()
                 self.warning_counts = {}  # 사용자별 경고 횟수
+                self._warning_lock = threading.Lock()  # 검열 작업 스레드들이 함께 갱신
                 self.is_enabled = True
             except Exception as e:
                 print(f"Bot initialization error: {str(e)}")
@@ -26,33 +58,71 @@ class BotManager:
             
         self.welcomed_users.add(username)
         
-        return {
-            "role": "assistant",
-            "content": f"👋 안녕하세요! {username}님! 저는 {BOT_NAME}입니다. 즐거운 채팅 되세요! (욕설/비난 감지 기능이 활성화되어 있습니다)",
-            "username": BOT_NAME,
-            "time": datetime.now().strftime("%H:%M")
-        }
+        return Message.create("assistant", BOT_NAME, WELCOME_TEMPLATE.format(username=username)).to_dict()
 
     def check_harmful_content(self, message):
         """욕설/비난 감지 - 대소문자 구분 없이 검사"""
-        message = message.lower()  # 소문자로 변환
-        found_words = []
-        for word in HARMFUL_WORDS:
-            if word.lower() in message:  # 소문자로 변환하여 비교
-                found_words.append(word)
-        return found_words
+        return get_harmful_matcher().find_all(message)
+
+    def check_harmful_contents(self, messages):
+        """여러 메시지의 욕설/비난을 한 번에 감지합니다."""
+        return get_harmful_matcher().find_all_many(messages)
+
+    @staticmethod
+    def _create_response_cache():
+        if RESPONSE_CACHE_PATH:
+            try:
+                os.makedirs(os.path.dirname(RESPONSE_CACHE_PATH) or ".", exist_ok=True)
+                return ResponseCache(disk_path=RESPONSE_CACHE_PATH)
+            except Exception as e:
+                print(f"Response cache error: {str(e)}")
+        return ResponseCache()
+
+    @staticmethod
+    def _cache_key(prompt, kind, contents=None):
+        """캐시 키. 답변은 채팅방 대화 기록에 따라 달라지므로 이전 대화를 키에 포함합니다.
+
+        contents의 마지막 항목은 정규화되지 않은 프롬프트 자체이므로 제외하고,
+        프롬프트는 정규화해서 키에 넣습니다.
+        """
+        history = contents[:-1] if contents is not None else None
+        return make_key(prompt, MODEL_NAME, {"kind": kind, "bot": BOT_NAME}, history=history)
+
+    def _cached_generate(self, prompt, contents, kind, timeout, key_history=False):
+        """캐시에 같은 프롬프트의 응답이 있으면 사용하고, 없으면 모델을 호출해 저장합니다."""
+        key = self._cache_key(prompt, kind, contents if key_history else None)
+        answer = self.response_cache.get(key)
+        if answer is None:
+            answer = run_sync(self.client.generate(contents, timeout=timeout), timeout=timeout + 1)
+            self.response_cache.put(key, answer)
+        return answer
+
+    def check_with_model(self, message):
+        """모델로 욕설/비난을 감지합니다. 모델이 느리거나 차단된 경우 빈 목록을 반환합니다."""
+        contents = [{"role": "user", "parts": [MODERATION_PROMPT.format(message=message)]}]
+        try:
+            answer = self._cached_generate(message, contents, "moderation", MODERATION_TIMEOUT)
+        except (ModelUnavailable, TimeoutError):
+            return []
+        if "없음" in answer:
+            return []
+        # 실제 메시지에 있는 단어만 인정
+        return [word.strip() for word in answer.split(",") if word.strip() and word.strip() in message]
 
     def process_message(self, message, username):
         """메시지 처리 및 욕설/비난 감지"""
         if not self.is_enabled:
             return None
 
-        # 욕설/비난 감지
+        # 욕설/비난 감지 (로컬 단어 목록 우선, 걸리지 않으면 모델로 한 번 더 검사)
         harmful_words = self.check_harmful_content(message)
+        if not harmful_words and MODEL_MODERATION_ENABLED:
+            harmful_words = self.check_with_model(message)
         if harmful_words:
             # 경고 횟수 증가
-            self.warning_counts[username] = self.warning_counts.get(username, 0) + 1
-            count = self.warning_counts[username]
+            with self._warning_lock:
+                self.warning_counts[username] = self.warning_counts.get(username, 0) + 1
+                count = self.warning_counts[username]
             
             # 경고 메시지 생성
             warning = f"🚫 [{username}님께 드리는 {count}번째 경고] {WARNING_MESSAGE}\n"
@@ -61,11 +131,51 @@ class BotManager:
             if count >= 3:
                 warning += "\n❗️경고: 3회 이상 부적절한 언어를 사용하셨습니다. 계속되는 경우 제재 조치될 수 있습니다."
             
-            return {
-                "role": "assistant",
-                "content": warning,
-                "username": BOT_NAME,
-                "time": datetime.now().strftime("%H:%M")
-            }
+            return Message.create("assistant", BOT_NAME, warning).to_dict()
             
         return None
+
+    def generate_reply(self, message, room_id, username=None):
+        """채팅방 대화 기록을 바탕으로 봇 답변 메시지를 생성합니다."""
+        if not self.is_enabled:
+            return None
+
+        contents = self.contexts.build_contents(room_id, message, username)
+        try:
+            reply = self._cached_generate(message, contents, "reply", MODEL_TIMEOUT, key_history=True)
+            self.contexts.record(room_id, message, reply, username)
+        except (ModelUnavailable, TimeoutError):
+            reply = UNAVAILABLE_REPLY
+
+        return Message.create("assistant", BOT_NAME, reply).to_dict()
+
+    def stream_reply(self, message, room_id, username=None):
+        """봇 답변을 모델에서 도착하는 대로 조각 단위로 내보내는 제너레이터
+
+        답변이 끝나면 대화 기록과 응답 캐시에 한 번만 반영합니다.
+        """
+        if not self.is_enabled:
+            return
+
+        contents = self.contexts.build_contents(room_id, message, username)
+        key = self._cache_key(message, "reply", contents)
+        reply = self.response_cache.get(key)
+        if reply is not None:
+            self.contexts.record(room_id, message, reply, username)
+            yield reply
+            return
+
+        parts = []
+        try:
+            for chunk in iterate_sync(self.client.stream(contents, timeout=MODEL_TIMEOUT),
+                                      timeout=MODEL_TIMEOUT + 1):
+                parts.append(chunk)
+                yield chunk
+        except (ModelUnavailable, TimeoutError):
+            # 도중에 끊긴 답변은 기록/캐시하지 않음
+            yield ("\n\n" if parts else "") + UNAVAILABLE_REPLY
+            return
+
+        reply = "".join(parts)
+        self.contexts.record(room_id, message, reply, username)
+        self.response_cache.put(key, reply)
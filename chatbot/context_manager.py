@@ -0,0 +1,120 @@
+import time
+import threading
+from collections import OrderedDict, deque
+
+from .config import (CONTEXT_TOKEN_BUDGET, SUMMARY_TOKEN_BUDGET, MAX_CHAT_CONTEXTS,
+                     CONTEXT_IDLE_TIMEOUT, PER_USER_CONTEXT)
+
+
+def estimate_tokens(text):
+    """대략적인 토큰 수 추정 (한글/한자 등은 글자당 1토큰, 그 외는 4글자당 1토큰)"""
+    wide = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return wide + (len(text) - wide + 3) // 4
+
+
+class ChatContext:
+    """채팅방(또는 사용자) 하나의 대화 기록
+
+    최근 대화는 그대로 유지하고, 토큰 예산을 넘으면 가장 오래된 대화부터
+    요약 문자열로 접어 넣습니다. 요약도 예산을 넘으면 앞부분을 잘라냅니다.
+    """
+
+    def __init__(self, token_budget=CONTEXT_TOKEN_BUDGET, summary_budget=SUMMARY_TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.turns = deque()  # (role, text, tokens)
+        self.tokens = 0
+        self.summary = ""
+        self.last_used = time.monotonic()
+
+    def add_turn(self, role, text):
+        tokens = estimate_tokens(text)
+        self.turns.append((role, text, tokens))
+        self.tokens += tokens
+        self._trim()
+
+    def _trim(self):
+        # 마지막 대화 하나는 예산을 넘더라도 유지하고,
+        # 대화가 항상 사용자 차례로 시작하도록 봇 응답은 질문과 함께 접음
+        while self.turns and (
+                (self.tokens > self.token_budget and len(self.turns) > 1)
+                or self.turns[0][0] != "user"):
+            role, text, tokens = self.turns.popleft()
+            self.tokens -= tokens
+            self._fold(role, text)
+
+    def _fold(self, role, text):
+        speaker = "사용자" if role == "user" else "봇"
+        summary = f"{self.summary}\n{speaker}: {text}".strip()
+        # 요약 예산을 넘으면 오래된 앞부분부터 잘라냄
+        while estimate_tokens(summary) > self.summary_budget and "\n" in summary:
+            summary = summary.split("\n", 1)[1]
+        if estimate_tokens(summary) > self.summary_budget:
+            summary = summary[-self.summary_budget:]
+        self.summary = summary
+
+    def build_contents(self, message):
+        """Gemini generate_content에 보낼 대화 목록을 만듭니다."""
+        contents = []
+        if self.summary:
+            contents.append({"role": "user", "parts": [f"이전 대화 요약:\n{self.summary}"]})
+            contents.append({"role": "model", "parts": ["네, 이전 대화 내용을 참고하겠습니다."]})
+        contents.extend({"role": role, "parts": [text]} for role, text, _ in self.turns)
+        contents.append({"role": "user", "parts": [message]})
+        return contents
+
+
+class ChatContextManager:
+    """채팅방별(선택적으로 사용자별) 대화 기록 관리자
+
+    대화 기록은 LRU로 관리되어 max_contexts개를 넘거나 idle_timeout 동안
+    쓰이지 않으면 제거됩니다.
+    """
+
+    def __init__(self, max_contexts=MAX_CHAT_CONTEXTS, idle_timeout=CONTEXT_IDLE_TIMEOUT,
+                 token_budget=CONTEXT_TOKEN_BUDGET, per_user=PER_USER_CONTEXT):
+        self.max_contexts = max_contexts
+        self.idle_timeout = idle_timeout
+        self.token_budget = token_budget
+        self.per_user = per_user
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, room_id, username=None):
+        return (room_id, username) if self.per_user else (room_id, None)
+
+    def _evict(self, now):
+        while self._contexts:
+            key, context = next(iter(self._contexts.items()))
+            if len(self._contexts) > self.max_contexts or now - context.last_used > self.idle_timeout:
+                del self._contexts[key]
+            else:
+                break
+
+    def get(self, room_id, username=None):
+        now = time.monotonic()
+        key = self._key(room_id, username)
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is None:
+                context = ChatContext(self.token_budget)
+                self._contexts[key] = context
+            self._contexts.move_to_end(key)
+            context.last_used = now
+            self._evict(now)
+            return context
+
+    def build_contents(self, room_id, message, username=None):
+        context = self.get(room_id, username)
+        with self._lock:
+            return context.build_contents(message)
+
+    def record(self, room_id, message, reply, username=None):
+        """주고받은 대화를 기록합니다."""
+        context = self.get(room_id, username)
+        with self._lock:
+            context.add_turn("user", message)
+            context.add_turn("model", reply)
+
+    def __len__(self):
+        return len(self._contexts)
@@ -0,0 +1,119 @@
+"""로컬 가짜 모델 서버와 꼬리 지연 측정 도구
+
+    python -m chatbot.fake_model_server --port 8765 --latency 0.2 --tail-prob 0.05
+    python -m chatbot.fake_model_server --probe 200 --hedge 0.5
+
+--probe를 주면 서버를 같은 프로세스에서 띄운 뒤 AsyncModelClient로 요청을
+보내고 p50/p95/p99 지연과 실패 수를 출력합니다.
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+
+from .async_client import AsyncModelClient, HttpTransport, CircuitBreaker, ModelUnavailable
+
+
+class FakeModelServer:
+    """지정한 지연 분포와 실패율로 응답하는 HTTP 서버"""
+
+    def __init__(self, latency=0.1, tail_latency=2.0, tail_prob=0.0, error_rate=0.0, reply="없음"):
+        self.latency = latency
+        self.tail_latency = tail_latency
+        self.tail_prob = tail_prob
+        self.error_rate = error_rate
+        self.reply = reply
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        try:
+            headers = {}
+            await reader.readline()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(":")
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers.get("content-length", 0)))
+            self.requests += 1
+
+            delay = self.tail_latency if random.random() < self.tail_prob else self.latency
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+
+            if random.random() < self.error_rate:
+                status, body = "500 Internal Server Error", b"{}"
+            else:
+                status, body = "200 OK", json.dumps({"text": self.reply}, ensure_ascii=False).encode('utf-8')
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('ascii') + body
+            )
+            await writer.drain()
+        except (asyncio.CancelledError, ConnectionError, asyncio.IncompleteReadError):
+            # 헤지로 버려진 요청이나 종료 시 남은 연결
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+
+async def probe(server, requests, concurrency, timeout, hedge_delay):
+    port = await server.start()
+    client = AsyncModelClient(
+        HttpTransport(f"http://127.0.0.1:{port}/"),
+        max_concurrency=concurrency, timeout=timeout, hedge_delay=hedge_delay,
+        breaker=CircuitBreaker(failure_threshold=10 ** 9),
+    )
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            await client.generate([{"role": "user", "parts": ["안녕"]}])
+        except ModelUnavailable:
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    server.server.close()
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"requests={requests} failures={failures} hedged={client.hedged} "
+          f"p50={pct(0.50):.1f}ms p95={pct(0.95):.1f}ms p99={pct(0.99):.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Gemini 모델 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.1, help="기본 응답 지연 (초)")
+    parser.add_argument("--tail-latency", type=float, default=2.0, help="꼬리 응답 지연 (초)")
+    parser.add_argument("--tail-prob", type=float, default=0.0, help="꼬리 지연이 발생할 확률")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율")
+    parser.add_argument("--probe", type=int, default=0, help="이 개수만큼 요청을 보내 지연 측정")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--hedge", type=float, default=None, help="헤지 재시도 지연 (초)")
+    args = parser.parse_args()
+
+    server = FakeModelServer(args.latency, args.tail_latency, args.tail_prob, args.error_rate)
+    if args.probe:
+        asyncio.run(probe(server, args.probe, args.concurrency, args.timeout, args.hedge))
+        return
+
+    async def serve():
+        port = await server.start(port=args.port)
+        print(f"fake model server listening on 127.0.0.1:{port}")
+        await server.server.serve_forever()
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
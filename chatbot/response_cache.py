@@ -0,0 +1,107 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from .config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text):
+    """캐시 키용 프롬프트 정규화 (NFKC로 한글 자모 조합/전각 문자 통일, 대소문자, 공백)"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_key(prompt, model, settings=None, history=None):
+    """정규화된 프롬프트 + 모델 + 설정으로 캐시 키를 만듭니다.
+
+    history(프롬프트 앞의 대화 목록)가 있으면 그 해시도 키에 포함합니다.
+    """
+    settings = dict(settings or {})
+    if history:
+        settings["history"] = hashlib.sha256(
+            json.dumps(history, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+    raw = json.dumps([normalize_prompt(prompt), model, settings],
+                     ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """봇 응답 캐시 (메모리 LRU + TTL, 선택적으로 SQLite 디스크 계층)
+
+    메모리에 없으면 디스크 계층을 확인하고, 찾으면 메모리로 올립니다.
+    디스크 계층은 재시작 후에도 유지됩니다.
+    """
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL, disk_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._data[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, now)).fetchone()
+                if row is not None:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at))
+
+    def _remember(self, key, value, expires_at):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hit_ratio(),
+                'size': len(self._data),
+            }
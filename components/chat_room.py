@@ -1,6 +1,9 @@
 import json
 import os
 from datetime import datetime
+from services.message_log import get_message_log
+from services.room_buffer import get_room_buffer
+from services.room_index import RoomIndex
 
 ROOMS_FILE = "data/chat_rooms.json"
 
@@ -13,12 +16,31 @@ class ChatRoom:
         self.password = password
         self.members = [owner]
         self.invited_users = []
-        self.messages = []
         self.created_at = datetime.now().isoformat()
 
 class ChatRoomManager:
     def __init__(self):
         self.rooms = self.load_rooms()
+        self.index = RoomIndex(self._index_entry(room_id, room) for room_id, room in self.rooms.items())
+
+    @staticmethod
+    def _index_entry(room_id, room):
+        return {
+            'id': room_id,
+            'name': room.name,
+            'owner': room.owner,
+            'is_public': room.is_public,
+            'members': room.members,
+            'created_at': room.created_at
+        }
+
+    def _reindex(self, room_id):
+        """변경된 채팅방 하나만 인덱스에 반영합니다."""
+        room = self.rooms.get(room_id)
+        if room is None:
+            self.index.remove(room_id)
+        else:
+            self.index.upsert(self._index_entry(room_id, room))
 
     def load_rooms(self):
         if os.path.exists(ROOMS_FILE):
@@ -36,7 +58,6 @@ class ChatRoomManager:
                 'password': room.password,
                 'members': room.members,
                 'invited_users': room.invited_users,
-                'messages': room.messages,
                 'created_at': room.created_at
             } for room_id, room in self.rooms.items()
         }
@@ -47,12 +68,14 @@ class ChatRoomManager:
         room = ChatRoom(name, owner, is_public, password)
         self.rooms[room.id] = room
         self.save_rooms()
+        self._reindex(room.id)
         return room.id
 
     def delete_room(self, room_id, username):
         if room_id in self.rooms and self.rooms[room_id].owner == username:
             del self.rooms[room_id]
             self.save_rooms()
+            self._reindex(room_id)
             return True
         return False
 
@@ -76,6 +99,7 @@ class ChatRoomManager:
                     if username in room.invited_users:
                         room.invited_users.remove(username)
                     self.save_rooms()
+                    self._reindex(room_id)
                 return True, "채팅방에 입장했습니다."
             return False, "초대된 사용자만 입장할 수 있습니다."
         return False, "존재하지 않는 채팅방입니다."
@@ -89,6 +113,7 @@ class ChatRoomManager:
             elif username == room.owner and not room.members:
                 del self.rooms[room_id]
             self.save_rooms()
+            self._reindex(room_id)
             return True
         return False
 
@@ -97,15 +122,32 @@ class ChatRoomManager:
         if room and kicked_by == room.owner and username in room.members:
             room.members.remove(username)
             self.save_rooms()
+            self._reindex(room_id)
             return True
         return False
 
     def clear_all_rooms(self):
         """모든 채팅방 삭제"""
         self.rooms = {}
+        self.index = RoomIndex()
         if os.path.exists(ROOMS_FILE):
             os.remove(ROOMS_FILE)
         return True
 
     def get_room(self, room_id):
         return self.rooms.get(room_id)
+
+    def list_rooms(self, **options):
+        """인덱스에서 채팅방 한 페이지와 다음 페이지 커서를 반환합니다."""
+        return self.index.list_rooms(**options)
+
+    def add_message(self, room_id, message):
+        """채팅방 메시지 로그에 메시지를 추가하고 순번을 반환합니다."""
+        return get_message_log(room_id).append(message)
+
+    def get_messages(self, room_id, limit=100):
+        """채팅방의 최근 메시지를 반환합니다. (링 버퍼 크기 이내면 디스크를 읽지 않음)"""
+        buffer = get_room_buffer(room_id)
+        if limit <= buffer.capacity:
+            return [message.to_dict() for message in buffer.read_last(limit)]
+        return get_message_log(room_id).read_last(limit)
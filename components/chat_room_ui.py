@@ -1,5 +1,7 @@
 import streamlit as st
 from .chat_room import ChatRoomManager
+from notifications.notification_manager import show_room_created_notification
+from .room_list import show_room_page
 
 class ChatRoomUI:
     def __init__(self):
@@ -23,6 +25,8 @@ class ChatRoomUI:
                     is_public=is_public,
                     password=password
                 )
+                if is_public:
+                    show_room_created_notification(st.session_state.username, name)
                 st.success("채팅방이 생성되었습니다!")
                 st.session_state.current_room = room_id
                 st.session_state.show_room = True
@@ -34,40 +38,47 @@ class ChatRoomUI:
     def show_room_list(self):
         st.markdown("### 채팅방 목록")
         
-        rooms = self.room_manager.rooms
-        if not rooms:
+        if not self.room_manager.rooms:
             st.info("현재 생성된 채팅방이 없습니다.")
             return
 
-        for room_id, room in rooms.items():
-            col1, col2 = st.columns([3, 1])
+        def fetch(sort, cursor, query):
+            return self.room_manager.list_rooms(sort=sort, cursor=cursor, query=query)
+
+        if not show_room_page("chat_room_list", fetch, self.show_room_item):
+            st.info("검색 결과가 없습니다.")
+
+    def show_room_item(self, room_data):
+        room_id = room_data['id']
+        room = self.room_manager.get_room(room_id)
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            room_info = f"🏠 {room.name} ({len(room.members)}명)"
+            if not room.is_public:
+                room_info += " 🔒"
+            st.markdown(room_info)
             
-            with col1:
-                room_info = f"🏠 {room.name} ({len(room.members)}명)"
-                if not room.is_public:
-                    room_info += " 🔒"
-                st.markdown(room_info)
-                
-            with col2:
-                if st.button("입장하기", key=f"join_room_{room_id}"):
-                    if room.is_public:
-                        success, message = self.room_manager.join_room(room_id, st.session_state.username)
-                    else:
-                        password = st.text_input("비밀번호를 입력하세요", 
-                                               type="password", 
-                                               key=f"pwd_input_{room_id}")
-                        if password:
-                            success, message = self.room_manager.join_room(
-                                room_id, 
-                                st.session_state.username, 
-                                password
-                            )
-                        else:
-                            success, message = False, "비밀번호를 입력해주세요."
-                    
-                    if success:
-                        st.session_state.current_room = room_id
-                        st.session_state.show_room = True
-                        st.rerun()
+        with col2:
+            if st.button("입장하기", key=f"join_room_{room_id}"):
+                if room.is_public:
+                    success, message = self.room_manager.join_room(room_id, st.session_state.username)
+                else:
+                    password = st.text_input("비밀번호를 입력하세요", 
+                                           type="password", 
+                                           key=f"pwd_input_{room_id}")
+                    if password:
+                        success, message = self.room_manager.join_room(
+                            room_id, 
+                            st.session_state.username, 
+                            password
+                        )
                     else:
-                        st.error(message)
+                        success, message = False, "비밀번호를 입력해주세요."
+                
+                if success:
+                    st.session_state.current_room = room_id
+                    st.session_state.show_room = True
+                    st.rerun()
+                else:
+                    st.error(message)
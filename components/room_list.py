@@ -0,0 +1,40 @@
+import streamlit as st
+from services.room_index import SORT_RECENT, SORT_MEMBERS
+
+SORT_LABELS = {SORT_RECENT: "최신순", SORT_MEMBERS: "참여자순"}
+
+
+def show_room_page(key, fetch, render_room):
+    """검색/정렬 입력과 함께 채팅방 목록 한 페이지를 표시합니다.
+
+    fetch(sort, cursor, query)는 (채팅방 목록, 다음 커서)를 반환해야 합니다.
+    이전 페이지로 돌아갈 수 있도록 지나온 페이지의 커서를 세션에 쌓아 둡니다.
+    반환값은 표시한 채팅방 수입니다.
+    """
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        query = st.text_input("채팅방 검색 (이름/주제)", key=f"{key}_query").strip()
+    with col2:
+        sort = st.selectbox("정렬", list(SORT_LABELS), format_func=SORT_LABELS.get, key=f"{key}_sort")
+
+    # 검색어나 정렬이 바뀌면 첫 페이지부터
+    state = st.session_state
+    if state.get(f"{key}_view") != (query, sort):
+        state[f"{key}_view"] = (query, sort)
+        state[f"{key}_cursors"] = [None]
+    cursors = state[f"{key}_cursors"]
+
+    rooms, next_cursor = fetch(sort, cursors[-1], query or None)
+    for room in rooms:
+        render_room(room)
+
+    col1, _, col2 = st.columns([1, 2, 1])
+    with col1:
+        if len(cursors) > 1 and st.button("◀ 이전", key=f"{key}_prev"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if next_cursor is not None and st.button("다음 ▶", key=f"{key}_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+    return len(rooms)
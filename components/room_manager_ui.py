@@ -1,39 +1,46 @@
 import streamlit as st
 from services.room_manager import RoomManager
+from notifications.notification_manager import show_room_created_notification
+from components.room_list import show_room_page
 
 class RoomManagerUI:
     def __init__(self):
         self.room_manager = RoomManager()
 
     def show_room_list(self):
-        """채팅방 목록을 표시합니다."""
+        """채팅방 목록을 한 페이지씩 표시합니다."""
         st.markdown("### 💭 채팅방 목록")
-        rooms = self.room_manager.load_rooms()
-        
-        if not rooms:
+        if not len(self.room_manager.index):
             st.info("현재 활성화된 채팅방이 없습니다.")
             return
 
-        for room_id, room_data in rooms.items():
-            with st.container():
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    room_info = f"""
-                    ### 🏠 {room_data['name']}
-                    """
-                    if room_data['topic']:
-                        room_info += f"\n📌 주제: {room_data['topic']}"
-                    if not room_data['is_public']:
-                        room_info += "\n🔒 비공개방"
-                    room_info += f"\n👥 참여자 수: {len(room_data['members'])}명"
-                    st.markdown(room_info)
-                
-                with col2:
-                    if st.button("입장하기", key=f"join_{room_id}"):
-                        st.session_state.current_room = room_id
-                        st.session_state.show_room = True
-                        st.rerun()
-                st.markdown("---")
+        def fetch(sort, cursor, query):
+            return self.room_manager.list_rooms(sort=sort, cursor=cursor, query=query)
+
+        if not show_room_page("room_list", fetch, self.show_room_item):
+            st.info("검색 결과가 없습니다.")
+
+    def show_room_item(self, room_data):
+        room_id = room_data['id']
+        with st.container():
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                room_info = f"""
+                ### 🏠 {room_data['name']}
+                """
+                if room_data['topic']:
+                    room_info += f"\n📌 주제: {room_data['topic']}"
+                if not room_data['is_public']:
+                    room_info += "\n🔒 비공개방"
+                room_info += f"\n👥 참여자 수: {len(room_data['members'])}명"
+                st.markdown(room_info)
+            
+            with col2:
+                if st.button("입장하기", key=f"join_{room_id}"):
+                    st.session_state.current_room = room_id
+                    st.session_state.show_room = True
+                    st.rerun()
+            st.markdown("---")
 
     def show_create_room_form(self):
         st.markdown("### 💬 새로운 채팅방 만들기")
@@ -54,6 +61,8 @@ class RoomManagerUI:
                         password=password,
                         topic=topic
                     )
+                    if is_public:
+                        show_room_created_notification(st.session_state.username, name)
                     st.session_state.current_room = room.id
                     st.session_state.show_create_room = False
                     st.session_state.show_room = True
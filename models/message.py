@@ -0,0 +1,239 @@
+from datetime import datetime
+import struct
+import json
+import time
+import sys
+
+# 디스크 레코드 형식 (메시지 로그의 각 레코드)
+#   JSON 레코드: '{'로 시작하고 줄바꿈으로 끝나는 한 줄 (이전 형식, 그대로 읽음)
+#   압축 레코드: RECORD_MAGIC + 본문 길이(4바이트) + 본문
+#     본문 = 역할 코드(1) + 검열 상태 코드(1) + 플래그(1) + 작성 시각 epoch ms(8)
+#            + 닉네임 길이(2) + 닉네임 + 내용 길이(4) + 내용
+#            [+ target(8)] [+ 이전 형식 시각 문자열 길이(1) + 문자열]
+#   순번(seq)은 세그먼트 안의 위치로 정해지므로 저장하지 않습니다.
+RECORD_MAGIC = 0x01
+RECORD_HEADER = struct.Struct(">BI")
+BODY_HEADER = struct.Struct(">BBBq")
+USERNAME_LEN = struct.Struct(">H")
+CONTENT_LEN = struct.Struct(">I")
+TARGET = struct.Struct(">q")
+
+ROLES = ("user", "assistant")
+STATUSES = (None, "pending", "approved", "rejected")
+_ROLE_CODES = {role: i for i, role in enumerate(ROLES)}
+_STATUS_CODES = {status: i for i, status in enumerate(STATUSES)}
+
+FLAG_TIMESTAMP = 0x01
+FLAG_TARGET = 0x02
+FLAG_TIME_TEXT = 0x04
+
+TIME_FORMAT = "%H:%M"
+# 압축 레코드로 저장할 수 있는 딕셔너리 키 (그 밖의 키가 있으면 JSON으로 저장)
+ENCODABLE_KEYS = frozenset(("role", "content", "username", "time", "timestamp", "status", "target", "seq"))
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+class Message:
+    """채팅 메시지 한 개 (변경 불가)
+
+    딕셔너리 대신 __slots__ 객체로 보관해 메시지당 메모리를 줄입니다.
+    역할/닉네임은 intern된 문자열을 공유하고, 작성 시각은 epoch 밀리초
+    정수로 보관했다가 화면에 그릴 때만 "HH:MM"으로 변환합니다.
+    기존 코드와는 to_dict()/from_dict()로 주고받습니다.
+    """
+
+    __slots__ = ("role", "username", "content", "timestamp_ms", "seq", "status", "target", "time_text")
+
+    def __init__(self, role, username, content, timestamp_ms=None, seq=None,
+                 status=None, target=None, time_text=None):
+        setattr_ = object.__setattr__
+        setattr_(self, "role", sys.intern(role))
+        setattr_(self, "username", sys.intern(username))
+        setattr_(self, "content", content)
+        setattr_(self, "timestamp_ms", timestamp_ms)
+        setattr_(self, "seq", seq)
+        setattr_(self, "status", status)
+        setattr_(self, "target", target)
+        # 작성 시각이 없는 이전 형식 메시지의 "HH:MM" 문자열
+        setattr_(self, "time_text", time_text)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Message는 변경할 수 없습니다. replace()를 사용하세요.")
+
+    def __eq__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        return hash((self.username, self.timestamp_ms, self.seq, self.content))
+
+    def __repr__(self):
+        return f"Message(seq={self.seq}, username={self.username!r}, time={self.time!r}, content={self.content[:20]!r})"
+
+    @staticmethod
+    def create(role, username, content, **kwargs):
+        """현재 시각으로 새 메시지를 만듭니다."""
+        return Message(role, username, content, timestamp_ms=now_ms(), **kwargs)
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return Message(**values)
+
+    # 시각
+    @property
+    def timestamp(self):
+        """초 단위 작성 시각 (이전 형식 메시지는 None)"""
+        return self.timestamp_ms / 1000 if self.timestamp_ms is not None else None
+
+    def format_time(self, fmt=TIME_FORMAT):
+        if self.timestamp_ms is None:
+            return self.time_text or ""
+        return datetime.fromtimestamp(self.timestamp_ms / 1000).strftime(fmt)
+
+    @property
+    def time(self):
+        return self.format_time()
+
+    # 딕셔너리 변환
+    def to_dict(self):
+        data = {
+            "role": self.role,
+            "content": self.content,
+            "username": self.username,
+            "time": self.format_time(),
+        }
+        if self.timestamp_ms is not None:
+            data["timestamp"] = self.timestamp
+        if self.status is not None:
+            data["status"] = self.status
+        if self.target is not None:
+            data["target"] = self.target
+        if self.seq is not None:
+            data["seq"] = self.seq
+        return data
+
+    @staticmethod
+    def from_dict(data):
+        timestamp = data.get("timestamp")
+        return Message(
+            data["role"],
+            data["username"],
+            data["content"],
+            timestamp_ms=int(round(timestamp * 1000)) if timestamp is not None else None,
+            seq=data.get("seq"),
+            status=data.get("status"),
+            target=data.get("target"),
+            time_text=None if timestamp is not None else data.get("time"),
+        )
+
+    # 압축 레코드
+    def encodable(self):
+        return (self.role in _ROLE_CODES and self.status in _STATUS_CODES
+                and len(self.username.encode('utf-8')) <= 0xFFFF
+                and len((self.time_text or "").encode('utf-8')) <= 0xFF)
+
+    def encode(self):
+        """압축 레코드 바이트열 (encodable()이 참일 때만 사용)"""
+        flags = 0
+        if self.timestamp_ms is not None:
+            flags |= FLAG_TIMESTAMP
+        if self.target is not None:
+            flags |= FLAG_TARGET
+        if self.time_text is not None:
+            flags |= FLAG_TIME_TEXT
+        username = self.username.encode('utf-8')
+        content = self.content.encode('utf-8')
+        parts = [
+            BODY_HEADER.pack(_ROLE_CODES[self.role], _STATUS_CODES[self.status], flags, self.timestamp_ms or 0),
+            USERNAME_LEN.pack(len(username)), username,
+            CONTENT_LEN.pack(len(content)), content,
+        ]
+        if self.target is not None:
+            parts.append(TARGET.pack(self.target))
+        if self.time_text is not None:
+            time_text = self.time_text.encode('utf-8')
+            parts.extend((bytes((len(time_text),)), time_text))
+        body = b"".join(parts)
+        return RECORD_HEADER.pack(RECORD_MAGIC, len(body)) + body
+
+    @staticmethod
+    def decode(data, seq=None):
+        """encode()로 만든 레코드를 읽습니다. (data는 헤더를 포함한 레코드 전체)"""
+        view = memoryview(data)
+        pos = RECORD_HEADER.size
+        role, status, flags, timestamp_ms = BODY_HEADER.unpack_from(view, pos)
+        pos += BODY_HEADER.size
+        (length,) = USERNAME_LEN.unpack_from(view, pos)
+        pos += USERNAME_LEN.size
+        username = str(view[pos:pos + length], 'utf-8')
+        pos += length
+        (length,) = CONTENT_LEN.unpack_from(view, pos)
+        pos += CONTENT_LEN.size
+        content = str(view[pos:pos + length], 'utf-8')
+        pos += length
+        target = None
+        if flags & FLAG_TARGET:
+            (target,) = TARGET.unpack_from(view, pos)
+            pos += TARGET.size
+        time_text = None
+        if flags & FLAG_TIME_TEXT:
+            length = view[pos]
+            time_text = str(view[pos + 1:pos + 1 + length], 'utf-8')
+        return Message(
+            ROLES[role], username, content,
+            timestamp_ms=timestamp_ms if flags & FLAG_TIMESTAMP else None,
+            seq=seq, status=STATUSES[status], target=target, time_text=time_text,
+        )
+
+
+def encode_record(message, seq):
+    """메시지(Message 또는 딕셔너리)를 로그 레코드로 만듭니다.
+
+    압축 레코드로 나타낼 수 없는 메시지(알 수 없는 키/역할/상태)는
+    이전과 같은 JSON 한 줄로 저장합니다.
+    """
+    if isinstance(message, Message):
+        if message.encodable():
+            return message.encode()
+        data = dict(message.to_dict(), seq=seq)
+    else:
+        data = dict(message, seq=seq)
+        if (ENCODABLE_KEYS.issuperset(data)
+                and all(isinstance(data.get(key), str) for key in ("role", "username", "content"))
+                and isinstance(data.get("timestamp", 0), (int, float))
+                and isinstance(data.get("target", 0), int)
+                and isinstance(data.get("status", ""), str)
+                and isinstance(data.get("time", ""), str)):
+            message = Message.from_dict(data)
+            if message.encodable():
+                return message.encode()
+    return json.dumps(data, ensure_ascii=False).encode('utf-8') + b"\n"
+
+
+def decode_record(raw, seq):
+    """로그 레코드 하나를 메시지 딕셔너리로 읽습니다."""
+    if raw[:1] == b"{":
+        return json.loads(raw)
+    return Message.decode(raw, seq=seq).to_dict()
+
+
+def record_length(f):
+    """f의 현재 위치에서 시작하는 완전한 레코드의 길이를 반환합니다. (잘렸으면 0)"""
+    start = f.tell()
+    head = f.read(RECORD_HEADER.size)
+    if not head:
+        return 0
+    if head[:1] == b"{":
+        f.seek(start)
+        line = f.readline()
+        return len(line) if line.endswith(b"\n") else 0
+    if len(head) < RECORD_HEADER.size or head[0] != RECORD_MAGIC:
+        return 0
+    (length,) = RECORD_HEADER.unpack(head)[1:]
+    body = f.read(length)
+    return RECORD_HEADER.size + length if len(body) == length else 0
@@ -0,0 +1,75 @@
+import time
+import threading
+from collections import deque
+
+LOBBY_ROOM_ID = "lobby"
+EVENT_BUFFER_SIZE = 200  # 채팅방별로 보관할 최근 이벤트 수
+EVENT_TTL = 60  # 이 시간(초)이 지난 이벤트는 알림으로 표시하지 않음
+
+
+class EventBus:
+    """채팅방별 알림 이벤트 큐
+
+    입장/퇴장/채팅방 이벤트는 채팅방별 순번과 함께 고정 크기 큐에 쌓이고,
+    각 세션은 자신의 커서(마지막으로 본 순번) 이후의 이벤트만 가져갑니다.
+    """
+
+    def __init__(self, buffer_size=EVENT_BUFFER_SIZE, ttl=EVENT_TTL):
+        self.buffer_size = buffer_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._queues = {}  # room_id -> deque of events
+        self._seqs = {}    # room_id -> 마지막 이벤트 순번
+
+    def publish(self, room_id, event_type, username, **data):
+        """이벤트를 발행하고 부여된 순번을 반환합니다."""
+        with self._lock:
+            seq = self._seqs.get(room_id, 0) + 1
+            self._seqs[room_id] = seq
+            queue = self._queues.get(room_id)
+            if queue is None:
+                queue = self._queues[room_id] = deque(maxlen=self.buffer_size)
+            queue.append({
+                'seq': seq,
+                'type': event_type,
+                'room_id': room_id,
+                'username': username,
+                'timestamp': time.time(),
+                **data
+            })
+            return seq
+
+    def head(self, room_id):
+        """채팅방의 마지막 이벤트 순번 (새 세션의 시작 커서)"""
+        with self._lock:
+            return self._seqs.get(room_id, 0)
+
+    def consume(self, room_id, cursor):
+        """cursor 이후의 이벤트와 새 커서를 반환합니다."""
+        with self._lock:
+            head = self._seqs.get(room_id, 0)
+            if cursor >= head:
+                return [], head
+            queue = self._queues.get(room_id, ())
+            # 최근 이벤트부터 거꾸로 훑어 커서 이후 구간만 꺼냄
+            events = []
+            for event in reversed(queue):
+                if event['seq'] <= cursor:
+                    break
+                events.append(event)
+        events.reverse()
+        deadline = time.time() - self.ttl
+        return [event for event in events if event['timestamp'] >= deadline], head
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus():
+    """프로세스 전체에서 공유되는 이벤트 버스를 반환합니다."""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = EventBus()
+        return _bus
@@ -1,18 +1,36 @@
 import streamlit as st
-import time
+from .event_bus import get_event_bus, LOBBY_ROOM_ID
 
-def show_notification(username):
-    """채팅방 입장 알림을 표시합니다."""
-    with st.container():
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            st.info(f"🎉 {username}님이 채팅방에 입장하셨습니다!")
-            time.sleep(2)
+EVENT_MESSAGES = {
+    'join': ("🎉", "{username}님이 채팅방에 입장하셨습니다!"),
+    'leave': ("👋", "{username}님이 채팅방을 나가셨습니다."),
+    'room_created': ("🏠", "{username}님이 '{room_name}' 채팅방을 만들었습니다."),
+}
 
-def show_exit_notification(username):
-    """채팅방 퇴장 알림을 표시합니다."""
-    with st.container():
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            st.warning(f"👋 {username}님이 채팅방을 나가셨습니다.")
-            time.sleep(2)
+def show_notification(username, room_id=LOBBY_ROOM_ID):
+    """채팅방 입장 알림을 발행합니다."""
+    get_event_bus().publish(room_id, 'join', username)
+
+def show_exit_notification(username, room_id=LOBBY_ROOM_ID):
+    """채팅방 퇴장 알림을 발행합니다."""
+    get_event_bus().publish(room_id, 'leave', username)
+
+def show_room_created_notification(username, room_name, room_id=LOBBY_ROOM_ID):
+    """채팅방 생성 알림을 발행합니다."""
+    get_event_bus().publish(room_id, 'room_created', username, room_name=room_name)
+
+def render_notifications(room_id=LOBBY_ROOM_ID):
+    """이 세션이 아직 보지 못한 채팅방 이벤트를 토스트로 표시합니다."""
+    bus = get_event_bus()
+    if 'notification_cursors' not in st.session_state:
+        st.session_state.notification_cursors = {}
+    cursors = st.session_state.notification_cursors
+    if room_id not in cursors:
+        # 새 세션은 지금 이후의 이벤트부터 표시
+        cursors[room_id] = bus.head(room_id)
+        return
+
+    events, cursors[room_id] = bus.consume(room_id, cursors[room_id])
+    for event in events:
+        icon, template = EVENT_MESSAGES.get(event['type'], ("🔔", "{username}: {type}"))
+        st.toast(template.format(**event), icon=icon)
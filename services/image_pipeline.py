@@ -0,0 +1,192 @@
+import os
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+THUMBNAIL_SIZES = (100, 200)  # 사이드바(100), 프로필 설정(200)에서 쓰는 크기
+THUMBNAIL_FORMATS = ("WEBP", "PNG")  # 앞에서부터 지원되는 형식 사용
+ORIGINAL_SIZE = 200  # 원본도 기존처럼 200x200으로 저장
+IMAGE_WORKERS = 2
+BYTES_CACHE_SIZE = 256  # 메모리에 유지할 썸네일 수
+PLACEHOLDER_IMAGE = "default.png"  # 처리에 실패한 이미지 대신 보여줄 기본 이미지
+
+
+class ImagePipeline:
+    """내용 해시 기반 프로필 이미지 저장소
+
+    업로드된 이미지는 sha256 해시로 이름을 붙여 저장하므로 같은 이미지는
+    한 번만 저장됩니다. 디코딩/리사이즈는 작업 스레드 풀에서 처리하고,
+    UI에서 쓰는 크기의 썸네일을 미리 만들어 바이트 그대로 메모리에
+    캐싱하므로 렌더링 시에는 디코딩이 필요 없습니다.
+    """
+
+    def __init__(self, image_dir, sizes=THUMBNAIL_SIZES, max_workers=IMAGE_WORKERS,
+                 cache_size=BYTES_CACHE_SIZE):
+        self.image_dir = image_dir
+        self.sizes = sizes
+        self.cache_size = cache_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # (image_name, size) -> bytes
+        self._pending = {}           # image_name -> Future
+        self._failed = set()         # 디코딩/리사이즈에 실패한 이미지 이름
+        self._format = self._pick_format()
+
+    @staticmethod
+    def _pick_format():
+        Image.init()
+        for fmt in THUMBNAIL_FORMATS:
+            if fmt in Image.SAVE:
+                return fmt
+        return "PNG"
+
+    def _thumbnail_path(self, image_name, size):
+        stem = os.path.splitext(image_name)[0]
+        return os.path.join(self.image_dir, f"{stem}_{size}.{self._format.lower()}")
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._cache[key] = data
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _render(self, img, image_name):
+        """원본 이미지 객체로부터 모든 크기의 썸네일을 만들어 저장합니다."""
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        for size in self.sizes:
+            buf = io.BytesIO()
+            img.resize((size, size)).save(buf, format=self._format)
+            data = buf.getvalue()
+            path = self._thumbnail_path(image_name, size)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._remember((image_name, size), data)
+
+    def _process_upload(self, data, image_name):
+        try:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+            original_path = os.path.join(self.image_dir, image_name)
+            if not os.path.exists(original_path):
+                tmp_path = original_path + ".tmp"
+                img.resize((ORIGINAL_SIZE, ORIGINAL_SIZE)).save(tmp_path, format="PNG")
+                os.replace(tmp_path, original_path)
+            self._render(img, image_name)
+        except Exception as e:
+            self._fail(image_name, e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(image_name, None)
+
+    def _process_existing(self, image_name):
+        try:
+            with Image.open(os.path.join(self.image_dir, image_name)) as img:
+                img.load()
+                self._render(img, image_name)
+        except Exception as e:
+            self._fail(image_name, e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(image_name, None)
+
+    def _schedule(self, image_name, fn, *args):
+        with self._lock:
+            if image_name in self._pending:
+                return self._pending[image_name]
+            future = self._executor.submit(fn, *args)
+            self._pending[image_name] = future
+            return future
+
+    def submit(self, data, on_failed=None):
+        """업로드된 이미지 바이트를 등록하고 저장될 이미지 이름을 반환합니다.
+
+        파일 구조만 확인한 뒤 바로 반환하며, 실제 디코딩/리사이즈는 작업 스레드에서
+        진행됩니다. 이미 저장된 이미지라면 아무 작업도 하지 않습니다.
+        작업 스레드에서 실패하면 on_failed(image_name)을 호출합니다.
+        """
+        image_name = hashlib.sha256(data).hexdigest()[:32] + ".png"
+        if self._is_ready(image_name):
+            return image_name
+        # 이미지가 아니거나 잘린 파일이면 여기서 예외 발생 (픽셀 디코딩은 하지 않음)
+        Image.open(io.BytesIO(data)).verify()
+        with self._lock:
+            self._failed.discard(image_name)
+        future = self._schedule(image_name, self._process_upload, data, image_name)
+        future.add_done_callback(lambda f: self._check(f, image_name, on_failed))
+        return image_name
+
+    def _fail(self, image_name, error):
+        # 작업 대기 목록에서 빠지기 전에 기록해 같은 이미지를 다시 예약하지 않도록 함
+        print(f"Profile image processing error ({image_name}): {str(error)}")
+        with self._lock:
+            self._failed.add(image_name)
+
+    def _check(self, future, image_name, on_failed):
+        if future.exception() is None:
+            return
+        if on_failed is not None:
+            try:
+                on_failed(image_name)
+            except Exception as e:
+                print(f"Profile image failure handler error: {str(e)}")
+
+    def failed(self, image_name):
+        """작업 스레드에서 처리에 실패한 이미지인지 여부"""
+        with self._lock:
+            return image_name in self._failed
+
+    def _is_ready(self, image_name):
+        if not os.path.exists(os.path.join(self.image_dir, image_name)):
+            return False
+        return all(os.path.exists(self._thumbnail_path(image_name, size)) for size in self.sizes)
+
+    def thumbnail(self, image_name, size):
+        """캐싱된 썸네일 바이트를 반환합니다. 아직 준비되지 않았으면 None.
+
+        처리에 실패한 이미지는 다시 디코딩하지 않고 기본 이미지의 썸네일을 반환합니다.
+        """
+        if self.failed(image_name):
+            if image_name == PLACEHOLDER_IMAGE:
+                return None
+            image_name = PLACEHOLDER_IMAGE
+        key = (image_name, size)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+
+        path = self._thumbnail_path(image_name, size)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self._remember(key, data)
+            return data
+
+        # 이전 방식으로 저장된 이미지는 백그라운드에서 썸네일 생성
+        if size in self.sizes and os.path.exists(os.path.join(self.image_dir, image_name)):
+            self._schedule(image_name, self._process_existing, image_name)
+        return None
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_image_pipeline(image_dir):
+    """프로세스 전체에서 공유되는 이미지 파이프라인을 반환합니다."""
+    with _pipelines_lock:
+        pipeline = _pipelines.get(image_dir)
+        if pipeline is None:
+            pipeline = ImagePipeline(image_dir)
+            _pipelines[image_dir] = pipeline
+        return pipeline
@@ -0,0 +1,67 @@
+import copy
+import threading
+from collections import OrderedDict
+
+
+class VersionedLRUCache:
+    """버전 검증 LRU 캐시
+
+    version()이 반환하는 값(원본 파일이 외부에서 바뀐 횟수 등)이 바뀌면 캐시
+    전체를 무효화하고, 항목 하나가 바뀌면 invalidate(key)로 그 항목만 지웁니다. 항목 수는 maxsize로 제한되며 가장 오래 쓰지 않은 항목부터
+    제거됩니다. 호출자가 값을 수정해도 캐시가 오염되지 않도록 복사본을
+    반환합니다.
+    """
+
+    def __init__(self, maxsize=1024, version=None, copy_value=copy.copy):
+        self.maxsize = maxsize
+        self._version_fn = version
+        self._copy = copy_value
+        self._version = None
+        self._generation = 0  # invalidate()가 호출될 때마다 증가
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        """key의 값을 반환합니다. 캐시에 없으면 loader(key)로 읽어 저장합니다."""
+        version = self._version_fn() if self._version_fn else None
+        with self._lock:
+            if version != self._version:
+                self._data.clear()
+                self._version = version
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._copy(self._data[key])
+            self.misses += 1
+            generation = self._generation
+
+        value = loader(key)
+        with self._lock:
+            # 읽는 동안 버전이 바뀌거나 항목이 무효화되지 않았을 때만 저장
+            if self._version == version and self._generation == generation:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return self._copy(value)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
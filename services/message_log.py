@@ -0,0 +1,291 @@
+import os
+import bisect
+import struct
+import threading
+
+from models.message import encode_record, decode_record, record_length
+from services.metrics import METRICS_ENABLED, add_bytes
+
+MESSAGES_DIR = os.path.join("data", "messages")
+SEGMENT_MAX_BYTES = 4 * 1024 * 1024  # 세그먼트 파일 최대 크기 (4MB)
+
+# 인덱스 엔트리: 세그먼트 내 바이트 오프셋(8바이트) + 레코드 길이(4바이트)
+INDEX_ENTRY = struct.Struct(">QI")
+SEGMENT_SUFFIX = ".log"
+INDEX_SUFFIX = ".idx"
+
+
+class _Segment:
+    """하나의 세그먼트 파일과 그 인덱스 파일"""
+
+    def __init__(self, directory, base_seq):
+        self.base_seq = base_seq
+        name = f"{base_seq:020d}"
+        self.log_path = os.path.join(directory, name + SEGMENT_SUFFIX)
+        self.index_path = os.path.join(directory, name + INDEX_SUFFIX)
+        self.count = 0
+        self.size = 0
+
+    @property
+    def end_seq(self):
+        return self.base_seq + self.count
+
+    def recover(self):
+        """인덱스와 로그 파일 크기를 맞추고 엔트리 수를 복구합니다."""
+        for path in (self.log_path, self.index_path):
+            if not os.path.exists(path):
+                open(path, 'ab').close()
+
+        log_size = os.path.getsize(self.log_path)
+        index_size = os.path.getsize(self.index_path)
+        count = index_size // INDEX_ENTRY.size
+
+        # 로그보다 앞서 기록된 인덱스 꼬리는 버림
+        with open(self.index_path, 'rb') as f:
+            while count > 0:
+                f.seek((count - 1) * INDEX_ENTRY.size)
+                offset, length = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+                if offset + length <= log_size:
+                    break
+                count -= 1
+
+        end = 0
+        if count > 0:
+            with open(self.index_path, 'rb') as f:
+                f.seek((count - 1) * INDEX_ENTRY.size)
+                offset, length = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+                end = offset + length
+
+        # 인덱스에 기록되지 못한 완전한 레코드는 다시 인덱싱, 잘린 레코드는 버림
+        entries = []
+        with open(self.log_path, 'rb') as f:
+            f.seek(end)
+            while True:
+                length = record_length(f)
+                if not length:
+                    break
+                entries.append(INDEX_ENTRY.pack(end, length))
+                end += length
+                f.seek(end)
+
+        with open(self.index_path, 'r+b') as f:
+            f.truncate(count * INDEX_ENTRY.size)
+            f.seek(0, os.SEEK_END)
+            f.write(b"".join(entries))
+        with open(self.log_path, 'r+b') as f:
+            f.truncate(end)
+
+        self.count = count + len(entries)
+        self.size = end
+
+    def read(self, start, stop):
+        """세그먼트 안의 [start, stop) 순번 레코드를 읽습니다."""
+        first = start - self.base_seq
+        last = stop - self.base_seq
+        if first >= last:
+            return []
+
+        with open(self.index_path, 'rb') as f:
+            f.seek(first * INDEX_ENTRY.size)
+            raw = f.read((last - first) * INDEX_ENTRY.size)
+        entries = [INDEX_ENTRY.unpack_from(raw, i) for i in range(0, len(raw), INDEX_ENTRY.size)]
+        if not entries:
+            return []
+
+        begin = entries[0][0]
+        end = entries[-1][0] + entries[-1][1]
+        with open(self.log_path, 'rb') as f:
+            f.seek(begin)
+            chunk = f.read(end - begin)
+        if METRICS_ENABLED:
+            add_bytes("messages", "read", len(raw) + len(chunk))
+
+        return [
+            decode_record(chunk[offset - begin:offset - begin + length], start + i)
+            for i, (offset, length) in enumerate(entries)
+        ]
+
+    def read_many(self, seqs):
+        """세그먼트 안의 흩어진 순번들을 파일을 한 번씩만 열어 읽습니다. ({seq: 메시지})"""
+        messages = {}
+        total = 0
+        with open(self.index_path, 'rb') as index_file, open(self.log_path, 'rb') as log_file:
+            for seq in seqs:
+                index_file.seek((seq - self.base_seq) * INDEX_ENTRY.size)
+                raw = index_file.read(INDEX_ENTRY.size)
+                if len(raw) < INDEX_ENTRY.size:
+                    continue
+                offset, length = INDEX_ENTRY.unpack(raw)
+                log_file.seek(offset)
+                record = log_file.read(length)
+                total += len(raw) + len(record)
+                messages[seq] = decode_record(record, seq)
+        if METRICS_ENABLED:
+            add_bytes("messages", "read", total)
+        return messages
+
+
+class MessageLog:
+    """채팅방별 추가 전용(append-only) 메시지 로그
+
+    메시지는 고정 크기 세그먼트 파일에 레코드 하나씩(models.message의 압축
+    레코드, 이전 로그는 JSON 한 줄) 기록되고, 각 세그먼트 옆의
+    인덱스 파일이 순번(seq) -> 바이트 오프셋을 보관합니다. 추가는 O(1) I/O,
+    "최근 N개"나 "seq 이후" 조회는 전체 파싱 없이 seek 한 번으로 처리됩니다.
+    """
+
+    def __init__(self, room_id, base_dir=MESSAGES_DIR, segment_max_bytes=SEGMENT_MAX_BYTES):
+        self.room_id = str(room_id)
+        self.directory = os.path.join(base_dir, self.room_id)
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.Lock()
+        self._segments = []
+        self._listeners = []  # append 직후 (seq, message)로 호출 (기록 순서대로, 잠금 안에서)
+        self._log_file = None
+        self._index_file = None
+        self._open()
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        bases = sorted(
+            int(name[:-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit()
+        )
+        for base in bases:
+            segment = _Segment(self.directory, base)
+            segment.recover()
+            self._segments.append(segment)
+        if not self._segments:
+            segment = _Segment(self.directory, 0)
+            segment.recover()
+            self._segments.append(segment)
+        self._open_active()
+
+    def _open_active(self):
+        self._close_files()
+        active = self._segments[-1]
+        self._log_file = open(active.log_path, 'ab')
+        self._index_file = open(active.index_path, 'ab')
+
+    def _close_files(self):
+        for f in (self._log_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._log_file = None
+        self._index_file = None
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+
+    def subscribe(self, listener):
+        """메시지가 기록될 때마다 listener(seq, message)를 호출하도록 등록합니다."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    @property
+    def next_seq(self):
+        """다음에 기록될 메시지의 순번 (= 전체 메시지 수)"""
+        return self._segments[-1].end_seq
+
+    def __len__(self):
+        return self.next_seq
+
+    def append(self, message):
+        """메시지(딕셔너리 또는 Message)를 추가하고 부여된 순번을 반환합니다."""
+        with self._lock:
+            active = self._segments[-1]
+            if active.count and active.size >= self.segment_max_bytes:
+                active = _Segment(self.directory, active.end_seq)
+                active.recover()
+                self._segments.append(active)
+                self._open_active()
+
+            seq = active.end_seq
+            line = encode_record(message, seq)
+
+            self._log_file.write(line)
+            self._log_file.flush()
+            self._index_file.write(INDEX_ENTRY.pack(active.size, len(line)))
+            self._index_file.flush()
+
+            active.size += len(line)
+            active.count += 1
+            if METRICS_ENABLED:
+                add_bytes("messages", "write", len(line) + INDEX_ENTRY.size)
+            for listener in self._listeners:
+                try:
+                    listener(seq, message)
+                except Exception as e:
+                    # 기록은 이미 끝났으므로 구독자 오류로 append를 실패시키지 않음
+                    print(f"Message log listener error: {str(e)}")
+            return seq
+
+    def read_range(self, start, stop=None):
+        """[start, stop) 구간의 메시지를 순번 순서대로 반환합니다."""
+        segments = list(self._segments)
+        end = segments[-1].end_seq
+        start = max(0, start)
+        stop = end if stop is None else min(stop, end)
+        if start >= stop:
+            return []
+
+        # 시작 순번이 속한 세그먼트를 이진 탐색
+        lo, hi = 0, len(segments) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if segments[mid].base_seq <= start:
+                lo = mid
+            else:
+                hi = mid - 1
+
+        messages = []
+        for segment in segments[lo:]:
+            if segment.base_seq >= stop:
+                break
+            messages.extend(segment.read(max(start, segment.base_seq), min(stop, segment.end_seq)))
+        return messages
+
+    def read_many(self, seqs):
+        """여러 순번의 메시지를 {seq: 메시지}로 반환합니다. (없는 순번은 빠짐)
+
+        검색 결과 확인처럼 흩어진 순번을 읽을 때 세그먼트마다 파일을 한 번씩만 엽니다.
+        """
+        segments = list(self._segments)
+        end = segments[-1].end_seq
+        bases = [segment.base_seq for segment in segments]
+        by_segment = {}
+        for seq in sorted(set(seqs)):
+            if 0 <= seq < end:
+                by_segment.setdefault(bisect.bisect_right(bases, seq) - 1, []).append(seq)
+        messages = {}
+        for i, segment_seqs in by_segment.items():
+            messages.update(segments[i].read_many(segment_seqs))
+        return messages
+
+    def read_last(self, n):
+        """가장 최근 메시지 n개를 반환합니다."""
+        end = self.next_seq
+        return self.read_range(end - n, end)
+
+    def read_after(self, seq, limit=None):
+        """seq 이후(seq 미포함)의 메시지를 반환합니다."""
+        start = seq + 1
+        stop = None if limit is None else start + limit
+        return self.read_range(start, stop)
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_message_log(room_id, base_dir=MESSAGES_DIR):
+    """프로세스 전체에서 공유되는 채팅방 로그를 반환합니다."""
+    key = (base_dir, str(room_id))
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            log = MessageLog(room_id, base_dir=base_dir)
+            _logs[key] = log
+        return log
@@ -0,0 +1,204 @@
+import os
+import time
+import bisect
+import tempfile
+import threading
+import functools
+
+# CHAT_METRICS=1 일 때만 계측 (꺼져 있으면 데코레이터가 원래 함수를 그대로 반환)
+METRICS_ENABLED = os.environ.get("CHAT_METRICS", "").lower() in ("1", "true", "yes", "on")
+METRICS_FILE = os.environ.get("CHAT_METRICS_FILE", os.path.join("data", "metrics.prom"))
+METRICS_WRITE_INTERVAL = 10  # Prometheus 텍스트 파일 저장 최소 간격 (초)
+
+# 지연 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """고정 구간 히스토그램 (관측 한 번에 이진 탐색 + 덧셈 몇 번)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """구간 경계로 근사한 분위수"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    """이름 + 레이블별 히스토그램과 카운터 모음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}    # (name, labels) -> float
+        self._last_write = 0.0
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self):
+        """(히스토그램 요약 목록, 카운터 목록)"""
+        with self._lock:
+            histograms = [
+                {"name": name, "labels": dict(labels), "count": h.count, "sum": h.sum,
+                 "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99)}
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return histograms, counters
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        items = list(labels) + list(extra)
+        if not items:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식"""
+        lines = []
+        with self._lock:
+            seen = set()
+            for (name, labels), h in sorted(self._histograms.items()):
+                if name not in seen:
+                    lines.append(f"# TYPE {name} histogram")
+                    seen.add(name)
+                cumulative = 0
+                for bound, count in zip(self.bucket_labels(h.buckets), h.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{self._labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{self._labels(labels)} {h.count}")
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in seen:
+                    lines.append(f"# TYPE {name} counter")
+                    seen.add(name)
+                lines.append(f"{name}{self._labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def bucket_labels(buckets):
+        return [str(bound) for bound in buckets] + ["+Inf"]
+
+    def write_textfile(self, path=METRICS_FILE, force=False):
+        """METRICS_WRITE_INTERVAL마다 한 번 Prometheus 텍스트 파일을 원자적으로 저장합니다."""
+        now = time.monotonic()
+        if not force and now - self._last_write < METRICS_WRITE_INTERVAL:
+            return
+        self._last_write = now
+        text = self.render_prometheus()
+        directory = os.path.dirname(path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+registry = MetricsRegistry()
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
+
+
+def add_bytes(store, direction, size):
+    """저장소별 I/O 바이트 수 (direction: read/write)"""
+    registry.inc("chat_store_bytes_total", size, store=store, direction=direction)
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # st.rerun()/st.stop()의 제어 예외로 빠져나가도 기록
+        registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def phase(name):
+    """with 블록의 실행 시간을 chat_phase_seconds{phase=name}에 기록합니다."""
+    return _Timer("chat_phase_seconds", {"phase": name}) if METRICS_ENABLED else _NOOP_TIMER
+
+
+def _decorator(name, labels):
+    def decorator(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed(phase_name):
+    """함수 실행 시간을 chat_phase_seconds에 기록하는 데코레이터
+    (계측이 꺼져 있으면 원래 함수를 그대로 반환)"""
+    return _decorator("chat_phase_seconds", {"phase": phase_name})
+
+
+def store_timed(store, op):
+    """저장소 읽기/쓰기 시간을 chat_store_seconds{store, op}에 기록하는 데코레이터"""
+    return _decorator("chat_store_seconds", {"store": store, "op": op})
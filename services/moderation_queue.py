@@ -0,0 +1,144 @@
+import time
+import queue
+import threading
+from collections import OrderedDict, deque
+
+MODERATION_WORKERS = 2
+MODERATION_QUEUE_SIZE = 1000
+MODERATION_TIMEOUT = 30  # 이 시간(초)이 지나도 판정이 없으면 통과로 간주
+VERDICT_CACHE_SIZE = 10000  # 채팅방별로 기억할 판정 수
+LATENCY_SAMPLES = 1000
+
+PENDING = "pending"
+APPROVED = "approved"
+REJECTED = "rejected"
+
+
+class ModerationQueue:
+    """메시지 검열 비동기 처리 큐
+
+    메시지는 먼저 "pending" 상태로 게시되고, 고정 크기 작업 스레드 풀이
+    check(room_id, seq, content, username)를 실행합니다. check가 참을
+    반환하면 거부, 아니면 승인으로 판정하며, on_reject 콜백으로 경고 등을
+    처리합니다. 큐가 가득 차면 호출한 스레드에서 바로 검사합니다.
+
+    거부 판정은 캐시와 별도로 채팅방별 집합에 모두 보관합니다. 채팅방을
+    처음 조회할 때 load_rejected(room_id)로 저장된 거부 기록(로그의 target)을
+    읽어 채우므로, 재시작이나 캐시 교체 후에도 거부된 메시지가 통과로
+    바뀌지 않습니다.
+    """
+
+    def __init__(self, check, on_reject=None, load_rejected=None, workers=MODERATION_WORKERS,
+                 max_queue=MODERATION_QUEUE_SIZE, timeout=MODERATION_TIMEOUT):
+        self.check = check
+        self.on_reject = on_reject
+        self.load_rejected = load_rejected
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._verdicts = {}  # room_id -> OrderedDict(seq -> verdict)
+        self._rejected = {}  # room_id -> 거부된 seq 집합 (교체 없음)
+        self._loaded = set()  # 저장된 거부 기록을 읽은 채팅방
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.processed = 0
+        self.rejected = 0
+        self.inline = 0  # 큐가 가득 차 직접 처리한 수
+        self._workers = [
+            threading.Thread(target=self._run, name=f"moderation-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, room_id, seq, content, username):
+        job = (room_id, seq, content, username, time.monotonic())
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.inline += 1
+            self._process(job)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._process(job)
+            except Exception as e:
+                print(f"Moderation error: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job):
+        room_id, seq, content, username, enqueued = job
+        try:
+            result = self.check(room_id, seq, content, username)
+        except Exception as e:
+            # 검사 실패 시 메시지를 막지 않음
+            print(f"Moderation check error: {str(e)}")
+            result = None
+        verdict = REJECTED if result else APPROVED
+        self.record(room_id, seq, verdict)
+        with self._lock:
+            self.processed += 1
+            if verdict == REJECTED:
+                self.rejected += 1
+            self._latencies.append(time.monotonic() - enqueued)
+        if verdict == REJECTED and self.on_reject:
+            self.on_reject(room_id, seq, username, result)
+
+    def record(self, room_id, seq, verdict):
+        """판정 결과를 기억합니다. (로그에서 읽은 판정 기록 반영에도 사용)"""
+        with self._lock:
+            verdicts = self._verdicts.get(room_id)
+            if verdicts is None:
+                verdicts = self._verdicts[room_id] = OrderedDict()
+            verdicts[seq] = verdict
+            while len(verdicts) > VERDICT_CACHE_SIZE:
+                verdicts.popitem(last=False)
+            if verdict == REJECTED:
+                self._rejected.setdefault(room_id, set()).add(seq)
+
+    def _is_rejected(self, room_id, seq):
+        with self._lock:
+            loaded = room_id in self._loaded
+        if not loaded and self.load_rejected is not None:
+            try:
+                seqs = set(self.load_rejected(room_id))
+            except Exception as e:
+                print(f"Moderation verdict load error: {str(e)}")
+                seqs = set()
+            with self._lock:
+                self._rejected.setdefault(room_id, set()).update(seqs)
+                self._loaded.add(room_id)
+        with self._lock:
+            return seq in self._rejected.get(room_id, ())
+
+    def verdict(self, room_id, seq, timestamp=None):
+        """메시지의 현재 판정 (pending/approved/rejected)"""
+        with self._lock:
+            verdict = self._verdicts.get(room_id, {}).get(seq)
+        if verdict is not None:
+            return verdict
+        if self._is_rejected(room_id, seq):
+            return REJECTED
+        # 거부 기록이 없고 판정 대기 시간이 지난 메시지는 통과로 간주
+        if timestamp is None or time.time() - timestamp > self.timeout:
+            return APPROVED
+        return PENDING
+
+    def metrics(self):
+        """큐 길이와 처리 지연 통계"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'depth': self._queue.qsize(),
+                'processed': self.processed,
+                'rejected': self.rejected,
+                'inline': self.inline,
+            }
+        if latencies:
+            stats['latency_p50'] = latencies[len(latencies) // 2]
+            stats['latency_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            stats['latency_max'] = latencies[-1]
+        return stats
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import heapq
+import threading
+import tempfile
+from datetime import datetime
+
+PRESENCE_TIMEOUT = 300  # 5분 동안 활동이 없으면 접속 종료로 간주
+SNAPSHOT_INTERVAL = 30  # 스냅샷 파일 저장 최소 간격 (초)
+
+
+class PresenceRegistry:
+    """프로세스 전체에서 공유하는 접속자 목록
+
+    세션 -> (사용자, 만료 시각) 맵과 만료 시각 기준 최소 힙을 유지합니다.
+    하트비트 갱신은 O(log n)이며, 만료 처리는 만료된 세션 수만큼만 비용이
+    듭니다. 중복 제거된 접속자 수는 사용자별 세션 수로 항상 유지됩니다.
+    """
+
+    def __init__(self, timeout=PRESENCE_TIMEOUT, snapshot_file=None,
+                 snapshot_interval=SNAPSHOT_INTERVAL):
+        self.timeout = timeout
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._sessions = {}     # session_id -> (username, expires_at)
+        self._heap = []         # (expires_at, session_id), 오래된 항목은 지연 삭제
+        self._user_counts = {}  # username -> 세션 수
+        self._last_snapshot = 0.0
+        self._dirty = False
+        if snapshot_file:
+            self._load_snapshot()
+
+    def _add_user(self, username):
+        self._user_counts[username] = self._user_counts.get(username, 0) + 1
+
+    def _drop_user(self, username):
+        count = self._user_counts.get(username, 0) - 1
+        if count > 0:
+            self._user_counts[username] = count
+        else:
+            self._user_counts.pop(username, None)
+
+    def _expire(self, now):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, session_id = heapq.heappop(heap)
+            entry = self._sessions.get(session_id)
+            # 이후 하트비트로 갱신된 세션이면 오래된 힙 항목일 뿐이므로 무시
+            if entry is not None and entry[1] == expires_at:
+                del self._sessions[session_id]
+                self._drop_user(entry[0])
+                self._dirty = True
+
+        # 오래된 항목이 너무 많이 쌓이면 힙을 다시 구성
+        if len(heap) > 2 * len(self._sessions) + 64:
+            self._heap = [(expires_at, sid) for sid, (_, expires_at) in self._sessions.items()]
+            heapq.heapify(self._heap)
+
+    def heartbeat(self, session_id, username, now=None):
+        """세션의 활동 시각을 갱신하고 현재 접속자 수를 반환합니다."""
+        now = time.time() if now is None else now
+        expires_at = now + self.timeout
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous is None:
+                self._add_user(username)
+            elif previous[0] != username:
+                self._drop_user(previous[0])
+                self._add_user(username)
+            self._sessions[session_id] = (username, expires_at)
+            heapq.heappush(self._heap, (expires_at, session_id))
+            self._dirty = True
+            self._expire(now)
+            self._maybe_snapshot(now)
+            return len(self._user_counts)
+
+    def remove(self, session_id):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._drop_user(entry[0])
+                self._dirty = True
+
+    def unique_count(self, now=None):
+        """중복 제거된 현재 접속자 수"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            return len(self._user_counts)
+
+    def usernames(self, now=None):
+        """현재 접속 중인 사용자 목록"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            return list(self._user_counts)
+
+    def _maybe_snapshot(self, now):
+        if not self.snapshot_file or not self._dirty:
+            return
+        if now - self._last_snapshot < self.snapshot_interval:
+            return
+        self._last_snapshot = now
+        self._dirty = False
+        data = {
+            session_id: {
+                'username': username,
+                'last_active': datetime.fromtimestamp(expires_at - self.timeout).isoformat()
+            }
+            for session_id, (username, expires_at) in self._sessions.items()
+        }
+        try:
+            directory = os.path.dirname(self.snapshot_file) or '.'
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.snapshot_file)
+        except OSError as e:
+            print(f"Presence snapshot error: {str(e)}")
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        now = time.time()
+        for session_id, entry in data.items():
+            try:
+                last_active = datetime.fromisoformat(entry['last_active']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            expires_at = last_active + self.timeout
+            if expires_at > now:
+                self._sessions[session_id] = (entry['username'], expires_at)
+                self._add_user(entry['username'])
+                self._heap.append((expires_at, session_id))
+        heapq.heapify(self._heap)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_presence_registry(snapshot_file=None, timeout=PRESENCE_TIMEOUT):
+    """프로세스 전체에서 공유되는 접속자 목록을 반환합니다."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PresenceRegistry(timeout=timeout, snapshot_file=snapshot_file)
+        return _registry
@@ -0,0 +1,230 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+
+# CHAT_PROFILE=1 일 때만 rerun을 샘플링 (꺼져 있으면 capture()가 아무 일도 하지 않음)
+PROFILER_ENABLED = os.environ.get("CHAT_PROFILE", "").lower() in ("1", "true", "yes", "on")
+SLOW_RERUN_DIR = os.environ.get("CHAT_PROFILE_DIR", os.path.join("data", "slow_reruns"))
+SLOW_RERUN_THRESHOLD = float(os.environ.get("CHAT_PROFILE_THRESHOLD", "1.0"))  # 저장 기준 (초)
+SAMPLE_INTERVAL = 0.005     # 스택 샘플링 주기 (초)
+DUMP_INTERVAL = 60          # 프로파일 저장 최소 간격 (초)
+MAX_PROFILES = 50           # 보관할 프로파일 수 (오래된 것부터 삭제)
+
+_UNSAFE_CHARS = re.compile(r"[^\w.-]+")
+METRICS_FILE_PREFIX = "metrics.py:"  # 단계를 고를 때 건너뛸 계측 래퍼 프레임
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class _Capture:
+    """한 번의 스크립트 실행 동안 모은 스택 샘플"""
+
+    def __init__(self, root):
+        self.root = root            # 스크립트 최상위 프레임 (이보다 위의 Streamlit 실행기 프레임은 제외)
+        self.stacks = Counter()     # "루트;...;말단" -> 샘플 수
+        self.phases = Counter()     # 단계(최상위 함수가 호출한 함수) -> 샘플 수
+        self.start = time.perf_counter()
+
+    def sample(self, frame):
+        labels = []
+        while frame is not None and frame is not self.root:
+            labels.append(frame_label(frame))
+            frame = frame.f_back
+        if frame is None:
+            return  # 아직 스크립트 프레임에 들어오지 않았거나 이미 빠져나감
+        labels.append(frame_label(frame))
+        labels.reverse()
+        # [<module>, main, 단계 함수, ...] 순서이므로 세 번째 프레임이 단계
+        # (CHAT_METRICS=1이면 계측 데코레이터의 wrapper 프레임이 끼어 있으므로 제외)
+        calls = [label for label in labels if not label.startswith(METRICS_FILE_PREFIX)]
+        phase = calls[2].split(":", 1)[1] if len(calls) > 2 else calls[-1].split(":", 1)[1]
+        self.stacks[";".join(labels)] += 1
+        self.phases[phase] += 1
+
+
+class _NoopCapture:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_CAPTURE = _NoopCapture()
+
+
+class SlowRerunProfiler:
+    """느린 rerun의 스택을 flamegraph용 collapsed 형식으로 저장하는 샘플링 프로파일러
+
+    capture() 블록 안에서 실행되는 스크립트 스레드의 스택을 백그라운드
+    스레드가 SAMPLE_INTERVAL마다 sys._current_frames()로 수집합니다.
+    실행 시간이 threshold 이상이면 "프레임;프레임;... 샘플수" 줄로 된
+    .folded 파일과 사용자/채팅방/단계 정보를 담은 .json 파일을 저장합니다.
+    저장은 DUMP_INTERVAL마다 한 번으로 제한하고 최근 MAX_PROFILES개만
+    보관합니다. 샘플링 스레드는 진행 중인 capture가 있을 때만 깨어 있습니다.
+    """
+
+    def __init__(self, directory=SLOW_RERUN_DIR, threshold=SLOW_RERUN_THRESHOLD,
+                 interval=SAMPLE_INTERVAL, dump_interval=DUMP_INTERVAL, max_profiles=MAX_PROFILES):
+        self.directory = directory
+        self.threshold = threshold
+        self.interval = interval
+        self.dump_interval = dump_interval
+        self.max_profiles = max_profiles
+        self._captures = {}  # 스레드 id -> _Capture
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._last_dump = None
+        self.dumped = 0
+        self.skipped = 0  # 기준을 넘었지만 저장 간격 제한으로 버린 프로파일 수
+        threading.Thread(target=self._run, name="slow-rerun-profiler", daemon=True).start()
+
+    # 샘플링
+    def _run(self):
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                captures = list(self._captures.items())
+            if not captures:
+                continue
+            frames = sys._current_frames()
+            for thread_id, capture in captures:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    capture.sample(frame)
+            del frames
+
+    def capture(self, tags=None):
+        """with 블록을 샘플링합니다. tags()는 블록이 끝난 뒤 호출되어 저장할 정보를 반환합니다."""
+        return _CaptureContext(self, sys._getframe(1), tags)
+
+    def _start(self, root):
+        capture = _Capture(root)
+        with self._lock:
+            self._captures[threading.get_ident()] = capture
+            self._active.set()
+        return capture
+
+    def _finish(self, capture, tags):
+        with self._lock:
+            self._captures.pop(threading.get_ident(), None)
+            if not self._captures:
+                self._active.clear()
+        elapsed = time.perf_counter() - capture.start
+        if elapsed < self.threshold or not capture.stacks:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            if self._last_dump is not None and now - self._last_dump < self.dump_interval:
+                self.skipped += 1
+                return None
+            self._last_dump = now
+        try:
+            info = tags() if tags is not None else {}
+        except Exception:
+            info = {}
+        return self._dump(capture, elapsed, info)
+
+    # 저장
+    def _dump(self, capture, elapsed, info):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            phase = capture.phases.most_common(1)[0][0]
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            parts = [stamp, str(info.get("user") or "anonymous"), str(info.get("room") or "-"), phase]
+            name = "_".join(_UNSAFE_CHARS.sub("-", part) for part in parts)
+            base = os.path.join(self.directory, name)
+            with open(base + ".folded", 'w', encoding='utf-8') as f:
+                for stack, count in capture.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(base + ".json", 'w', encoding='utf-8') as f:
+                json.dump({
+                    **info,
+                    "phase": phase,
+                    "elapsed": elapsed,
+                    "samples": sum(capture.stacks.values()),
+                    "phases": dict(capture.phases),
+                    "time": datetime.now().isoformat(),
+                }, f, ensure_ascii=False, indent=2)
+            self.dumped += 1
+            self._prune()
+            return base + ".folded"
+        except Exception as e:
+            print(f"Slow rerun profile save error: {str(e)}")
+            return None
+
+    def _prune(self):
+        # 파일 이름이 시각으로 시작하므로 이름 순서가 곧 저장 순서
+        names = sorted(name[:-len(".folded")] for name in os.listdir(self.directory)
+                       if name.endswith(".folded"))
+        for name in names[:-self.max_profiles] if len(names) > self.max_profiles else []:
+            for suffix in (".folded", ".json"):
+                path = os.path.join(self.directory, name + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def profiles(self):
+        """저장된 프로파일 정보 목록 (최신순)"""
+        if not os.path.isdir(self.directory):
+            return []
+        result = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    info = json.load(f)
+            except Exception:
+                continue
+            info["file"] = os.path.join(self.directory, name[:-len(".json")] + ".folded")
+            result.append(info)
+        return result
+
+
+class _CaptureContext:
+    def __init__(self, profiler, root, tags):
+        self.profiler = profiler
+        self.root = root
+        self.tags = tags
+        self.capture = None
+        self.path = None
+
+    def __enter__(self):
+        self.capture = self.profiler._start(self.root)
+        return self
+
+    def __exit__(self, *exc):
+        # st.rerun()/st.stop()의 제어 예외로 빠져나가도 기록
+        self.path = self.profiler._finish(self.capture, self.tags)
+        return False
+
+
+_profilers = {}
+_profilers_lock = threading.Lock()
+
+
+def get_slow_rerun_profiler(directory=SLOW_RERUN_DIR):
+    """프로세스 전체에서 공유되는 프로파일러를 반환합니다."""
+    with _profilers_lock:
+        profiler = _profilers.get(directory)
+        if profiler is None:
+            profiler = SlowRerunProfiler(directory)
+            _profilers[directory] = profiler
+        return profiler
+
+
+def capture(tags=None):
+    """CHAT_PROFILE=1이면 with 블록을 샘플링하고, 아니면 아무 일도 하지 않습니다."""
+    if not PROFILER_ENABLED:
+        return _NOOP_CAPTURE
+    profiler = get_slow_rerun_profiler()
+    return _CaptureContext(profiler, sys._getframe(1), tags)
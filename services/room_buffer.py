@@ -0,0 +1,123 @@
+import threading
+from collections import deque
+
+from models.message import Message
+from services.message_log import MESSAGES_DIR, get_message_log
+
+ROOM_BUFFER_SIZE = 200  # 채팅방마다 메모리에 유지할 최근 메시지 수
+MAX_VIEWS = 8           # 채팅방마다 기억할 가공 결과 수
+
+
+def to_message(seq, message):
+    if isinstance(message, Message):
+        return message if message.seq == seq else message.replace(seq=seq)
+    return Message.from_dict(dict(message, seq=seq))
+
+
+class RoomBuffer:
+    """채팅방 하나의 최근 메시지 링 버퍼 (프로세스 전체에서 공유)
+
+    처음 사용할 때 로그 꼬리에서 capacity개를 한 번 읽어 채우고, 이후에는
+    로그에 기록되는 메시지를 구독해 디스크를 다시 읽지 않고 따라갑니다.
+    항목은 변경할 수 없는 Message이므로 여러 세션이 복사 없이 함께 읽으며,
+    세션은 채팅방 id와 읽은 위치(순번)만 보관합니다.
+    """
+
+    def __init__(self, room_log, capacity=ROOM_BUFFER_SIZE):
+        self.room_log = room_log
+        self.capacity = capacity
+        self._messages = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._views = {}        # key -> (next_seq, 결과)
+        self.next_seq = 0
+        # 구독을 먼저 걸고 로그 꼬리를 읽음. 그 사이 구독으로 먼저 들어온 메시지는
+        # 로그 꼬리에도 들어 있으므로 버리고 다시 채우며, 이후 도착하는 중복은 순번으로 거름
+        room_log.subscribe(self._on_append)
+        self._warm()
+
+    def _warm(self):
+        with self._lock:
+            end = self.room_log.next_seq
+            self._messages.clear()
+            for data in self.room_log.read_range(end - self.capacity, end):
+                try:
+                    self._messages.append(to_message(data["seq"], data))
+                except Exception as e:
+                    print(f"Room buffer load error: {str(e)}")
+            self.next_seq = max(self.next_seq, end)
+
+    def _on_append(self, seq, message):
+        entry = to_message(seq, message)
+        with self._lock:
+            if seq < self.next_seq:
+                return  # 채울 때 이미 읽은 메시지
+            self._messages.append(entry)
+            self.next_seq = seq + 1
+
+    @property
+    def start_seq(self):
+        """버퍼에 들어 있는 가장 오래된 순번"""
+        with self._lock:
+            return self._messages[0].seq if self._messages else self.next_seq
+
+    def read_last(self, n):
+        """가장 최근 메시지 n개 (Message 목록)"""
+        with self._lock:
+            if n >= len(self._messages):
+                return list(self._messages)
+            return list(self._messages)[-n:]
+
+    def read_after(self, cursor, limit=None):
+        """순번 cursor 이후의 메시지와 새 cursor를 반환합니다.
+
+        cursor가 버퍼보다 오래되었으면 버퍼에 남아 있는 메시지부터 반환합니다.
+        """
+        with self._lock:
+            messages = [message for message in self._messages if message.seq > cursor]
+            next_seq = self.next_seq
+        if limit is not None:
+            messages = messages[:limit]
+        new_cursor = messages[-1].seq if messages else max(cursor, next_seq - 1)
+        return messages, new_cursor
+
+    def read_range(self, start, stop):
+        """[start, stop) 구간이 버퍼 안에 있으면 Message 목록, 아니면 None"""
+        with self._lock:
+            if not self._messages or start < self._messages[0].seq:
+                return None
+            return [message for message in self._messages if start <= message.seq < stop]
+
+    def view(self, key, n, build, stale=None):
+        """최근 n개 메시지를 build()로 가공한 결과를 새 메시지가 올 때까지 공유합니다.
+
+        stale(결과)이 참이면 새 메시지가 없어도 다시 가공합니다.
+        """
+        with self._lock:
+            cached = self._views.get((key, n))
+            next_seq = self.next_seq
+        if cached is not None and cached[0] == next_seq and not (stale and stale(cached[1])):
+            return cached[1]
+        result = build(self.read_last(n))
+        with self._lock:
+            if len(self._views) >= MAX_VIEWS:
+                self._views.clear()
+            self._views[(key, n)] = (next_seq, result)
+        return result
+
+    def __len__(self):
+        return len(self._messages)
+
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def get_room_buffer(room_id, base_dir=MESSAGES_DIR, capacity=ROOM_BUFFER_SIZE):
+    """프로세스 전체에서 공유되는 채팅방 링 버퍼를 반환합니다."""
+    key = (base_dir, str(room_id))
+    with _buffers_lock:
+        buffer = _buffers.get(key)
+        if buffer is None:
+            buffer = RoomBuffer(get_message_log(room_id, base_dir=base_dir), capacity)
+            _buffers[key] = buffer
+        return buffer
@@ -0,0 +1,179 @@
+import bisect
+import threading
+
+ROOM_PAGE_SIZE = 20
+SORT_RECENT = "recent"
+SORT_MEMBERS = "members"
+
+
+def _topic_words(topic):
+    return set((topic or "").casefold().split())
+
+
+class RoomIndex:
+    """채팅방 목록용 보조 인덱스
+
+    공개방 / 방장별 / 멤버별 / 이름(접두어) / 주제 단어 인덱스와 최신순,
+    참여자순 정렬 목록을 유지합니다. 채팅방이 바뀔 때마다 upsert/remove로
+    해당 방의 항목만 갱신하므로 목록 조회 시 전체 채팅방을 읽지 않습니다.
+    """
+
+    def __init__(self, rooms=()):
+        self._lock = threading.Lock()
+        self._rooms = {}      # room_id -> 요약 정보
+        self._public = set()
+        self._by_owner = {}   # owner -> {room_id}
+        self._by_member = {}  # username -> {room_id}
+        self._by_topic = {}   # 주제 단어 -> {room_id}
+        self._names = []      # (casefold된 이름, room_id) 정렬 목록
+        self._orders = {SORT_RECENT: [], SORT_MEMBERS: []}  # 오름차순 정렬 키 목록
+        for room in rooms:
+            self.upsert(room)
+
+    @staticmethod
+    def _summary(room):
+        return {
+            "id": room["id"],
+            "name": room["name"],
+            "owner": room["owner"],
+            "is_public": bool(room["is_public"]),
+            "topic": room.get("topic"),
+            "members": tuple(room.get("members") or ()),
+            "created_at": room.get("created_at") or "",
+        }
+
+    @staticmethod
+    def _sort_key(summary, sort):
+        if sort == SORT_MEMBERS:
+            return (len(summary["members"]), summary["created_at"], summary["id"])
+        return (summary["created_at"], summary["id"])
+
+    @staticmethod
+    def _add_to(index, key, room_id):
+        index.setdefault(key, set()).add(room_id)
+
+    @staticmethod
+    def _remove_from(index, key, room_id):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(room_id)
+            if not ids:
+                del index[key]
+
+    @staticmethod
+    def _remove_sorted(items, item):
+        pos = bisect.bisect_left(items, item)
+        if pos < len(items) and items[pos] == item:
+            del items[pos]
+
+    def _unindex(self, summary):
+        room_id = summary["id"]
+        self._public.discard(room_id)
+        self._remove_from(self._by_owner, summary["owner"], room_id)
+        for member in summary["members"]:
+            self._remove_from(self._by_member, member, room_id)
+        for word in _topic_words(summary["topic"]):
+            self._remove_from(self._by_topic, word, room_id)
+        self._remove_sorted(self._names, (summary["name"].casefold(), room_id))
+        for sort, items in self._orders.items():
+            self._remove_sorted(items, self._sort_key(summary, sort))
+
+    def upsert(self, room):
+        """채팅방(to_dict 형태)을 추가하거나 갱신합니다."""
+        summary = self._summary(room)
+        room_id = summary["id"]
+        with self._lock:
+            previous = self._rooms.get(room_id)
+            if previous is not None:
+                self._unindex(previous)
+            self._rooms[room_id] = summary
+            if summary["is_public"]:
+                self._public.add(room_id)
+            self._add_to(self._by_owner, summary["owner"], room_id)
+            for member in summary["members"]:
+                self._add_to(self._by_member, member, room_id)
+            for word in _topic_words(summary["topic"]):
+                self._add_to(self._by_topic, word, room_id)
+            bisect.insort(self._names, (summary["name"].casefold(), room_id))
+            for sort, items in self._orders.items():
+                bisect.insort(items, self._sort_key(summary, sort))
+
+    def remove(self, room_id):
+        with self._lock:
+            summary = self._rooms.pop(room_id, None)
+            if summary is not None:
+                self._unindex(summary)
+
+    # 조회
+    def get(self, room_id):
+        return self._rooms.get(room_id)
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def rooms_by_owner(self, owner):
+        with self._lock:
+            return set(self._by_owner.get(owner, ()))
+
+    def rooms_by_member(self, username):
+        with self._lock:
+            return set(self._by_member.get(username, ()))
+
+    def public_rooms(self):
+        with self._lock:
+            return set(self._public)
+
+    def _search(self, query):
+        """이름이 query로 시작하거나 주제에 query 단어가 있는 채팅방"""
+        query = query.casefold().strip()
+        start = bisect.bisect_left(self._names, (query, ""))
+        ids = set()
+        for name, room_id in self._names[start:]:
+            if not name.startswith(query):
+                break
+            ids.add(room_id)
+        for word in query.split():
+            ids |= self._by_topic.get(word, set())
+        return ids
+
+    def list_rooms(self, sort=SORT_RECENT, cursor=None, limit=ROOM_PAGE_SIZE, query=None,
+                   owner=None, member=None, public_only=False, viewer=None):
+        """채팅방 한 페이지와 다음 페이지 커서를 반환합니다.
+
+        owner/member/query로 범위를 좁힐 수 있고, public_only면 공개방과
+        viewer가 멤버인 방만 포함합니다. 커서는 이전 페이지 마지막 방의
+        정렬 키로, 다음 페이지가 없으면 None입니다.
+        """
+        with self._lock:
+            candidates = None
+            if owner is not None:
+                candidates = set(self._by_owner.get(owner, ()))
+            if member is not None:
+                ids = self._by_member.get(member, set())
+                candidates = ids.copy() if candidates is None else candidates & ids
+            if query:
+                ids = self._search(query)
+                candidates = ids if candidates is None else candidates & ids
+            visible = self._by_member.get(viewer, set()) if viewer else set()
+
+            def allowed(room_id):
+                return not public_only or room_id in self._public or room_id in visible
+
+            if candidates is not None:
+                # 범위가 좁혀졌으면 후보만 정렬
+                keys = sorted((self._sort_key(self._rooms[room_id], sort) for room_id in candidates
+                               if allowed(room_id)), reverse=True)
+                if cursor is not None:
+                    keys = [key for key in keys if key < tuple(cursor)]
+            else:
+                # 전체 목록은 정렬 목록을 커서 위치부터 거꾸로 훑음
+                items = self._orders[sort]
+                end = len(items) if cursor is None else bisect.bisect_left(items, tuple(cursor))
+                keys = (items[i] for i in range(end - 1, -1, -1) if allowed(items[i][-1]))
+
+            page = []
+            for key in keys:
+                if len(page) == limit:
+                    return page, list(self._sort_key(page[-1], sort))
+                page.append(dict(self._rooms[key[-1]], members=list(self._rooms[key[-1]]["members"])))
+            return page, None
@@ -1,19 +1,59 @@
 import os
-import json
+import threading
 from models.room import ChatRoom
+from services.room_store import JsonRoomStore, SqliteRoomStore
+from services.room_index import RoomIndex, SORT_RECENT, ROOM_PAGE_SIZE
+
+# 채팅방 저장소 종류: "sqlite" 또는 "json"
+ROOM_STORE_BACKEND = os.environ.get("ROOM_STORE_BACKEND", "sqlite")
+
+# 저장소별 채팅방 인덱스 (프로세스 전체에서 공유, 처음 사용할 때 한 번만 구성)
+_indexes = {}
+_indexes_lock = threading.Lock()
 
 class RoomManager:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", backend=ROOM_STORE_BACKEND):
         self.data_dir = data_dir
         self.rooms_file = os.path.join(data_dir, "rooms.json")
+        self.db_file = os.path.join(data_dir, "rooms.db")
+        self.backend = backend
         self.ensure_data_file()
+        self.store = self.create_store()
 
     def ensure_data_file(self):
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
-        if not os.path.exists(self.rooms_file):
-            with open(self.rooms_file, 'w') as f:
-                json.dump({}, f)
+
+    def create_store(self):
+        if self.backend == "json":
+            return JsonRoomStore(self.rooms_file)
+        if self.backend == "sqlite":
+            store = SqliteRoomStore(self.db_file)
+            # 기존 rooms.json 데이터를 최초 한 번만 가져옴
+            store.import_json(self.rooms_file)
+            return store
+        raise ValueError(f"알 수 없는 채팅방 저장소: {self.backend}")
+
+    @property
+    def index(self):
+        key = os.path.abspath(self.db_file if self.backend == "sqlite" else self.rooms_file)
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = RoomIndex(self.store.load_all().values())
+                _indexes[key] = index
+            return index
+
+    def list_rooms(self, sort=SORT_RECENT, cursor=None, limit=ROOM_PAGE_SIZE, **filters):
+        """인덱스에서 채팅방 한 페이지와 다음 페이지 커서를 반환합니다."""
+        return self.index.list_rooms(sort, cursor, limit, **filters)
+
+    def _reindex(self, room_id):
+        data = self.store.get(room_id)
+        if data is None:
+            self.index.remove(room_id)
+        else:
+            self.index.upsert(data)
 
     def create_room(self, name, owner, is_public=True, password=None, topic=None):
         room = ChatRoom(name, owner, is_public, password, topic)
@@ -21,58 +61,64 @@ class RoomManager:
         return room
 
     def save_room(self, room):
-        rooms = self.load_rooms()
-        rooms[room.id] = room.to_dict()
-        with open(self.rooms_file, 'w') as f:
-            json.dump(rooms, f)
+        data = room.to_dict()
+        self.store.save(data)
+        self.index.upsert(data)
 
     def load_rooms(self):
-        with open(self.rooms_file, 'r') as f:
-            return json.load(f)
+        return self.store.load_all()
 
     def get_room(self, room_id):
-        rooms = self.load_rooms()
-        if room_id in rooms:
-            return ChatRoom.from_dict(rooms[room_id])
+        data = self.store.get(room_id)
+        if data is not None:
+            return ChatRoom.from_dict(data)
         return None
 
+    def _update_room(self, room_id, change):
+        """채팅방 하나를 트랜잭션 안에서 읽고 change(room)가 참이면 저장합니다."""
+        def mutate(data):
+            room = ChatRoom.from_dict(data)
+            if not change(room):
+                return False
+            data.update(room.to_dict())
+            return True
+        if not self.store.update(room_id, mutate):
+            return False
+        self._reindex(room_id)
+        return True
+
     def delete_room(self, room_id, user):
-        rooms = self.load_rooms()
-        if room_id in rooms:
-            room = ChatRoom.from_dict(rooms[room_id])
-            if room.owner == user:
-                del rooms[room_id]
-                with open(self.rooms_file, 'w') as f:
-                    json.dump(rooms, f)
-                return True
-        return False
+        if not self.store.delete(room_id, lambda data: data["owner"] == user):
+            return False
+        self.index.remove(room_id)
+        return True
 
     def invite_user(self, room_id, user_to_invite, inviting_user):
-        room = self.get_room(room_id)
-        if room and inviting_user in room.members:
-            if user_to_invite not in room.banned_users:
-                if user_to_invite not in room.members:
-                    room.members.append(user_to_invite)
-                    self.save_room(room)
-                    return True
-        return False
+        def change(room):
+            if inviting_user in room.members:
+                if user_to_invite not in room.banned_users:
+                    if user_to_invite not in room.members:
+                        room.members.append(user_to_invite)
+                        return True
+            return False
+        return self._update_room(room_id, change)
 
     def kick_user(self, room_id, user_to_kick, admin_user):
-        room = self.get_room(room_id)
-        if room and admin_user == room.owner:
-            if user_to_kick in room.members and user_to_kick != room.owner:
-                room.members.remove(user_to_kick)
-                room.banned_users.append(user_to_kick)
-                self.save_room(room)
-                return True
-        return False
+        def change(room):
+            if admin_user == room.owner:
+                if user_to_kick in room.members and user_to_kick != room.owner:
+                    room.members.remove(user_to_kick)
+                    room.banned_users.append(user_to_kick)
+                    return True
+            return False
+        return self._update_room(room_id, change)
 
     def update_room_settings(self, room_id, user, **settings):
-        room = self.get_room(room_id)
-        if room and room.owner == user:
-            for key, value in settings.items():
-                if hasattr(room, key):
-                    setattr(room, key, value)
-            self.save_room(room)
-            return True
-        return False
+        def change(room):
+            if room.owner == user:
+                for key, value in settings.items():
+                    if hasattr(room, key):
+                        setattr(room, key, value)
+                return True
+            return False
+        return self._update_room(room_id, change)
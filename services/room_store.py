@@ -0,0 +1,273 @@
+import os
+import json
+import sqlite3
+import threading
+
+
+class RoomStore:
+    """채팅방 저장소 인터페이스
+
+    채팅방은 ChatRoom.to_dict() 형태의 딕셔너리로 주고받습니다.
+    """
+
+    def load_all(self):
+        """모든 채팅방을 {room_id: room_dict} 형태로 반환합니다."""
+        raise NotImplementedError
+
+    def get(self, room_id):
+        raise NotImplementedError
+
+    def save(self, room):
+        raise NotImplementedError
+
+    def update(self, room_id, mutate):
+        """채팅방 하나를 읽고 mutate(room)를 적용한 뒤 저장합니다.
+
+        mutate가 참을 반환할 때만 저장하며, 그 반환값을 돌려줍니다.
+        채팅방이 없으면 False를 반환합니다.
+        """
+        raise NotImplementedError
+
+    def delete(self, room_id, predicate=None):
+        """predicate(room)가 참이면(또는 생략 시) 채팅방을 삭제합니다."""
+        raise NotImplementedError
+
+
+class JsonRoomStore(RoomStore):
+    """rooms.json 파일 하나에 모든 채팅방을 저장하는 기존 방식"""
+
+    def __init__(self, rooms_file):
+        self.rooms_file = rooms_file
+        self._lock = threading.Lock()
+        if not os.path.exists(rooms_file):
+            with open(rooms_file, 'w') as f:
+                json.dump({}, f)
+
+    def _write(self, rooms):
+        with open(self.rooms_file, 'w') as f:
+            json.dump(rooms, f)
+
+    def load_all(self):
+        with open(self.rooms_file, 'r') as f:
+            return json.load(f)
+
+    def get(self, room_id):
+        return self.load_all().get(room_id)
+
+    def save(self, room):
+        with self._lock:
+            rooms = self.load_all()
+            rooms[room["id"]] = room
+            self._write(rooms)
+
+    def update(self, room_id, mutate):
+        with self._lock:
+            rooms = self.load_all()
+            room = rooms.get(room_id)
+            if room is None:
+                return False
+            result = mutate(room)
+            if result:
+                rooms[room_id] = room
+                self._write(rooms)
+            return result
+
+    def delete(self, room_id, predicate=None):
+        with self._lock:
+            rooms = self.load_all()
+            room = rooms.get(room_id)
+            if room is None or (predicate and not predicate(room)):
+                return False
+            del rooms[room_id]
+            self._write(rooms)
+            return True
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    is_public INTEGER NOT NULL,
+    password TEXT,
+    topic TEXT,
+    created_at TEXT,
+    notifications_enabled INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS room_members (
+    room_id TEXT NOT NULL REFERENCES rooms(id) ON DELETE CASCADE,
+    username TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (room_id, username)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_room_members_username ON room_members(username);
+CREATE TABLE IF NOT EXISTS room_banned_users (
+    room_id TEXT NOT NULL REFERENCES rooms(id) ON DELETE CASCADE,
+    username TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (room_id, username)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_room_banned_users_username ON room_banned_users(username);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+ROOM_COLUMNS = ("id", "name", "owner", "is_public", "password", "topic",
+                "created_at", "notifications_enabled")
+
+
+class SqliteRoomStore(RoomStore):
+    """SQLite(WAL 모드) 채팅방 저장소
+
+    채팅방마다 한 행을 쓰고, 멤버/차단 사용자는 사용자명 인덱스가 있는
+    별도 테이블에 저장합니다. 단일 채팅방 변경은 하나의 트랜잭션으로
+    처리되어 동시 수정 시에도 갱신이 유실되지 않습니다.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 트랜잭션은 직접 BEGIN/COMMIT으로 관리
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _read_room(self, conn, room_id):
+        row = conn.execute(
+            f"SELECT {', '.join(ROOM_COLUMNS)} FROM rooms WHERE id = ?", (room_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        room = self._row_to_dict(row)
+        room["members"] = [r[0] for r in conn.execute(
+            "SELECT username FROM room_members WHERE room_id = ? ORDER BY position", (room_id,))]
+        room["banned_users"] = [r[0] for r in conn.execute(
+            "SELECT username FROM room_banned_users WHERE room_id = ? ORDER BY position", (room_id,))]
+        return room
+
+    @staticmethod
+    def _row_to_dict(row):
+        room = dict(zip(ROOM_COLUMNS, row))
+        room["is_public"] = bool(room["is_public"])
+        room["notifications_enabled"] = bool(room["notifications_enabled"])
+        return room
+
+    def _write_room(self, conn, room):
+        conn.execute(
+            f"INSERT INTO rooms ({', '.join(ROOM_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(ROOM_COLUMNS))}) "
+            f"ON CONFLICT(id) DO UPDATE SET "
+            f"{', '.join(f'{c} = excluded.{c}' for c in ROOM_COLUMNS[1:])}",
+            (
+                room["id"], room["name"], room["owner"], int(bool(room["is_public"])),
+                room.get("password"), room.get("topic"), room.get("created_at"),
+                int(bool(room.get("notifications_enabled", True))),
+            ),
+        )
+        for table, key in (("room_members", "members"), ("room_banned_users", "banned_users")):
+            conn.execute(f"DELETE FROM {table} WHERE room_id = ?", (room["id"],))
+            users = list(dict.fromkeys(room.get(key) or []))
+            conn.executemany(
+                f"INSERT INTO {table} (room_id, username, position) VALUES (?, ?, ?)",
+                [(room["id"], username, position) for position, username in enumerate(users)],
+            )
+
+    def load_all(self):
+        conn = self._connect()
+        rooms = {}
+        for row in conn.execute(f"SELECT {', '.join(ROOM_COLUMNS)} FROM rooms ORDER BY created_at"):
+            room = self._row_to_dict(row)
+            room["members"] = []
+            room["banned_users"] = []
+            rooms[room["id"]] = room
+        for table, key in (("room_members", "members"), ("room_banned_users", "banned_users")):
+            for room_id, username in conn.execute(
+                    f"SELECT room_id, username FROM {table} ORDER BY room_id, position"):
+                if room_id in rooms:
+                    rooms[room_id][key].append(username)
+        return rooms
+
+    def get(self, room_id):
+        return self._read_room(self._connect(), room_id)
+
+    def save(self, room):
+        conn = self._connect()
+        with _Transaction(conn):
+            self._write_room(conn, room)
+
+    def update(self, room_id, mutate):
+        conn = self._connect()
+        with _Transaction(conn):
+            room = self._read_room(conn, room_id)
+            if room is None:
+                return False
+            result = mutate(room)
+            if result:
+                self._write_room(conn, room)
+            return result
+
+    def delete(self, room_id, predicate=None):
+        conn = self._connect()
+        with _Transaction(conn):
+            room = self._read_room(conn, room_id)
+            if room is None or (predicate and not predicate(room)):
+                return False
+            conn.execute("DELETE FROM rooms WHERE id = ?", (room_id,))
+            return True
+
+    def rooms_for_member(self, username):
+        """사용자가 참여 중인 채팅방 ID 목록 (멤버 인덱스 사용)"""
+        return [r[0] for r in self._connect().execute(
+            "SELECT room_id FROM room_members WHERE username = ?", (username,))]
+
+    def import_json(self, rooms_file):
+        """기존 rooms.json을 한 번만 가져옵니다. 가져온 채팅방 수를 반환합니다."""
+        if not os.path.exists(rooms_file):
+            return 0
+        conn = self._connect()
+        with _Transaction(conn):
+            done = conn.execute(
+                "SELECT value FROM meta WHERE key = 'imported_rooms_json'").fetchone()
+            if done:
+                return 0
+            with open(rooms_file, 'r') as f:
+                try:
+                    rooms = json.load(f)
+                except json.JSONDecodeError:
+                    rooms = {}
+            for room_id, room in rooms.items():
+                room.setdefault("id", room_id)
+                self._write_room(conn, room)
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('imported_rooms_json', ?)",
+                (str(len(rooms)),))
+            return len(rooms)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK 컨텍스트"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
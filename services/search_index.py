@@ -0,0 +1,509 @@
+import os
+import re
+import json
+import base64
+import tempfile
+import threading
+import unicodedata
+from array import array
+
+from services.message_log import MESSAGES_DIR, get_message_log
+
+SEARCH_DIR = os.path.join("data", "search")
+SNAPSHOT_FILE = "index.json"
+DELTA_SUFFIX = ".delta"
+INDEX_VERSION = 2          # 색인 형식이 바뀌면 올림 (다르면 처음부터 다시 색인)
+CATCH_UP_BATCH = 1000      # 채팅방 로그에서 한 번에 읽을 메시지 수
+SAVE_THRESHOLD = 5000      # 이만큼 새로 색인하면 변경분 저장
+VERIFY_BATCH = 64          # 검색 후보를 로그에서 한 번에 확인할 개수
+SEARCH_LIMIT = 20
+
+# 한글 음절/호환 자모와 한자는 글자 바이그램, 그 외 글자/숫자는 단어 단위로 색인
+_CJK_RUN = re.compile(r"[ᄀ-ᇿ㄰-㆏가-힣一-鿿]+")
+_WORD = re.compile(r"[^\W_]+")
+
+
+def normalize_text(text):
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def tokenize(text):
+    """검색 토큰 집합 (한글 연속 구간은 바이그램, 한 글자 구간은 그 글자, 라틴 문자 등은 단어)"""
+    text = normalize_text(text)
+    tokens = set()
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.add(run)
+        else:
+            tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    for word in _WORD.findall(_CJK_RUN.sub(" ", text)):
+        tokens.add(word)
+    return tokens
+
+
+def index_tokens(text):
+    """색인 토큰 집합. 한 글자 검색어도 포스팅 하나로 찾도록 한글/한자는 글자도 색인합니다."""
+    tokens = tokenize(text)
+    for run in _CJK_RUN.findall(normalize_text(text)):
+        tokens.update(run)
+    return tokens
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_postings(data):
+    """델타 + varint로 압축된 문서 번호 목록을 풉니다."""
+    docs = []
+    doc = 0
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        doc += value
+        docs.append(doc)
+        value = 0
+        shift = 0
+    return docs
+
+
+def iter_postings_desc(data, last_doc, end=None):
+    """포스팅을 마지막 문서(last_doc)부터 거꾸로 풉니다.
+
+    varint의 마지막 바이트만 최상위 비트가 0이므로 뒤에서부터 값 경계를 찾을 수
+    있어, 최신 결과 몇 개만 필요한 검색은 목록 전체를 풀지 않습니다.
+    """
+    end = len(data) if end is None else end
+    doc = last_doc
+    while end > 0:
+        start = end - 1
+        while start > 0 and data[start - 1] & 0x80:
+            start -= 1
+        value = 0
+        for i in range(end - 1, start - 1, -1):
+            value = (value << 7) | (data[i] & 0x7F)
+        yield doc
+        doc -= value
+        end = start
+
+
+def intersect_desc(iterators):
+    """내림차순 문서 번호 반복자들의 교집합을 내림차순으로 내보냅니다."""
+    current = [next(it, None) for it in iterators]
+    while current and None not in current:
+        top = min(current)
+        if max(current) == top:
+            yield top
+            current = [next(it, None) for it in iterators]
+            continue
+        for i, it in enumerate(iterators):
+            while current[i] is not None and current[i] > top:
+                current[i] = next(it, None)
+
+
+def _b64(data):
+    return base64.b64encode(bytes(data)).decode('ascii')
+
+
+class SearchIndex:
+    """채팅방 메시지 전문 검색용 역색인
+
+    메시지마다 증가하는 문서 번호를 붙이고, 토큰별 포스팅 목록은 문서
+    번호의 차이를 varint로 인코딩한 바이트열로 보관합니다. 문서 번호 ->
+    (채팅방, 순번, 시각) 표는 배열로 유지해 채팅방/시간 필터를 로그 없이
+    적용합니다. 색인은 채팅방 로그에서 마지막으로 색인한 순번 이후만
+    읽어 점진적으로 따라잡습니다.
+
+    저장은 마지막 저장 이후 색인한 문서만 변경분(.delta) 파일로 추가하고,
+    변경분이 스냅샷만큼 커졌을 때만 하나의 스냅샷으로 합칩니다.
+    """
+
+    def __init__(self, index_dir=SEARCH_DIR, messages_dir=MESSAGES_DIR):
+        self.index_dir = index_dir
+        self.messages_dir = messages_dir
+        self.snapshot_path = os.path.join(index_dir, SNAPSHOT_FILE)
+        self._lock = threading.Lock()
+        self._catch_up_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._reset()
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    def _reset(self):
+        self._postings = {}          # token -> bytearray
+        self._last_doc = {}          # token -> 마지막 문서 번호
+        self._rooms = []             # 채팅방 번호 -> room_id
+        self._room_numbers = {}      # room_id -> 채팅방 번호
+        self._watermarks = {}        # room_id -> 색인한 다음 순번
+        self._doc_room = array('I')
+        self._doc_seq = array('Q')
+        self._doc_time = array('q')  # 초 단위 시각 (없으면 0)
+        self._rejected = set()       # 검열에서 거부된 (room_id, seq)
+        self._unsaved = 0
+        # 마지막 저장 이후 변경분
+        self._saved_docs = 0
+        self._saved_rooms = 0
+        self._saved_watermarks = {}
+        self._new_postings = {}      # token -> [문서 번호, ...]
+        self._new_rejected = []
+        self._deltas = []            # 스냅샷 뒤에 쌓인 변경분 파일 경로
+        self._delta_bytes = 0
+        self._next_delta = 0         # 다음 변경분 파일 번호 (스냅샷에는 합친 다음 번호를 기록)
+
+    # 저장 / 복구
+    def _delta_paths(self):
+        """(번호, 경로) 목록 (번호 순)"""
+        deltas = []
+        for name in os.listdir(self.index_dir):
+            stem = name[:-len(DELTA_SUFFIX)]
+            if name.endswith(DELTA_SUFFIX) and stem.isdigit():
+                deltas.append((int(stem), os.path.join(self.index_dir, name)))
+        return sorted(deltas)
+
+    def _load(self):
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") != INDEX_VERSION:
+                    raise ValueError("색인 형식이 바뀌어 다시 색인합니다")
+                self._rooms = data["rooms"]
+                self._room_numbers = {room_id: i for i, room_id in enumerate(self._rooms)}
+                self._watermarks = data["watermarks"]
+                self._doc_room = array('I', base64.b64decode(data["doc_room"]))
+                self._doc_seq = array('Q', base64.b64decode(data["doc_seq"]))
+                self._doc_time = array('q', base64.b64decode(data["doc_time"]))
+                self._postings = {token: bytearray(base64.b64decode(value))
+                                  for token, value in data["postings"].items()}
+                self._last_doc = data["last_doc"]
+                self._rejected = {tuple(item) for item in data.get("rejected", [])}
+                self._next_delta = data["next_delta"]
+            for number, path in self._delta_paths():
+                if number < self._next_delta:
+                    os.remove(path)  # 스냅샷에 이미 합쳐진 변경분 (합친 뒤 지우기 전에 중단됨)
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    delta = json.load(f)
+                if delta.get("version") != INDEX_VERSION:
+                    raise ValueError("색인 형식이 바뀌어 다시 색인합니다")
+                if delta["first_doc"] != len(self._doc_seq):
+                    raise ValueError(f"변경분이 이어지지 않습니다: {path}")
+                self._apply_delta(delta)
+                self._deltas.append(path)
+                self._delta_bytes += os.path.getsize(path)
+                self._next_delta = number + 1
+        except Exception as e:
+            # 스냅샷/변경분이 손상되었으면 처음부터 다시 색인
+            print(f"Search index load error: {str(e)}")
+            for _, path in self._delta_paths():
+                os.remove(path)
+            if os.path.exists(self.snapshot_path):
+                os.remove(self.snapshot_path)
+            self._reset()
+            return
+        self._saved_docs = len(self._doc_seq)
+        self._saved_rooms = len(self._rooms)
+        self._saved_watermarks = dict(self._watermarks)
+
+    def _apply_delta(self, delta):
+        for room_id in delta["rooms"]:
+            self._room_numbers[room_id] = len(self._rooms)
+            self._rooms.append(room_id)
+        self._watermarks = delta["watermarks"]
+        self._doc_room.frombytes(base64.b64decode(delta["doc_room"]))
+        self._doc_seq.frombytes(base64.b64decode(delta["doc_seq"]))
+        self._doc_time.frombytes(base64.b64decode(delta["doc_time"]))
+        for token, value in delta["postings"].items():
+            self._append_postings(token, decode_postings(base64.b64decode(value)))
+        self._rejected.update(tuple(item) for item in delta["rejected"])
+
+    def _append_postings(self, token, docs):
+        postings = self._postings.get(token)
+        if postings is None:
+            postings = self._postings[token] = bytearray()
+        last = self._last_doc.get(token, 0)
+        for doc in docs:
+            encode_varint(doc - last, postings)
+            last = doc
+        self._last_doc[token] = last
+
+    def _write_json(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def save(self):
+        """마지막 저장 이후 색인한 부분만 변경분 파일로 원자적으로 저장합니다.
+
+        변경분이 스냅샷보다 커지면 스냅샷 하나로 합치므로 전체를 다시 쓰는
+        비용은 색인 크기가 두 배가 될 때마다 한 번꼴입니다.
+        """
+        with self._save_lock:
+            with self._lock:
+                docs = len(self._doc_seq)
+                if docs == self._saved_docs and not self._new_rejected:
+                    self._unsaved = 0
+                    return
+                first = self._saved_docs
+                delta = {
+                    "version": INDEX_VERSION,
+                    "first_doc": first,
+                    "count": docs - first,
+                    "rooms": self._rooms[self._saved_rooms:],
+                    "watermarks": dict(self._watermarks),
+                    "doc_room": _b64(self._doc_room[first:docs].tobytes()),
+                    "doc_seq": _b64(self._doc_seq[first:docs].tobytes()),
+                    "doc_time": _b64(self._doc_time[first:docs].tobytes()),
+                    "postings": {},
+                    "rejected": [list(item) for item in self._new_rejected],
+                }
+                for token, token_docs in self._new_postings.items():
+                    out = bytearray()
+                    last = 0
+                    for doc in token_docs:
+                        encode_varint(doc - last, out)
+                        last = doc
+                    delta["postings"][token] = _b64(out)
+                self._saved_docs = docs
+                self._saved_rooms = len(self._rooms)
+                self._saved_watermarks = delta["watermarks"]
+                self._new_postings = {}
+                self._new_rejected = []
+                self._unsaved = 0
+            path = os.path.join(self.index_dir, f"{self._next_delta:012d}{DELTA_SUFFIX}")
+            self._write_json(path, delta)
+            self._next_delta += 1
+            self._deltas.append(path)
+            self._delta_bytes += os.path.getsize(path)
+            snapshot_bytes = os.path.getsize(self.snapshot_path) if os.path.exists(self.snapshot_path) else 0
+            if self._delta_bytes >= snapshot_bytes:
+                self._compact()
+
+    def _compact(self):
+        """스냅샷과 변경분을 하나의 스냅샷으로 합칩니다. (_save_lock 안에서 호출)"""
+        with self._lock:
+            docs = self._saved_docs
+            data = {
+                "version": INDEX_VERSION,
+                "next_delta": self._next_delta,
+                "rooms": self._rooms[:self._saved_rooms],
+                "watermarks": dict(self._saved_watermarks),
+                "doc_room": _b64(self._doc_room[:docs].tobytes()),
+                "doc_seq": _b64(self._doc_seq[:docs].tobytes()),
+                "doc_time": _b64(self._doc_time[:docs].tobytes()),
+                "postings": {},
+                "last_doc": {},
+                "rejected": [list(item) for item in self._rejected],
+            }
+            # 마지막 저장 이후 색인한 문서는 다음 변경분에 들어가므로 스냅샷에서는 제외
+            for token, postings in self._postings.items():
+                pending = self._new_postings.get(token)
+                if not pending:
+                    data["postings"][token] = _b64(postings)
+                    data["last_doc"][token] = self._last_doc[token]
+                    continue
+                saved = decode_postings(postings)[:-len(pending)]
+                if not saved:
+                    continue
+                out = bytearray()
+                last = 0
+                for doc in saved:
+                    encode_varint(doc - last, out)
+                    last = doc
+                data["postings"][token] = _b64(out)
+                data["last_doc"][token] = last
+            # 저장 이후의 거부 기록이 섞여도 다음 변경분과 같은 내용이므로 무해함
+        self._write_json(self.snapshot_path, data)
+        for path in self._deltas:
+            if os.path.exists(path):
+                os.remove(path)
+        self._deltas = []
+        self._delta_bytes = 0
+
+    # 색인
+    @staticmethod
+    def _searchable(message):
+        return isinstance(message.get("content"), str) and "target" not in message
+
+    def add(self, room_id, message):
+        """메시지 하나를 색인합니다. (message에는 seq가 있어야 함)"""
+        with self._lock:
+            self._add(room_id, message)
+
+    def _add(self, room_id, message):
+        seq = message["seq"]
+        if seq < self._watermarks.get(room_id, 0):
+            return  # 이미 색인한 메시지
+        self._watermarks[room_id] = seq + 1
+        if "target" in message:
+            # 검열 판정 기록(경고 메시지)은 색인하지 않고 거부된 메시지만 기억
+            self._rejected.add((room_id, message["target"]))
+            self._new_rejected.append((room_id, message["target"]))
+            return
+        if not self._searchable(message):
+            return
+        room_number = self._room_numbers.get(room_id)
+        if room_number is None:
+            room_number = self._room_numbers[room_id] = len(self._rooms)
+            self._rooms.append(room_id)
+
+        doc = len(self._doc_seq)
+        self._doc_room.append(room_number)
+        self._doc_seq.append(seq)
+        self._doc_time.append(int(message.get("timestamp") or 0))
+        for token in index_tokens(message["content"]):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = bytearray()
+                encode_varint(doc, postings)
+            else:
+                encode_varint(doc - self._last_doc[token], postings)
+            self._last_doc[token] = doc
+            self._new_postings.setdefault(token, []).append(doc)
+        self._unsaved += 1
+
+    def room_ids(self):
+        if not os.path.isdir(self.messages_dir):
+            return []
+        return [name for name in os.listdir(self.messages_dir)
+                if os.path.isdir(os.path.join(self.messages_dir, name))]
+
+    def catch_up(self, room_ids=None):
+        """채팅방 로그에서 아직 색인하지 않은 메시지만 읽어 색인합니다."""
+        indexed = 0
+        with self._catch_up_lock:
+            for room_id in (self.room_ids() if room_ids is None else room_ids):
+                room_log = get_message_log(room_id, base_dir=self.messages_dir)
+                while True:
+                    start = self._watermarks.get(room_id, 0)
+                    if start >= room_log.next_seq:
+                        break
+                    messages = room_log.read_range(start, start + CATCH_UP_BATCH)
+                    if not messages:
+                        break
+                    with self._lock:
+                        for message in messages:
+                            self._add(room_id, message)
+                    indexed += len(messages)
+            if self._unsaved >= SAVE_THRESHOLD:
+                self.save()
+        return indexed
+
+    # 검색
+    def _candidates(self, tokens):
+        """모든 토큰이 들어 있는 문서 번호를 최신순으로 내보내는 반복자"""
+        iterators = []
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                return iter(())
+            # 포스팅은 뒤에 추가만 되므로 지금 길이와 마지막 문서까지만 읽음
+            iterators.append(iter_postings_desc(postings, self._last_doc[token], len(postings)))
+        return intersect_desc(iterators)
+
+    def search(self, query, room_ids=None, since=None, until=None, limit=SEARCH_LIMIT):
+        """query가 들어 있는 메시지를 최신순으로 반환합니다.
+
+        room_ids로 채팅방을, since/until(초 단위 시각)로 기간을 제한합니다.
+        후보는 포스팅을 뒤에서부터 풀어 최신 문서부터 필요한 만큼만 만들고,
+        바이그램 일치만으로는 다른 위치의 글자 조합이 걸릴 수 있으므로
+        VERIFY_BATCH개씩 로그에서 한꺼번에 읽어 검색어가 실제로 들어 있는지
+        확인합니다. 결과는 room_id가 추가된 메시지 딕셔너리 목록입니다.
+        """
+        tokens = tokenize(query)
+        terms = normalize_text(query).split()
+        if not tokens:
+            return []
+        with self._lock:
+            room_numbers = None
+            if room_ids is not None:
+                room_numbers = {self._room_numbers[room_id] for room_id in room_ids
+                                if room_id in self._room_numbers}
+            candidates = self._candidates(tokens)
+
+        # 문서 표와 포스팅은 추가만 되므로 잠금 밖에서 읽어도 안전
+        results = []
+        batch = []
+        for doc in candidates:
+            room_number = self._doc_room[doc]
+            if room_numbers is not None and room_number not in room_numbers:
+                continue
+            timestamp = self._doc_time[doc]
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp >= until:
+                continue
+            room_id, seq = self._rooms[room_number], self._doc_seq[doc]
+            if (room_id, seq) in self._rejected:
+                continue
+            batch.append((room_id, seq))
+            if len(batch) >= VERIFY_BATCH:
+                results.extend(self._verify(batch, terms))
+                batch = []
+                if len(results) >= limit:
+                    break
+        if batch and len(results) < limit:
+            results.extend(self._verify(batch, terms))
+        return results[:limit]
+
+    def _verify(self, batch, terms):
+        """후보 (room_id, seq) 목록 중 검색어가 실제로 들어 있는 메시지 (후보 순서 유지)"""
+        by_room = {}
+        for room_id, seq in batch:
+            by_room.setdefault(room_id, []).append(seq)
+        found = {}
+        for room_id, seqs in by_room.items():
+            room_log = get_message_log(room_id, base_dir=self.messages_dir)
+            for seq, message in room_log.read_many(seqs).items():
+                found[(room_id, seq)] = message
+        results = []
+        for room_id, seq in batch:
+            message = found.get((room_id, seq))
+            if message is None:
+                continue
+            content = normalize_text(message.get("content", ""))
+            if all(term in content for term in terms):
+                results.append(dict(message, room_id=room_id))
+        return results
+
+    def rejected_seqs(self, room_id):
+        """색인한 판정 기록 중 room_id에서 거부된 메시지 순번 목록"""
+        with self._lock:
+            return [seq for rejected_room, seq in self._rejected if rejected_room == room_id]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'documents': len(self._doc_seq),
+                'tokens': len(self._postings),
+                'posting_bytes': sum(len(p) for p in self._postings.values()),
+                'rooms': len(self._rooms),
+                'deltas': len(self._deltas),
+            }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(index_dir=SEARCH_DIR, messages_dir=MESSAGES_DIR):
+    """프로세스 전체에서 공유되는 검색 색인을 반환합니다."""
+    with _indexes_lock:
+        index = _indexes.get(index_dir)
+        if index is None:
+            index = SearchIndex(index_dir, messages_dir)
+            _indexes[index_dir] = index
+        return index
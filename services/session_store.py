@@ -0,0 +1,170 @@
+import os
+import time
+import heapq
+import sqlite3
+import secrets
+import threading
+
+SESSION_TTL = 12 * 3600      # 로그인 유지 기간 (초, 사용할 때마다 연장)
+PURGE_INTERVAL = 60          # 만료 세션 정리 최소 간격 (초)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at);
+"""
+
+
+class SessionStore:
+    """로그인 세션 저장소 (토큰별 레코드, SQLite)
+
+    세션마다 임의의 토큰을 발급해 한 행씩 저장하므로 여러 사용자가 서로의
+    세션을 덮어쓰지 않습니다. 유효한 세션은 메모리에도 유지되어 rerun마다
+    하는 조회에는 디스크 I/O가 없고, 만료 정리는 만료 시각 인덱스(디스크)와
+    최소 힙(메모리)을 사용하므로 만료된 세션 수만큼만 비용이 듭니다.
+    """
+
+    def __init__(self, db_path, ttl=SESSION_TTL, purge_interval=PURGE_INTERVAL):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = {}  # token -> (username, expires_at)
+        self._heap = []      # (expires_at, token), 오래된 항목은 지연 삭제
+        self._last_purge = 0.0
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._load(conn)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conn):
+        now = time.time()
+        conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        for token, username, expires_at in conn.execute(
+                "SELECT token, username, expires_at FROM sessions"):
+            self._sessions[token] = (username, expires_at)
+            self._heap.append((expires_at, token))
+        heapq.heapify(self._heap)
+
+    def _remember(self, token, username, expires_at):
+        self._sessions[token] = (username, expires_at)
+        heapq.heappush(self._heap, (expires_at, token))
+
+    def create(self, username, now=None):
+        """새 세션을 만들고 토큰을 반환합니다."""
+        now = time.time() if now is None else now
+        token = secrets.token_urlsafe(32)
+        expires_at = now + self.ttl
+        self._connect().execute(
+            "INSERT INTO sessions (token, username, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (token, username, now, expires_at))
+        with self._lock:
+            self._remember(token, username, expires_at)
+        return token
+
+    def get(self, token, now=None):
+        """토큰의 사용자명을 반환합니다. 없거나 만료되었으면 None.
+
+        남은 기간이 절반 아래로 줄었을 때만 만료 시각을 연장해 기록하므로
+        대부분의 조회는 메모리에서 끝납니다.
+        """
+        if not token:
+            return None
+        now = time.time() if now is None else now
+        self.purge_expired(now)
+        with self._lock:
+            entry = self._sessions.get(token)
+        if entry is None or entry[1] <= now:
+            return None
+        username, expires_at = entry
+        if expires_at - now < self.ttl / 2:
+            expires_at = now + self.ttl
+            self._connect().execute(
+                "UPDATE sessions SET expires_at = ? WHERE token = ?", (expires_at, token))
+            with self._lock:
+                if token in self._sessions:
+                    self._remember(token, username, expires_at)
+        return username
+
+    def rotate(self, token, now=None):
+        """토큰을 폐기하고 같은 사용자의 새 토큰을 발급합니다. 없거나 만료되었으면 None.
+
+        URL 등으로 노출된 토큰은 한 번 복원에 쓰이고 나면 더 이상 쓸 수 없습니다.
+        """
+        if not token:
+            return None
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._sessions.pop(token, None)
+        self._connect().execute("DELETE FROM sessions WHERE token = ?", (token,))
+        if entry is None or entry[1] <= now:
+            return None
+        return self.create(entry[0], now)
+
+    def rename_user(self, old_username, new_username):
+        """닉네임 변경 시 그 사용자의 모든 세션의 사용자명을 바꿉니다."""
+        with self._lock:
+            for token, (username, expires_at) in self._sessions.items():
+                if username == old_username:
+                    self._sessions[token] = (new_username, expires_at)
+        self._connect().execute(
+            "UPDATE sessions SET username = ? WHERE username = ?", (new_username, old_username))
+
+    def delete(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+        self._connect().execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def purge_expired(self, now=None):
+        """만료된 세션을 정리합니다. (PURGE_INTERVAL마다 한 번)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if now - self._last_purge < self.purge_interval:
+                return 0
+            self._last_purge = now
+            expired = 0
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                expires_at, token = heapq.heappop(heap)
+                entry = self._sessions.get(token)
+                # 만료 시각이 연장된 세션이면 오래된 힙 항목일 뿐이므로 무시
+                if entry is not None and entry[1] == expires_at:
+                    del self._sessions[token]
+                    expired += 1
+            if len(heap) > 2 * len(self._sessions) + 64:
+                self._heap = [(expires_at, t) for t, (_, expires_at) in self._sessions.items()]
+                heapq.heapify(self._heap)
+        if expired:
+            self._connect().execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        return expired
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_session_store(db_path):
+    """프로세스 전체에서 공유되는 세션 저장소를 반환합니다."""
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = SessionStore(db_path)
+            _stores[db_path] = store
+        return store
@@ -0,0 +1,176 @@
+import os
+import json
+import tempfile
+import threading
+import itertools
+
+from services.metrics import METRICS_ENABLED, add_bytes
+
+LOG_SUFFIX = ".log"
+COMPACT_THRESHOLD = 500  # 변경 로그가 이만큼 쌓이면 백그라운드에서 압축
+
+
+class UserRegistry:
+    """닉네임 등록부
+
+    닉네임은 메모리 해시 인덱스(닉네임 -> 등록 순번)로 관리하므로 조회는
+    O(1)입니다. 추가/변경/삭제는 users.txt를 다시 쓰지 않고 변경 로그에 한
+    줄씩 추가하며(삭제는 tombstone), 로그가 COMPACT_THRESHOLD줄 쌓이면
+    백그라운드 스레드가 등록 순서대로 users.txt를 다시 만들고 로그를
+    비웁니다. 닉네임을 바꿔도 원래 등록 순서는 유지됩니다.
+    """
+
+    def __init__(self, path, compact_threshold=COMPACT_THRESHOLD):
+        self.path = path
+        self.log_path = path + LOG_SUFFIX
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._users = {}  # username -> 등록 순번
+        self._order = itertools.count()
+        self._log_lines = 0
+        self._load()
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+
+    # 적재 / 복구
+    def _load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    name = line.rstrip("\r\n")
+                    if name and name not in self._users:
+                        self._users[name] = next(self._order)
+        # 압축 중이던 로그(.old)와 현재 로그를 순서대로 다시 적용
+        for path in (self.log_path + ".old", self.log_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break  # 기록 도중 잘린 마지막 줄
+                    self._apply(json.loads(line))
+                    self._log_lines += 1
+
+    def _apply(self, op):
+        # 압축 직후 .old가 남은 상태에서 다시 적용해도 결과가 같도록 멱등하게 처리
+        kind = op["op"]
+        if kind == "add":
+            if op["name"] not in self._users:
+                self._users[op["name"]] = next(self._order)
+        elif kind == "rename":
+            if op["old"] in self._users and op["new"] not in self._users:
+                self._users[op["new"]] = self._users.pop(op["old"])
+        elif kind == "delete":
+            self._users.pop(op["name"], None)
+
+    def _record(self, op):
+        self._apply(op)
+        line = json.dumps(op, ensure_ascii=False) + "\n"
+        self._log.write(line)
+        self._log.flush()
+        if METRICS_ENABLED:
+            add_bytes("users", "write", len(line.encode('utf-8')))
+        self._log_lines += 1
+        if self._log_lines >= self.compact_threshold and not self._compact_lock.locked():
+            threading.Thread(target=self._compact_quietly, name="user-registry-compact",
+                             daemon=True).start()
+
+    # 조회
+    def __contains__(self, username):
+        return username in self._users
+
+    def __len__(self):
+        return len(self._users)
+
+    def names(self):
+        """등록 순서대로 정렬된 닉네임 목록"""
+        with self._lock:
+            return sorted(self._users, key=self._users.get)
+
+    # 변경
+    def add(self, username):
+        """새 닉네임을 등록합니다. 이미 있으면 False."""
+        with self._lock:
+            if username in self._users:
+                return False
+            self._record({"op": "add", "name": username})
+            return True
+
+    def rename(self, old_username, new_username, on_rename=None):
+        """닉네임을 변경합니다.
+
+        on_rename(old, new)는 등록부 잠금 안에서 로그 기록 전에 호출되므로,
+        프로필 이동이 실패하면 닉네임도 바뀌지 않고, 그 사이에
+        다른 세션이 새 닉네임을 가져갈 수 없습니다.
+        """
+        with self._lock:
+            if old_username not in self._users or new_username in self._users:
+                return False
+            if on_rename is not None:
+                on_rename(old_username, new_username)
+            self._record({"op": "rename", "old": old_username, "new": new_username})
+            return True
+
+    def delete(self, username):
+        with self._lock:
+            if username not in self._users:
+                return False
+            self._record({"op": "delete", "name": username})
+            return True
+
+    # 압축
+    def _compact_quietly(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"User registry compaction error: {str(e)}")
+
+    def compact(self):
+        """현재 닉네임 목록으로 users.txt를 원자적으로 다시 쓰고 변경 로그를 비웁니다."""
+        with self._compact_lock:
+            with self._lock:
+                if not self._log_lines:
+                    return
+                self._log.close()
+                old_path = self.log_path + ".old"
+                if os.path.exists(old_path):
+                    # 이전 압축이 실패해 남은 로그 뒤에 이어 붙임
+                    with open(self.log_path, 'r', encoding='utf-8') as src, \
+                            open(old_path, 'a', encoding='utf-8') as dst:
+                        dst.write(src.read())
+                    os.remove(self.log_path)
+                else:
+                    os.replace(self.log_path, old_path)
+                self._log = open(self.log_path, 'a', encoding='utf-8')
+                names = sorted(self._users, key=self._users.get)
+                compacted, self._log_lines = self._log_lines, 0
+
+            directory = os.path.dirname(self.path) or '.'
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(''.join(f"{name}\n" for name in names))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                with self._lock:
+                    self._log_lines += compacted
+                raise
+            os.remove(old_path)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_user_registry(path):
+    """프로세스 전체에서 공유되는 닉네임 등록부를 반환합니다."""
+    with _registries_lock:
+        registry = _registries.get(path)
+        if registry is None:
+            registry = UserRegistry(path)
+            _registries[path] = registry
+        return registry
@@ -0,0 +1,103 @@
+from collections import deque
+
+
+def _fold(ch):
+    """대소문자 무시 비교용 문자 변환 (길이가 바뀌는 문자는 그대로 둠)"""
+    lowered = ch.lower()
+    return lowered if len(lowered) == 1 else ch
+
+
+class WordMatcher:
+    """Aho-Corasick 기반 다중 단어 매처
+
+    단어 목록으로 오토마톤을 한 번 만들어 두면, 메시지 하나를 한 번만 훑어서
+    모든 단어의 등장 위치를 찾고 마스킹까지 처리합니다.
+    """
+
+    def __init__(self, words, ignore_case=False):
+        self.ignore_case = ignore_case
+        # 중복/빈 단어 제거 (원래 순서 유지)
+        self.words = [w for w in dict.fromkeys(words) if w]
+        self._build()
+
+    def _key(self, ch):
+        return _fold(ch) if self.ignore_case else ch
+
+    def _build(self):
+        # 노드별 전이 테이블, 실패 링크, 출력(단어 인덱스 목록)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for index, word in enumerate(self.words):
+            node = 0
+            for ch in word:
+                key = self._key(ch)
+                nxt = self._goto[node].get(key)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][key] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for key, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and key not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(key, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """(시작 위치, 끝 위치, 단어 인덱스)를 등장 순서대로 생성합니다."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for pos, ch in enumerate(text):
+            key = self._key(ch)
+            while node and key not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(key, 0)
+            for index in out[node]:
+                yield pos + 1 - len(self.words[index]), pos + 1, index
+
+    def find_all(self, text):
+        """텍스트에 등장한 단어 목록을 원래 단어 목록 순서로 반환합니다."""
+        if not self.words or not text:
+            return []
+        found = {index for _, _, index in self.iter_matches(text)}
+        return [self.words[index] for index in sorted(found)]
+
+    def mask(self, text, mask_char='*'):
+        """등장한 모든 단어를 같은 길이의 mask_char로 가립니다."""
+        if not self.words or not text:
+            return text
+        # 구간 시작/끝만 표시해 두고 한 번에 누적합으로 가릴 위치를 계산
+        marks = None
+        for start, end, _ in self.iter_matches(text):
+            if marks is None:
+                marks = [0] * (len(text) + 1)
+            marks[start] += 1
+            marks[end] -= 1
+        if marks is None:
+            return text
+
+        chars = []
+        depth = 0
+        for ch, mark in zip(text, marks):
+            depth += mark
+            chars.append(mask_char if depth else ch)
+        return ''.join(chars)
+
+    def find_all_many(self, texts):
+        """여러 메시지에 대해 find_all을 수행합니다."""
+        return [self.find_all(text) for text in texts]
+
+    def mask_many(self, texts, mask_char='*'):
+        """여러 메시지에 대해 mask를 수행합니다."""
+        return [self.mask(text, mask_char) for text in texts]
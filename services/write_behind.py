@@ -0,0 +1,261 @@
+import os
+import json
+import copy
+import time
+import atexit
+import tempfile
+import threading
+
+from services.metrics import METRICS_ENABLED, add_bytes
+
+FLUSH_INTERVAL = 0.5    # 그룹 커밋 주기 (초)
+FLUSH_THRESHOLD = 100   # 이 개수 이상 변경이 쌓이면 바로 커밋
+JOURNAL_SUFFIX = ".journal"
+FILE_CHECK_INTERVAL = 1.0  # 외부 파일 변경 확인 최소 간격 (초)
+
+
+class WriteBehindStore:
+    """파일 저장소 앞단의 write-behind 계층
+
+    변경 사항은 메모리 상태에 즉시 반영되고(읽기는 항상 최신 값을 봄),
+    작은 저널 파일에 한 줄씩 추가된 뒤, 백그라운드 커미터가 주기적으로
+    또는 변경이 FLUSH_THRESHOLD개 쌓였을 때 임시 파일 + rename으로 원본
+    파일을 원자적으로 교체합니다. 비정상 종료 시에는 다음 시작 때 저널을
+    다시 적용합니다. 저널에는 키별 set/delete만 기록하므로 원본 파일에 이미
+    반영된 저널을 다시 적용해도 결과가 같습니다.
+    """
+
+    def __init__(self, path, load, dump, default):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self._load = load
+        self._dump = dump
+        self._default = default
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._state = None
+        self._journal = None
+        self._pending = 0
+        self._file_sig = None  # 마지막으로 읽거나 쓴 파일의 (mtime_ns, size)
+        self._file_checked = 0.0
+        self.version = 0       # 변경될 때마다 증가
+        self.file_version = 0  # 원본 파일이 외부에서 바뀌어 다시 읽을 때마다 증가
+        self._listeners = []   # 키가 바뀔 때마다 listener(key)로 호출
+
+    # 상태 적재 / 복구
+    def _ensure_loaded(self):
+        if self._state is not None:
+            return
+        self._state = self._read_file()
+        replayed = 0
+        # 커밋 중이던 저널(.old)과 현재 저널을 순서대로 다시 적용
+        for path in (self.journal_path + ".old", self.journal_path):
+            replayed += self._replay(path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        if replayed:
+            self._pending = replayed
+            _committer.notify(self, urgent=True)
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _read_file(self):
+        self._file_sig = self._stat()
+        if not os.path.exists(self.path):
+            return copy.deepcopy(self._default)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = self._load(f)
+            if METRICS_ENABLED and self._file_sig:
+                add_bytes(os.path.basename(self.path), "read", self._file_sig[1])
+            return state
+        except Exception:
+            return copy.deepcopy(self._default)
+
+    def _replay(self, path):
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # 기록 도중 잘린 마지막 줄
+                self._apply(json.loads(line))
+                count += 1
+        return count
+
+    def _apply(self, op):
+        kind = op["op"]
+        if kind == "set":
+            self._state[op["key"]] = op["value"]
+        elif kind == "delete":
+            self._state.pop(op["key"], None)
+
+    # 변경
+    def _record(self, op):
+        with self._lock:
+            self._ensure_loaded()
+            self._apply(op)
+            line = json.dumps(op, ensure_ascii=False) + "\n"
+            self._journal.write(line)
+            self._journal.flush()
+            if METRICS_ENABLED:
+                add_bytes(os.path.basename(self.path), "write", len(line.encode('utf-8')))
+            self._pending += 1
+            self.version += 1
+            pending = self._pending
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(op["key"])
+        _committer.notify(self, urgent=pending >= FLUSH_THRESHOLD)
+
+    def subscribe(self, listener):
+        """키가 바뀔 때마다 listener(key)를 호출하도록 등록합니다. (캐시 항목 무효화용)"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def set(self, key, value):
+        self._record({"op": "set", "key": key, "value": copy.deepcopy(value)})
+
+    def delete(self, key):
+        self._record({"op": "delete", "key": key})
+
+    # 읽기
+    def get(self, key, default=None):
+        with self._lock:
+            self._ensure_loaded()
+            value = self._state.get(key, default)
+            return copy.deepcopy(value)
+
+    def value(self):
+        """저장소 전체 상태의 복사본"""
+        with self._lock:
+            self._ensure_loaded()
+            return copy.deepcopy(self._state)
+
+    def check_file(self):
+        """원본 파일이 외부에서 바뀌었으면 다시 읽고, file_version을 반환합니다.
+
+        stat 호출은 FILE_CHECK_INTERVAL마다 한 번만 하며, 아직 커밋되지 않은
+        변경이 있으면 메모리 상태를 우선합니다.
+        """
+        now = time.monotonic()
+        if now - self._file_checked < FILE_CHECK_INTERVAL:
+            return self.file_version
+        with self._lock:
+            self._file_checked = now
+            if self._state is None or self._pending or self._flush_lock.locked():
+                return self.file_version
+            if self._stat() != self._file_sig:
+                self._state = self._read_file()
+                self.version += 1
+                self.file_version += 1
+            return self.file_version
+
+    # 커밋
+    def _write_file(self, state):
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                self._dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            if METRICS_ENABLED:
+                add_bytes(os.path.basename(self.path), "write", os.path.getsize(tmp_path))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _rotate_journal(self):
+        """현재 저널을 .old로 분리합니다. 이전 커밋이 실패해 .old가 남아 있으면 이어 붙입니다."""
+        self._journal.close()
+        old_path = self.journal_path + ".old"
+        if os.path.exists(old_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as src, \
+                    open(old_path, 'a', encoding='utf-8') as dst:
+                dst.write(src.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, old_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def flush(self):
+        """쌓인 변경을 원자적으로 원본 파일에 반영합니다.
+
+        상태 복사와 저널 분리만 잠금 안에서 하고, 파일 쓰기는 잠금 밖에서
+        하므로 커밋 중에도 다른 요청의 변경이 막히지 않습니다.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._state is None or not self._pending:
+                    return
+                self._rotate_journal()
+                state = copy.deepcopy(self._state)
+                pending, self._pending = self._pending, 0
+            try:
+                self._write_file(state)
+            except Exception:
+                with self._lock:
+                    self._pending += pending
+                raise
+            with self._lock:
+                self._file_sig = self._stat()
+            os.remove(self.journal_path + ".old")
+
+
+class _Committer:
+    """등록된 저장소들을 주기적으로 그룹 커밋하는 백그라운드 스레드"""
+
+    def __init__(self, interval=FLUSH_INTERVAL):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._dirty = set()
+        self._urgent = False
+        self._thread = None
+
+    def notify(self, store, urgent=False):
+        with self._cond:
+            self._dirty.add(store)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+            if urgent:
+                self._urgent = True
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._urgent:
+                    self._cond.wait(self.interval)
+                self._urgent = False
+                stores, self._dirty = self._dirty, set()
+            for store in stores:
+                try:
+                    store.flush()
+                except Exception as e:
+                    print(f"Write-behind commit error ({store.path}): {str(e)}")
+                    with self._cond:
+                        self._dirty.add(store)  # 다음 주기에 다시 시도
+
+    def flush_all(self):
+        with self._cond:
+            stores, self._dirty = self._dirty, set()
+        for store in stores:
+            store.flush()
+
+
+_committer = _Committer()
+atexit.register(_committer.flush_all)
+
+
+def flush_all():
+    """대기 중인 모든 변경을 즉시 커밋합니다."""
+    _committer.flush_all()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 저장소 루트를 import 경로에 추가 (bench/와 같은 방식)
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
@@ -0,0 +1,47 @@
+import json
+import os
+
+from services import write_behind
+from services.lru_cache import VersionedLRUCache
+from services.write_behind import WriteBehindStore
+
+
+def make_cache(tmp_path):
+    store = WriteBehindStore(str(tmp_path / "profiles.json"), json.load, json.dump, {})
+    cache = VersionedLRUCache(16, version=store.check_file)
+    store.subscribe(cache.invalidate)
+    return store, cache
+
+
+def test_save_invalidates_only_that_key(tmp_path):
+    store, cache = make_cache(tmp_path)
+    store.set("kim", {"status": "offline"})
+    store.set("lee", {"status": "offline"})
+    assert cache.get("kim", store.get) == {"status": "offline"}
+    assert cache.get("lee", store.get) == {"status": "offline"}
+
+    store.set("kim", {"status": "online"})
+    assert cache.get("kim", store.get) == {"status": "online"}
+    cache.get("lee", store.get)
+    assert cache.stats()["hits"] == 1  # lee는 캐시에 남아 있음
+
+
+def test_returned_value_is_a_copy(tmp_path):
+    store, cache = make_cache(tmp_path)
+    store.set("kim", {"status": "offline"})
+    cache.get("kim", store.get)["status"] = "changed"
+    assert cache.get("kim", store.get) == {"status": "offline"}
+
+
+def test_outside_file_edit_clears_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(write_behind, "FILE_CHECK_INTERVAL", 0)
+    store, cache = make_cache(tmp_path)
+    store.set("kim", {"status": "offline"})
+    store.flush()
+    assert cache.get("kim", store.get) == {"status": "offline"}
+
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"kim": {"status": "edited"}}), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.get("kim", store.get) == {"status": "edited"}
@@ -0,0 +1,67 @@
+import io
+
+import pytest
+
+from models.message import Message, decode_record, encode_record, record_length
+
+
+MESSAGES = [
+    Message("user", "김철수", "안녕하세요", timestamp_ms=1700000000123, seq=3),
+    Message("assistant", "bot", "", timestamp_ms=0, status="approved"),
+    Message("user", "kim", "경고", timestamp_ms=1700000000000, status="rejected", target=2 ** 40),
+    Message("user", "lee", "이전 형식", time_text="12:34"),
+    Message("user", "park", "x" * 70000, timestamp_ms=1, status="pending", target=0, time_text="09:00"),
+]
+
+
+@pytest.mark.parametrize("message", MESSAGES)
+def test_encode_decode_round_trip(message):
+    assert message.encodable()
+    assert Message.decode(message.encode(), seq=message.seq) == message
+
+
+def test_decode_keeps_time_text_and_target():
+    message = Message("user", "lee", "hi", target=7, time_text="23:59")
+    decoded = Message.decode(message.encode())
+    assert decoded.time_text == "23:59"
+    assert decoded.target == 7
+    assert decoded.time == "23:59"
+
+
+def test_dict_records_round_trip():
+    data = {"role": "user", "content": "안녕", "username": "kim", "time": "10:00",
+            "timestamp": 1700000000.5, "target": 4}
+    raw = encode_record(data, seq=9)
+    assert raw[:1] != b"{"
+    decoded = decode_record(raw, seq=9)
+    assert decoded["timestamp"] == data["timestamp"]
+    assert decoded["target"] == 4
+    assert decoded["seq"] == 9
+
+
+def test_unknown_keys_fall_back_to_json():
+    data = {"role": "user", "content": "hi", "username": "kim", "time": "10:00", "extra": 1}
+    raw = encode_record(data, seq=1)
+    assert raw.endswith(b"\n")
+    assert decode_record(raw.rstrip(b"\n"), seq=1) == dict(data, seq=1)
+
+
+def test_record_length_complete_records():
+    binary = MESSAGES[0].encode()
+    json_line = encode_record({"role": "user", "content": "hi", "username": "kim", "extra": 1}, seq=1)
+    f = io.BytesIO(binary + json_line)
+    assert record_length(f) == len(binary)
+    f.seek(len(binary))
+    assert record_length(f) == len(json_line)
+    assert record_length(f) == 0  # 파일 끝
+
+
+@pytest.mark.parametrize("cut", [1, 3, 5, 10, -1])
+def test_record_length_truncated_binary_tail(cut):
+    record = MESSAGES[2].encode()
+    assert record_length(io.BytesIO(record[:cut])) == 0
+
+
+def test_record_length_truncated_json_tail():
+    line = encode_record({"role": "user", "content": "hi", "username": "kim", "extra": 1}, seq=1)
+    assert record_length(io.BytesIO(line[:-1])) == 0
@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from services.message_log import INDEX_ENTRY, MessageLog
+
+
+def make_message(i):
+    return {"role": "user", "username": "kim", "content": f"메시지 {i} " + "가" * 20, "timestamp": 1700000000 + i}
+
+
+def contents(messages):
+    return [message["content"] for message in messages]
+
+
+def segment_paths(log):
+    return [(segment.log_path, segment.index_path) for segment in log._segments]
+
+
+@pytest.fixture
+def messages_dir(tmp_path):
+    return str(tmp_path / "messages")
+
+
+def fill(messages_dir, n, segment_max_bytes=200):
+    log = MessageLog("room", base_dir=messages_dir, segment_max_bytes=segment_max_bytes)
+    for i in range(n):
+        assert log.append(make_message(i)) == i
+    return log
+
+
+def test_segments_roll_over_and_read_across_boundaries(messages_dir):
+    log = fill(messages_dir, 30)
+    assert len(log._segments) > 3
+    bases = [segment.base_seq for segment in log._segments]
+    assert bases == sorted(bases) and bases[0] == 0
+    assert contents(log.read_range(0)) == [make_message(i)["content"] for i in range(30)]
+    assert contents(log.read_range(bases[1] - 1, bases[2] + 1)) == [
+        make_message(i)["content"] for i in range(bases[1] - 1, bases[2] + 1)
+    ]
+    assert contents(log.read_last(3)) == [make_message(i)["content"] for i in (27, 28, 29)]
+    assert contents(log.read_after(25, limit=2)) == [make_message(i)["content"] for i in (26, 27)]
+    assert log.read_range(30) == []
+
+
+def test_read_many_spans_segments(messages_dir):
+    log = fill(messages_dir, 30)
+    found = log.read_many([29, 0, 13, 13, 99, -1])
+    assert sorted(found) == [0, 13, 29]
+    assert found[13]["content"] == make_message(13)["content"]
+
+
+def test_reopen_continues_sequence(messages_dir):
+    fill(messages_dir, 30).close()
+    log = MessageLog("room", base_dir=messages_dir, segment_max_bytes=200)
+    assert log.next_seq == 30
+    assert log.append(make_message(30)) == 30
+    assert contents(log.read_last(2)) == [make_message(i)["content"] for i in (29, 30)]
+
+
+def test_truncated_tail_is_dropped(messages_dir):
+    log = fill(messages_dir, 5, segment_max_bytes=1 << 20)
+    log.close()
+    log_path, index_path = segment_paths(log)[-1]
+    # 마지막 레코드를 쓰다가 죽은 상황: 로그 꼬리가 잘리고 인덱스는 이미 기록됨
+    with open(log_path, 'r+b') as f:
+        f.truncate(os.path.getsize(log_path) - 3)
+
+    log = MessageLog("room", base_dir=messages_dir, segment_max_bytes=1 << 20)
+    assert log.next_seq == 4
+    assert os.path.getsize(index_path) == 4 * INDEX_ENTRY.size
+    assert log.append(make_message(99)) == 4
+    assert contents(log.read_range(0)) == [make_message(i)["content"] for i in (0, 1, 2, 3, 99)]
+
+
+def test_unindexed_records_are_reindexed(messages_dir):
+    log = fill(messages_dir, 5, segment_max_bytes=1 << 20)
+    log.close()
+    _, index_path = segment_paths(log)[-1]
+    # 로그 기록 직후 인덱스를 쓰기 전에 죽은 상황: 인덱스 엔트리 두 개가 빠짐
+    with open(index_path, 'r+b') as f:
+        f.truncate(3 * INDEX_ENTRY.size + 5)
+
+    log = MessageLog("room", base_dir=messages_dir, segment_max_bytes=1 << 20)
+    assert log.next_seq == 5
+    assert os.path.getsize(index_path) == 5 * INDEX_ENTRY.size
+    assert contents(log.read_range(0)) == [make_message(i)["content"] for i in range(5)]
+
+
+def test_index_past_log_end_is_trimmed(messages_dir):
+    log = fill(messages_dir, 5, segment_max_bytes=1 << 20)
+    log.close()
+    log_path, index_path = segment_paths(log)[-1]
+    with open(index_path, 'ab') as f:
+        f.write(INDEX_ENTRY.pack(os.path.getsize(log_path), 40))
+
+    log = MessageLog("room", base_dir=messages_dir, segment_max_bytes=1 << 20)
+    assert log.next_seq == 5
+    assert log.append(make_message(5)) == 5
+    assert contents(log.read_range(0)) == [make_message(i)["content"] for i in range(6)]
+
+
+def test_empty_new_segment_after_crash_is_reused(messages_dir):
+    log = fill(messages_dir, 30)
+    log.close()
+    last_path, last_index = segment_paths(log)[-1]
+    last_base = log._segments[-1].base_seq
+    # 새 세그먼트를 만든 직후 첫 레코드를 쓰기 전에 죽은 상황: 빈 세그먼트만 남음
+    with open(last_path, 'wb'), open(last_index, 'wb'):
+        pass
+
+    log = MessageLog("room", base_dir=messages_dir, segment_max_bytes=200)
+    assert log.next_seq == last_base
+    assert log.append(make_message(last_base)) == last_base
+    assert contents(log.read_range(last_base - 1)) == [
+        make_message(i)["content"] for i in (last_base - 1, last_base)
+    ]
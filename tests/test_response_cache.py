@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("dotenv")
+
+from chatbot.context_manager import ChatContextManager
+from chatbot.response_cache import ResponseCache, make_key, normalize_prompt
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  Hello \t World\n") == "hello world"
+    assert normalize_prompt("ＡＢＣ") == "abc"
+
+
+def test_normalized_prompts_share_reply_entry():
+    bot_manager = pytest.importorskip("chatbot.bot_manager")
+    contexts = ChatContextManager()
+    contexts.record("room", "안녕", "반가워요")
+    cache = ResponseCache()
+
+    key = bot_manager.BotManager._cache_key(
+        "Hello  World", "reply", contexts.build_contents("room", "Hello  World"))
+    cache.put(key, "answer")
+    same = bot_manager.BotManager._cache_key(
+        "hello world", "reply", contexts.build_contents("room", "hello world"))
+    assert same == key
+    assert cache.get(same) == "answer"
+
+    other_room = bot_manager.BotManager._cache_key(
+        "hello world", "reply", contexts.build_contents("other", "hello world"))
+    assert other_room != key
+
+
+def test_history_is_part_of_the_key():
+    history = [{"role": "user", "parts": ["안녕"]}, {"role": "model", "parts": ["반가워요"]}]
+    assert make_key("Hello  World", "m", history=history) == make_key("hello world", "m", history=history)
+    assert make_key("hello world", "m", history=history) != make_key("hello world", "m")
+    assert make_key("hello world", "m", history=[]) == make_key("hello world", "m")
@@ -0,0 +1,142 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from services.room_store import JsonRoomStore, SqliteRoomStore
+
+
+def make_room(room_id="r1", **changes):
+    room = {
+        "id": room_id, "name": "잡담방", "owner": "kim", "is_public": True, "password": None,
+        "topic": "", "created_at": "2024-01-01 00:00:00", "notifications_enabled": True,
+        "members": ["kim", "lee", "park"], "banned_users": [],
+    }
+    room.update(changes)
+    return room
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteRoomStore(str(tmp_path / "rooms.db"))
+
+
+def test_save_and_get_round_trip(store):
+    room = make_room(is_public=False, password="pw", members=["park", "kim", "park"])
+    store.save(room)
+    loaded = store.get("r1")
+    assert loaded["is_public"] is False
+    assert loaded["password"] == "pw"
+    assert loaded["members"] == ["park", "kim"]  # 순서 유지, 중복 제거
+    assert store.load_all() == {"r1": loaded}
+    assert store.get("missing") is None
+
+
+def test_update_applies_only_when_mutate_returns_true(store):
+    store.save(make_room())
+
+    def join(room):
+        room["members"].append("choi")
+        return True
+    assert store.update("r1", join) is True
+    assert store.get("r1")["members"][-1] == "choi"
+
+    def noop(room):
+        room["members"].append("ghost")
+        return False
+    assert store.update("r1", noop) is False
+    assert "ghost" not in store.get("r1")["members"]
+    assert store.update("missing", join) is False
+
+
+def test_failed_update_rolls_back(store):
+    store.save(make_room())
+
+    def broken(room):
+        room["members"].clear()
+        room["name"] = "바뀐 이름"
+        raise RuntimeError("중간에 실패")
+    with pytest.raises(RuntimeError):
+        store.update("r1", broken)
+    room = store.get("r1")
+    assert room["name"] == "잡담방"
+    assert room["members"] == ["kim", "lee", "park"]
+    store.save(make_room("r2"))  # 연결이 트랜잭션 밖 상태로 돌아와 계속 쓸 수 있음
+
+
+def test_uncommitted_write_is_lost_after_crash(tmp_path):
+    db_path = str(tmp_path / "rooms.db")
+    SqliteRoomStore(db_path).save(make_room())
+    # 커밋 전에 프로세스가 죽은 연결
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("UPDATE rooms SET name = '반쯤 쓴 이름' WHERE id = 'r1'")
+    conn.execute("DELETE FROM room_members WHERE room_id = 'r1'")
+    conn.close()
+
+    reopened = SqliteRoomStore(db_path)
+    room = reopened.get("r1")
+    assert room["name"] == "잡담방"
+    assert room["members"] == ["kim", "lee", "park"]
+
+
+def test_delete_with_predicate_cascades(store):
+    store.save(make_room(banned_users=["troll"]))
+    assert store.delete("r1", predicate=lambda room: room["owner"] == "lee") is False
+    assert store.delete("r1", predicate=lambda room: room["owner"] == "kim") is True
+    assert store.get("r1") is None
+    assert store.rooms_for_member("kim") == []
+    conn = store._connect()
+    assert conn.execute("SELECT COUNT(*) FROM room_banned_users").fetchone() == (0,)
+
+
+def test_rooms_for_member(store):
+    store.save(make_room("r1"))
+    store.save(make_room("r2", members=["lee"]))
+    assert sorted(store.rooms_for_member("lee")) == ["r1", "r2"]
+    assert store.rooms_for_member("kim") == ["r1"]
+
+
+def test_concurrent_updates_are_not_lost(store):
+    store.save(make_room(members=[]))
+    errors = []
+
+    def join(name):
+        try:
+            for i in range(20):
+                store.update("r1", lambda room: room["members"].append(f"{name}-{i}") or True)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=join, args=(f"user{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(store.get("r1")["members"]) == 80
+
+
+def test_import_json_runs_once(tmp_path, store):
+    rooms_file = tmp_path / "rooms.json"
+    rooms_file.write_text(json.dumps({"r1": make_room(), "r2": make_room("r2")}), encoding="utf-8")
+    assert store.import_json(str(rooms_file)) == 2
+    store.delete("r2")
+    assert store.import_json(str(rooms_file)) == 0
+    assert list(store.load_all()) == ["r1"]
+
+
+def test_import_json_tolerates_broken_file(tmp_path, store):
+    rooms_file = tmp_path / "rooms.json"
+    rooms_file.write_text('{"r1": {"id"', encoding="utf-8")
+    assert store.import_json(str(rooms_file)) == 0
+    assert store.load_all() == {}
+
+
+def test_json_store_matches_interface(tmp_path):
+    store = JsonRoomStore(str(tmp_path / "rooms.json"))
+    store.save(make_room())
+    assert store.update("r1", lambda room: room["members"].remove("lee") or True)
+    assert store.get("r1")["members"] == ["kim", "park"]
+    assert store.delete("r1") is True
+    assert store.load_all() == {}
@@ -0,0 +1,132 @@
+import time
+
+import pytest
+
+from services.message_log import get_message_log
+from services.search_index import SearchIndex, decode_postings, encode_varint, tokenize
+
+
+def encode_postings(docs):
+    out = bytearray()
+    previous = 0
+    for doc in docs:
+        encode_varint(doc - previous, out)
+        previous = doc
+    return out
+
+
+@pytest.mark.parametrize("value, size", [
+    (0, 1), (127, 1), (128, 2), (16383, 2), (16384, 3), (2 ** 32, 5),
+])
+def test_varint_byte_boundaries(value, size):
+    out = bytearray()
+    encode_varint(value, out)
+    assert len(out) == size
+    assert decode_postings(out) == [value]
+
+
+def test_postings_round_trip():
+    docs = [0, 1, 128, 129, 16383 + 129, 16383 + 130, 10 ** 6]
+    assert decode_postings(encode_postings(docs)) == docs
+
+
+def test_tokenize_hangul_bigrams_and_words():
+    assert tokenize("점심 밥먹자 Hello") == {"점심", "밥먹", "먹자", "hello"}
+    assert tokenize("밥") == {"밥"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    messages_dir = str(tmp_path / "messages")
+    room_log = get_message_log("room", base_dir=messages_dir)
+    for content in ("밥먹자", "점심 밥", "국밥 맛집", "커피 마시자"):
+        room_log.append({"role": "user", "username": "kim", "content": content,
+                         "timestamp": time.time()})
+    index = SearchIndex(index_dir=str(tmp_path / "search"), messages_dir=messages_dir)
+    index.catch_up(["room"])
+    return index
+
+
+def test_one_syllable_query_matches_longer_runs(index):
+    contents = {message["content"] for message in index.search("밥")}
+    assert contents == {"밥먹자", "점심 밥", "국밥 맛집"}
+
+
+def test_bigram_query(index):
+    assert [message["content"] for message in index.search("마시")] == ["커피 마시자"]
+
+
+def test_postings_iterate_newest_first():
+    from services.search_index import iter_postings_desc
+    docs = [3, 130, 131, 20000, 20001, 10 ** 6]
+    assert list(iter_postings_desc(encode_postings(docs), docs[-1])) == docs[::-1]
+
+
+def test_search_reads_only_newest_candidates(index):
+    results = index.search("밥", limit=1)
+    assert [message["content"] for message in results] == ["국밥 맛집"]
+
+
+def add_messages(room_log, contents):
+    for content in contents:
+        room_log.append({"role": "user", "username": "kim", "content": content, "timestamp": time.time()})
+
+
+def test_saves_only_new_documents_as_deltas(tmp_path):
+    messages_dir = str(tmp_path / "messages")
+    index_dir = tmp_path / "search"
+    room_log = get_message_log("room", base_dir=messages_dir)
+    index = SearchIndex(index_dir=str(index_dir), messages_dir=messages_dir)
+
+    add_messages(room_log, ["첫 메시지 " + "가" * 200])
+    index.catch_up(["room"])
+    index.save()
+    assert (index_dir / "index.json").exists()  # 첫 저장은 스냅샷으로 합쳐짐
+    snapshot = (index_dir / "index.json").read_bytes()
+
+    add_messages(room_log, ["둘째 메시지", "셋째 메시지"])
+    index.catch_up(["room"])
+    index.save()
+    assert (index_dir / "index.json").read_bytes() == snapshot  # 스냅샷은 다시 쓰지 않음
+    assert len(list(index_dir.glob("*.delta"))) == 1
+
+    reloaded = SearchIndex(index_dir=str(index_dir), messages_dir=messages_dir)
+    assert reloaded.stats() == index.stats()
+    assert [m["content"] for m in reloaded.search("메시지")] == ["셋째 메시지", "둘째 메시지", "첫 메시지 " + "가" * 200]
+    assert reloaded.catch_up(["room"]) == 0
+
+
+def test_leftover_delta_after_compaction_is_not_applied_twice(tmp_path):
+    messages_dir = str(tmp_path / "messages")
+    index_dir = tmp_path / "search"
+    room_log = get_message_log("room", base_dir=messages_dir)
+    index = SearchIndex(index_dir=str(index_dir), messages_dir=messages_dir)
+    add_messages(room_log, ["하나"])
+    index.catch_up(["room"])
+    index.save()
+    add_messages(room_log, ["".join(chr(0xAC00 + i) for i in range(300))])
+    index.catch_up(["room"])
+    index.save()  # 변경분이 스냅샷보다 커서 합쳐짐
+    assert not list(index_dir.glob("*.delta"))
+
+    # 합친 뒤 변경분을 지우기 전에 중단된 상황
+    (index_dir / "000000000001.delta").write_text("{}", encoding="utf-8")
+    reloaded = SearchIndex(index_dir=str(index_dir), messages_dir=messages_dir)
+    assert reloaded.stats()["documents"] == 2
+    assert not list(index_dir.glob("*.delta"))
+
+
+def test_broken_delta_rebuilds_from_logs(tmp_path):
+    messages_dir = str(tmp_path / "messages")
+    index_dir = tmp_path / "search"
+    room_log = get_message_log("room", base_dir=messages_dir)
+    add_messages(room_log, ["밥먹자", "국밥"])
+    index = SearchIndex(index_dir=str(index_dir), messages_dir=messages_dir)
+    index.catch_up(["room"])
+    index.save()
+    (index_dir / "000000000009.delta").write_text('{"version": 2, "first_doc": 7', encoding="utf-8")
+
+    reloaded = SearchIndex(index_dir=str(index_dir), messages_dir=messages_dir)
+    assert reloaded.stats()["documents"] == 0
+    assert reloaded.catch_up(["room"]) == 2
+    assert len(reloaded.search("밥")) == 2
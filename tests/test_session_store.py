@@ -0,0 +1,103 @@
+import sqlite3
+import time
+
+import pytest
+
+from services.session_store import SessionStore
+
+NOW = time.time()  # 다시 열 때는 실제 시각으로 만료 세션을 지우므로 현재 시각 기준
+TTL = 3600
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def open_store(db_path, purge_interval=0):
+    return SessionStore(db_path, ttl=TTL, purge_interval=purge_interval)
+
+
+def test_create_and_get(db_path):
+    store = open_store(db_path)
+    token = store.create("kim", now=NOW)
+    assert len(token) >= 32
+    assert store.get(token, now=NOW + 1) == "kim"
+    assert store.get("unknown", now=NOW) is None
+    assert store.get(None) is None
+
+
+def test_sessions_expire(db_path):
+    store = open_store(db_path)
+    token = store.create("kim", now=NOW)
+    assert store.get(token, now=NOW + TTL + 1) is None
+    assert len(store) == 0
+
+
+def test_get_slides_expiry(db_path):
+    store = open_store(db_path)
+    token = store.create("kim", now=NOW)
+    # 남은 기간이 절반 아래일 때 조회하면 연장되어 디스크에도 기록됨
+    assert store.get(token, now=NOW + TTL * 0.75) == "kim"
+    assert store.get(token, now=NOW + TTL * 1.5) == "kim"
+    reopened = open_store(db_path)
+    assert reopened.get(token, now=NOW + TTL * 1.5) == "kim"
+
+
+def test_rotate_revokes_old_token(db_path):
+    store = open_store(db_path)
+    token = store.create("kim", now=NOW)
+    rotated = store.rotate(token, now=NOW + 1)
+    assert rotated and rotated != token
+    assert store.get(token, now=NOW + 1) is None
+    assert store.get(rotated, now=NOW + 1) == "kim"
+    assert store.rotate(token, now=NOW + 2) is None  # 한 번 쓴 토큰은 다시 쓸 수 없음
+
+    reopened = open_store(db_path)
+    assert reopened.get(token, now=NOW + 2) is None
+    assert reopened.get(rotated, now=NOW + 2) == "kim"
+
+
+def test_rotate_expired_token(db_path):
+    store = open_store(db_path)
+    token = store.create("kim", now=NOW)
+    assert store.rotate(token, now=NOW + TTL + 1) is None
+    assert store.rotate(None) is None
+
+
+def test_rename_user_updates_every_session(db_path):
+    store = open_store(db_path)
+    first = store.create("kim", now=NOW)
+    second = store.create("kim", now=NOW)
+    other = store.create("lee", now=NOW)
+    store.rename_user("kim", "park")
+    assert store.get(first, now=NOW) == "park"
+    assert store.get(second, now=NOW) == "park"
+    assert store.get(other, now=NOW) == "lee"
+    assert open_store(db_path).get(second, now=NOW) == "park"
+
+
+def test_restart_drops_expired_sessions(db_path):
+    store = open_store(db_path)
+    expired = store.create("kim", now=NOW - TTL - 1)
+    live = store.create("lee", now=NOW)
+    store.delete("unknown")
+
+    # 프로세스가 종료되었다가 다시 시작된 상황
+    reopened = SessionStore(db_path, ttl=TTL)
+    assert reopened.get(live, now=NOW) == "lee"
+    assert reopened.get(expired, now=NOW) is None
+    with sqlite3.connect(db_path) as conn:
+        (count,) = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+    assert count == 1
+
+
+def test_purge_removes_expired_rows(db_path):
+    store = open_store(db_path)
+    store.create("kim", now=NOW)
+    keep = store.create("lee", now=NOW + TTL)
+    assert store.purge_expired(now=NOW + TTL + 1) == 1
+    assert len(store) == 1
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT token FROM sessions").fetchall()
+    assert rows == [(keep,)]
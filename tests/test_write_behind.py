@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from services.write_behind import WriteBehindStore
+
+
+def journal_lines(*ops):
+    return "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "profiles.json"
+
+
+def open_store(path):
+    return WriteBehindStore(str(path), json.load, json.dump, {})
+
+
+def test_set_delete_and_flush(path):
+    store = open_store(path)
+    store.set("kim", {"status": "online"})
+    store.set("lee", {"status": "offline"})
+    store.delete("lee")
+    assert store.get("kim") == {"status": "online"}
+    assert store.get("lee") is None
+    store.flush()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"kim": {"status": "online"}}
+    assert not (path.parent / "profiles.json.journal.old").exists()
+
+
+def test_replays_journal_after_crash(path):
+    path.write_text(json.dumps({"kim": {"status": "offline"}}), encoding="utf-8")
+    (path.parent / "profiles.json.journal").write_text(journal_lines(
+        {"op": "set", "key": "kim", "value": {"status": "online"}},
+        {"op": "set", "key": "lee", "value": {"status": "online"}},
+    ), encoding="utf-8")
+    store = open_store(path)
+    assert store.value() == {"kim": {"status": "online"}, "lee": {"status": "online"}}
+
+
+def test_ignores_truncated_journal_tail(path):
+    (path.parent / "profiles.json.journal").write_text(
+        journal_lines({"op": "set", "key": "kim", "value": 1}) + '{"op": "set", "key": "lee"',
+        encoding="utf-8")
+    assert open_store(path).value() == {"kim": 1}
+
+
+def test_replay_after_commit_before_cleanup_is_idempotent(path):
+    # 원본 파일은 교체되었지만 .old 저널을 지우기 전에 중단된 상황
+    path.write_text(json.dumps({"kim": 2}), encoding="utf-8")
+    (path.parent / "profiles.json.journal.old").write_text(journal_lines(
+        {"op": "set", "key": "kim", "value": 1},
+        {"op": "set", "key": "lee", "value": 1},
+        {"op": "delete", "key": "lee"},
+        {"op": "set", "key": "kim", "value": 2},
+    ), encoding="utf-8")
+    (path.parent / "profiles.json.journal").write_text(journal_lines(
+        {"op": "set", "key": "park", "value": 3},
+    ), encoding="utf-8")
+    store = open_store(path)
+    assert store.value() == {"kim": 2, "park": 3}
+    store.flush()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"kim": 2, "park": 3}
+    assert not (path.parent / "profiles.json.journal.old").exists()
+
+
+def test_failed_commit_keeps_journal(path, monkeypatch):
+    store = open_store(path)
+    store.set("kim", 1)
+
+    def fail(state):
+        raise OSError("disk full")
+    monkeypatch.setattr(store, "_write_file", fail)
+    with pytest.raises(OSError):
+        store.flush()
+    store.set("lee", 2)
+    monkeypatch.undo()
+
+    # 실패한 커밋의 변경은 .old 저널에 남아 재시작 시 다시 적용할 수 있음
+    assert "kim" in (path.parent / "profiles.json.journal.old").read_text(encoding="utf-8")
+    assert "lee" in (path.parent / "profiles.json.journal").read_text(encoding="utf-8")
+    store.flush()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"kim": 1, "lee": 2}
+    assert not (path.parent / "profiles.json.journal.old").exists()